@@ -17,237 +17,46 @@
 
 
 # pip install pydotplus
-# pip install skompiler
-# pip install astor
 # pip install joblib
 
+import argparse
 import warnings
-import joblib
-import pydotplus
+
 import numpy as np
 import pandas as pd
-import seaborn as sns
-from matplotlib import pyplot as plt
-from sklearn.tree import DecisionTreeClassifier, export_graphviz, export_text
-from sklearn.metrics import classification_report, roc_auc_score
-from sklearn.model_selection import train_test_split, GridSearchCV, cross_validate, validation_curve
-from skompiler import skompile
-import graphviz
-
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', 500)
-
-warnings.simplefilter(action='ignore', category=Warning)
-
-################################################
-# 1. Exploratory Data Analysis
-################################################
-
-################################################
-# 2. Data Preprocessing & Feature Engineering
-################################################
-
-################################################
-# 3. Modeling using CART
-################################################
-
-df = pd.read_csv("datasets/diabetes.csv") #veri setini çağırdık
-
-y = df["Outcome"] #bağımlı değişkeni seçtik
-X = df.drop(["Outcome"], axis=1) #bağımsız değişkeni seçtik
-
-cart_model = DecisionTreeClassifier(random_state=1).fit(X, y)
-#daha önceden import etiğimiz modelimizi çağırdık 
-#değişkenlerimizi fit ettik
-#random state hocayla aynı sonuçları alalım diye
-
-# Confusion matrix için y_pred:
-y_pred = cart_model.predict(X)
-#tahmin edilen değerlerimiz bunlar sonra bunları değerlendiricez
-
-# AUC için y_prob:
-y_prob = cart_model.predict_proba(X)[:, 1]
-#roc eğrisi için 1. sınıfa ait olma olasılıkları lazım bize
-#auc hesaplıcaaz
-
-# Confusion matrix
-print(classification_report(y, y_pred))
-#başarı değerimize bakıyoruz burada 1 çıktı mükemmel 1 atlayış
-#precisionlar recall f1ler hep 1 maşallah
-
-# AUC
-roc_auc_score(y, y_prob)
-#auc skor da 1 çıktı bu terste bir işlik yok mu
-
-#overfit'e mi düştük yoksa
-#başarımı nasıl daha doğru değerlendirebilirim diye holdout yöntemimiz var
-
-#####################
-# Holdout Yöntemi ile Başarı Değerlendirme
-#####################
-
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.30, random_state=45)
-# test ve train setlerimizi ikiye ayırdık train_test_split ile
-#0.7'si train 0.3'ü test yaptık
-
-#modelimizi kurduk yine 
-cart_model = DecisionTreeClassifier(random_state=17).fit(X_train, y_train)
-
-# Train Hatası
-y_pred = cart_model.predict(X_train)
-y_prob = cart_model.predict_proba(X_train)[:, 1]
-print(classification_report(y_train, y_pred))
-roc_auc_score(y_train, y_prob)
-#train için bi baktık skorlarımız yine 1 geldi başarımız
-
-# Test Hatası
-y_pred = cart_model.predict(X_test)
-y_prob = cart_model.predict_proba(X_test)[:, 1]
-print(classification_report(y_test, y_pred))
-roc_auc_score(y_test, y_prob)
-#şimdi hiç görmediği test setinde gördük ki
-#eğitildiği veride yüksek performans verdi ama
-#görmediği veride precisionlar recall'lar f1'ler accuracy'ler hep düştü
-#demek ki model göremediği veride berbar train set'ini ezberledi
-#accuracy 0.71 fena değil ama kötü f1 0.58 çıktı biraz düşük ama kayde değer diyebiliriz
-
-#random state'i değiştirip modeli yeniden kurduk baktık ki skorlar hep değişiyor
-#işin içinden çıkamadık e napıcaz
-#çapraz doğrulama selamın aleykum ben geliyorum diyecez 
-#model başarımızı böyle değerlendiricez
-#####################
-# CV ile Başarı Değerlendirme
-#####################
-
-cart_model = DecisionTreeClassifier(random_state=17).fit(X, y)
-#tamam aynı şekil modelimizi fit ettik
-#şimdi cross validate yapıcaz kardeş ama yukarıda zaten sen tüm modeli fit ettin
-#dersen eğer haklısın ama cross validate kardeş bu durumua ayarlıyor gerektiği gibi
-
-cv_results = cross_validate(cart_model,
-                            X, y,
-                            cv=5,
-                            scoring=["accuracy", "f1", "roc_auc"])
-
-cv_results['test_accuracy'].mean()
-# 0.7058568882098294
-cv_results['test_f1'].mean()
-# 0.5710621194523633
-cv_results['test_roc_auc'].mean()
-# 0.6719440950384347
-
-#ŞİMDİ BİZ BURAYA KADAR NE YAPTIK KARDEŞ?
-#E anlatayım; biz modelimizi kurduk bi baktık skorlarımız 1 geliyor
-#dedik ki bu terste bir işlik var böyle olmaz ki ya 
-#en iyisi  holdout yöntemiyle ben bi train test yapıyım dedik
-#orada da işin içinden çıkamadık random state değiştikçe sonuçlar değişti
-#aslında belki veri setimiz zengin olsa bu holdout yöntemi yeterli olurdu
-#ama olmadı o yüzden cross validation yapalım dedik madem en sonunda
-#en son artık elde ettiğimiz başarı oranları n doğru başarı oranlarıdır
-#tamam en doğru sonuçları şimdi bulduk ama sonuçlar da biraz düşük kaldı gibi kardeş
-#model başarımızı nasıl arttırırız şimdi?
-#cvp: yeni değişkenler ekleyerek veri ön işleme yaparak ya da hiperparametre optimizasyonu yaparak 
-#ek olarak bu veriseti özelinde dengesiz veri yaklaşımları da tercih edilebilir.
-
-#biz bu seçeneklerden hiperparametere optimizasyonu seçmeke ve devamkee
-################################################
-# 4. Hyperparameter Optimization with GridSearchCV
-################################################
-
-
-cart_model.get_params()
-
-#mevcut modelin hiperparametrelerini görmek için get_params kardeşi çağırdık
-#biz buradaki çıktılardan en önemli olanları seçelimm
-#mesela min_samples_split var ön tanımlı değeri de 2'ymiş
-#yani iki tane kalana kadar bölme işlemine devam ediyor e bu overfit'e sebep olabilir 
-#bi de max_depth var ön tanımlı değeri none bu da overfit yapıyordur muhtemelen
-
-#şimdi denenecek olan parametre setleri için öntanımlı değerlerimizi verdik
-cart_params = {'max_depth': range(1, 11),
-               "min_samples_split": range(2, 20)}
-
-#şimdi de gridsearchCV kardeşle bu parametrelere göre bi arama yapılmasını sağlayacağız
-#ne diyordu bu kardeş? bana modeli göster hanhi hiperparametrelerde geziceğimi göster diyordu
-#kaç katlı çapraz doğrulama ile hatalara bakıcağını gösterdik
-#işlmciyi tam performans kullan dedik n_jobs=-1'le
-#verbose true ile rapor ver kardeş dedik
-cart_best_grid = GridSearchCV(cart_model,
-                              cart_params,
-                              cv=5,
-                              n_jobs=-1,
-                              verbose=1).fit(X, y)
-#bu hiperparametre optm. tüm veriyle ya da train test ile de yapılabilir
-#öneri tüm veri setiyle yapılmasından yana
-#biz de veri seti boyutu az diye hepsini kullandık 
-#sen istersen bunu train ile yapar sonra test ile test edebilirsin o da kayda değer bir yoldur
-
-cart_best_grid.best_params_
-#max depth: 5, min samples split:4 en iyi değerler bunlar çıktı
-
-#o zaman şimdi en iy değerlere göre en iyi skorlarımıza bakalım
-cart_best_grid.best_score_
-#0.75 çıktı best score'da
-#bu 0,75 ne? scoring ön tanımlı argüman var ön tanımlı değeri accuracy'dir
-#bunu değiştirmeye gerek yok ama daha sonra gerekirse değiştirirsin
-#f1 skor yaparsan bunu max depth ve min samples split değiştii
-#dökümantasyon oku bol bol metodların detayına girr iyidir kardeşşş
-#biz accuracy'de kaldık devam edicez
-
-random = X.sample(1, random_state=45)
-
-cart_best_grid.predict(random)
-
-
-################################################
-# 5. Final Model
-################################################
-#aha aşağıda modelimizi kurduk
-
-cart_final = DecisionTreeClassifier(**cart_best_grid.best_params_, random_state=17).fit(X, y)
-#şimdi bi parametrelerimize bakalım
-cart_final.get_params()
-#heh tamam gelmiş istediğimiz ön tanımlı değerlerimiz
 
-#final model oluşturmanın bir yolu budur
-#bir de bu var;
-#en iyi parametreleri modele atamak için;
-#bunu biye gösterdik bu parametreleri daha sonra metodsal fonksiyonel olarak atamamız gerekebilir
-#napıyoruz böylece aşağıda: var olan bir modeli set_params'ı kullanarak final model yapabiliriz
+# çizim (seaborn, matplotlib), pydotplus ve sklearn ağır kütüphaneler
+# hepsini sadece kullanıldıkları fonksiyonların içinde import ediyoruz
+# sadece tahmin yapacaksan cart_score.py yeter, o numpy ve kaydedilmiş model dışında bir şey istemiyor
+# eğitim adımları train() içinde, dosya import edilince hiçbir şey çalışmıyor:
+# python cart.py train
+# python cart.py train --profile --trace cart_trace.json
+# python cart.py train --benchmarks   (yavaş hız ölçümleri de çalışsın)
+# python cart.py score cart_final.cart datasets/diabetes.csv
+# python cart.py serve cart_final.cart --port 8080
+# python cart.py serve cart_registry --port 8080   (sürümlü registry, yeni sürüm yeniden başlatmadan devreye giriyor)
+# hız ölçümleri (sentetik diabetes verisiyle 768..10M satır) ve iki ölçümün karşılaştırılması:
+# python cart_bench.py run --output bench.json
+# python cart_bench.py compare bench_before.json bench.json
 
-cart_final = cart_model.set_params(**cart_best_grid.best_params_).fit(X, y)
-
-#şimdi final modelimizin hata skorlarına  cross validate'lebakalım
-cv_results = cross_validate(cart_final,
-                            X, y,
-                            cv=5,
-                            scoring=["accuracy", "f1", "roc_auc"])
-
-cv_results['test_accuracy'].mean()
-
-cv_results['test_f1'].mean()
-
-cv_results['test_roc_auc'].mean()
-#evet yukarıdakilerin çıktılarından görecez ki ilerleme kaydettik
-
-
-################################################
-# 6. Feature Importance
-################################################
-#değişkenleri sahip olduğu önem sıralamasına göre sıralıcazke
-
-cart_final.feature_importances_
-#değişkenlerin önem özelliği yukarıdakini yapınca geldi ama format anlayabileceğimiz düzeyde değil
-#o zaman öyle  bişey yapalım ki
-#kıyamadığım serisinden fonksiyon aşağıdaaa!!!!!!
-#önem sırasına göre sıralar, isimlerini verir ve bize görselleştirir bu çıktıı ooo
 
 #burada ön tanımlı argüman num var değişken kadarınca dedik biz ilk 5'de diyebilirdik duruma göre
 #ilk argümanımız da model
 #3. argüman değişkenler, feature'lar, kolonlar
 #save diye bi argüman var false dedik true dersek kaydeder bak aşağıda sonda if save: plt.save bişeyler var
-def plot_importance(model, features, num=len(X), save=False):
-    feature_imp = pd.DataFrame({'Value': model.feature_importances_, 'Feature': features.columns})
+#importances verilmezse modelin impurity tabanlı feature_importances_'ı çiziliyor
+#permutation importance çizmek için cart_importance.tree_permutation_importance çıktısını ya da bir dizi verilebilir
+def plot_importance(model, features, num=None, save=False, importances=None):
+    import seaborn as sns
+    from matplotlib import pyplot as plt
+
+    if num is None:
+        num = len(features.columns)
+    if importances is None:
+        importances = model.feature_importances_
+    elif hasattr(importances, "importances_mean"):
+        importances = importances.importances_mean
+    feature_imp = pd.DataFrame({'Value': importances, 'Feature': features.columns})
     plt.figure(figsize=(10, 10))
     sns.set(font_scale=1)
     sns.barplot(x="Value", y="Feature", data=feature_imp.sort_values(by="Value",
@@ -259,68 +68,12 @@ def plot_importance(model, features, num=len(X), save=False):
         plt.savefig('importances.png')
 
 
-plot_importance(cart_final, X, num=5)
-
-################################################
-# 7. Analyzing Model Complexity with Learning Curves (BONUS)
-################################################
-
-#overfit'e düştüm mü sorusunun cevabı train ve test setinin farklarının ayrışmaya
-#başladığı noktadır dedik kardeş..
-#nasıl yakalarım bunu ayrıştığı noktaya bakarız
-#önüne geçmek için model karmaşıklığı azaltırız böylece önüne geçeriz
-#model karmaşıklığı metrikleri modellere göre değişir 
-#yani başka modelde başka hiperparametreler model karmaşıklığı metrikleridir
-#şimdi validation curve diye metodumuz var 
-#diyor ki bize final modeli ver kardeş, bağımsız değişkeni, bağımlı değişkeni ver
-#bir parametre seç ve buna göre öğrenme eğrilerini ver istiyoruz
-#bu bana numerik çıktılar vericek ben de görselleştiricem
-#hangi parametre max depth
-#hangi aralıkta gir
-#hangi skoru görmek istersin
-#kaç katlı cross validate atalım girdik
-
-train_score, test_score = validation_curve(cart_final, X, y,
-                                           param_name="max_depth",
-                                           param_range=range(1, 11),
-                                           scoring="roc_auc",
-                                           cv=10)
-#şimdi çıktı geldi de tamam nedir bu?
-#şimdi bize çıktıdan arraylar içerisinde bazı sayılar geldi ne bunlar
-#bu arraylar 9'uyla train 1'iyle testin cv=10'da sonuçları
-#bunları nasıl kullanıcaz bu arrayların ortalamasını alarak
-#model karmaşıklığına ne dedik train ve test hataları görselleştirilir
-#veee ayrım noktası üzerinden karar vermeye çalışırız
-mean_train_score = np.mean(train_score, axis=1)
-mean_test_score = np.mean(test_score, axis=1)
-
-#bu da bize train test görselini verecek fonksiyon aşaıda
-
-plt.plot(range(1, 11), mean_train_score,
-         label="Training Score", color='b')
-
-plt.plot(range(1, 11), mean_test_score,
-         label="Validation Score", color='g')
-
-plt.title("Validation Curve for CART")
-plt.xlabel("Number of max_depth")
-plt.ylabel("AUC")
-plt.tight_layout()
-plt.legend(loc='best')
-plt.show()
-#çıktı görselinden anlıyoruz ki max derinlik 2 olduğunda başarımız artmaya devam etmiş
-#3 olduğunda da artmış ama 4'te train test'in başarısı hala artmaya devam ediyor
-#1'e kadar çıkmış skor ama test skoru düşmüş orada
-#max derinliği biz zaten seçtik 5 (emin değilim) ama grafikte 3 gibi çıkıyor
-#olay ne burada; biz model kurarken çok değişkenli olarak değerlendirip seçtik
-#max derinliği tek başına optimum değeri seçmiyoruz
-#biz bu görselle bi çıkarım yapıyoruz bakıyoruz nasılmış doğru şeyler yapmış mıyız diye
-
-
-
 #kıyamadığım serisinden bir fonksiyon 
 #dinamik bir fonksiyonkee
 def val_curve_params(model, X, y, param_name, param_range, scoring="roc_auc", cv=10):
+    from matplotlib import pyplot as plt
+    from sklearn.model_selection import validation_curve
+
     train_score, test_score = validation_curve(
         model, X=X, y=y, param_name=param_name, param_range=param_range, scoring=scoring, cv=cv)
 
@@ -341,68 +94,14 @@ def val_curve_params(model, X, y, param_name, param_range, scoring="roc_auc", cv
     plt.show(block=True)
 
 
-val_curve_params(cart_final, X, y, "max_depth", range(1, 11), scoring="f1")
-
-cart_val_params = [["max_depth", range(1, 11)], ["min_samples_split", range(2, 20)]]
-
-for i in range(len(cart_val_params)):
-    val_curve_params(cart_model, X, y, cart_val_params[i][0], cart_val_params[i][1])
-
-
-#BONUS BİLGİ
-################################################
-# 8. Visualizing the Decision Tree
-################################################
-
-# conda install graphviz 
-# import graphviz
-#BU YUKARIDAKILERI KUTUPHANE CALISMAZSA DIYE
-
 def tree_graph(model, col_names, file_name):
+    import pydotplus
+    from sklearn.tree import export_graphviz
+
     tree_str = export_graphviz(model, feature_names=col_names, filled=True, out_file=None)
     graph = pydotplus.graph_from_dot_data(tree_str)
     graph.write_png(file_name)
-#fonksiyon yukarıda 
-
-tree_graph(model=cart_final, col_names=X.columns, file_name="cart_final.png")
-#yukarıda çalıştırdık
-#çalışma dizinine git yoksa diskten yeniden yükle de çift tıkla ve aç
-#grafik de bayağı büyük gelicek he
-
-cart_final.get_params()
-
-
-################################################
-# 9. Extracting Decision Rules
-################################################
-
-tree_rules = export_text(cart_final, feature_names=list(X.columns))
-print(tree_rules)
-#bu yaptığımız karar kurallarını konsolda gözlemleyebileceğimiz bir tarzda bize sunmuş oldu
-#dallanmalardan sonra tüm değişkenler tekrar göz önünde bulunduruluyor bu arada
-
-
-################################################
-# 10. Extracting Python Codes of Decision Rules
-################################################
-#burada bir karar ağacı yöntemini canlı sisteme entegre edeceğizz
-
-# sklearn '0.23.1' versiyonu ile yapılabilir.
-# pip install scikit-learn==0.23.1
 
-print(skompile(cart_final.predict).to('python/code'))
-
-print(skompile(cart_final.predict).to('sqlalchemy/sqlite'))
-
-print(skompile(cart_final.predict).to('excel'))
-
-#yukarıda native'de lokalde kullanmak için ihtiyacımız olan kodları çıkarttık
-#veri tabanının içinde çalışmak her zaman daha iyi 
-#canlı ortamda nasıl kullanacaz babuş
-#sql'den çıkmadan işimizi hallediyoruzkee
-################################################
-# 11. Prediction using Python Codes
-################################################
 
 def predict_with_rules(x):
     return ((((((0 if x[6] <= 0.671999990940094 else 1 if x[6] <= 0.6864999830722809 else
@@ -459,43 +158,714 @@ def predict_with_rules(x):
         51.0 else 1 if x[6] <= 1.1565000414848328 else 0) if x[0] <= 6.5 else 1
         ) if x[4] <= 629.5 else 1 if x[6] <= 0.4124999940395355 else 0)
 
-X.columns
 
-x = [12, 13, 20, 23, 4, 55, 12, 7]
+def train(profile=False, trace_path="cart_trace.json", benchmarks=False):
+    import sqlite3
+    import joblib
+    from matplotlib import pyplot as plt
+    from sklearn.tree import DecisionTreeClassifier, export_text
+    from sklearn.metrics import classification_report, roc_auc_score
+    from sklearn.model_selection import train_test_split, GridSearchCV, cross_validate, validation_curve
+    from cart_scoring import compile_tree, benchmark_scoring
+    from cart_search import TreePathSearchCV, path_validation_curve
+    from cart_cache import SearchCache, CachedGridSearchCV, cached_cross_validate
+    from cart_halving import SuccessiveHalvingSearchCV, compare_with_grid
+    from cart_metrics import threshold_sweep, best_threshold, verify_metrics, benchmark_metrics
+    from cart_importance import tree_permutation_importance, verify_importance, benchmark_importance
+    from cart_render import render_tree, export_subtree, benchmark_render
+    from cart_rules import RuleIndex, benchmark_explain
+    from cart_curves import parallel_validation_curves, LiveCurvePlot, benchmark_cores
+    from cart_codegen import to_python, to_sql, to_excel, export_report, verify_exports, benchmark_rules
+    from cart_sql import load_csv, score_table, read_predictions, benchmark_sqlite
+    from cart_data import load_dataset, benchmark_loader
+    from cart_hist import HistDecisionTreeClassifier, parity_check, benchmark_fit
+    from cart_stream import StreamingDecisionTreeClassifier, verify_streaming
+    from cart_format import save_model, load_model, benchmark_format
+    from cart_server import benchmark_server
+    from cart_registry import ModelRegistry, HotModel, benchmark_hot_swap
+    from cart_profile import enable, section, measure_overhead
+    from cart_bench import synthetic_diabetes
+
+    #profile=True ise her bölümün ve her fit'in süresi, CPU'su, belleği ölçülüyor
+    #çıkışta özet tablo basılıyor, trace_path'teki json chrome://tracing ya da Perfetto ile açılıyor
+    #kapalıyken section() çağrıları hiçbir şey yapmıyor
+    if profile:
+        profiler = enable(trace_path=trace_path)
+        #sarılı predict/fit çağrısı başına ek süre, OVERHEAD_BUDGET'ın altında mı (ok)
+        measure_overhead(profiler=profiler)
+
+    #hız ölçümleri (benchmark_*) büyük sentetik verilerle dakikalar sürüyor, sadece benchmarks=True ise çalışıyor
+    #walkthrough'u tekrar etmek için gerekmiyorlar: python cart.py train --benchmarks
+
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.width', 500)
+
+    warnings.simplefilter(action='ignore', category=Warning)
+
+    ################################################
+    # 1. Exploratory Data Analysis
+    ################################################
+
+    ################################################
+    # 2. Data Preprocessing & Feature Engineering
+    ################################################
+
+    ################################################
+    # 3. Modeling using CART
+    ################################################
+    section("3. Modeling using CART")
+
+    #veri setini çağırdık
+    #read_csv her çalıştırmada dosyayı baştan parse ediyordu, büyük verilerde hem yavaş hem bellek ikiye katlanıyor
+    #load_dataset ilk seferde float32/uint8 olarak parse edip datasets/.cache altına kolon kolon yazıyor
+    #sonraki çalıştırmalar diskten kopyasız memmap görünümü alıyor
+    #y bağımlı değişken, X bağımsız değişkenler
+    X, y = load_dataset("datasets/diabetes.csv", target="Outcome", as_frame=True)
+
+    #parse ve cache'ten yükleme süreleri ile bellek kullanımı
+    if benchmarks:
+        benchmark_loader("datasets/diabetes.csv")
+
+    cart_model = DecisionTreeClassifier(random_state=1).fit(X, y)
+    #daha önceden import etiğimiz modelimizi çağırdık 
+    #değişkenlerimizi fit ettik
+    #random state hocayla aynı sonuçları alalım diye
+
+    # Confusion matrix için y_pred:
+    y_pred = cart_model.predict(X)
+    #tahmin edilen değerlerimiz bunlar sonra bunları değerlendiricez
+
+    # AUC için y_prob:
+    y_prob = cart_model.predict_proba(X)[:, 1]
+    #roc eğrisi için 1. sınıfa ait olma olasılıkları lazım bize
+    #auc hesaplıcaaz
+
+    # Confusion matrix
+    print(classification_report(y, y_pred))
+    #başarı değerimize bakıyoruz burada 1 çıktı mükemmel 1 atlayış
+    #precisionlar recall f1ler hep 1 maşallah
+
+    # AUC
+    roc_auc_score(y, y_prob)
+    #auc skor da 1 çıktı bu terste bir işlik yok mu
+
+    #overfit'e mi düştük yoksa
+    #başarımı nasıl daha doğru değerlendirebilirim diye holdout yöntemimiz var
+
+    #####################
+    # Holdout Yöntemi ile Başarı Değerlendirme
+    #####################
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.30, random_state=45)
+    # test ve train setlerimizi ikiye ayırdık train_test_split ile
+    #0.7'si train 0.3'ü test yaptık
+
+    #modelimizi kurduk yine 
+    cart_model = DecisionTreeClassifier(random_state=17).fit(X_train, y_train)
+
+    # Train Hatası
+    y_pred = cart_model.predict(X_train)
+    y_prob = cart_model.predict_proba(X_train)[:, 1]
+    print(classification_report(y_train, y_pred))
+    roc_auc_score(y_train, y_prob)
+    #train için bi baktık skorlarımız yine 1 geldi başarımız
+
+    # Test Hatası
+    y_pred = cart_model.predict(X_test)
+    y_prob = cart_model.predict_proba(X_test)[:, 1]
+    print(classification_report(y_test, y_pred))
+    roc_auc_score(y_test, y_prob)
+    #şimdi hiç görmediği test setinde gördük ki
+    #eğitildiği veride yüksek performans verdi ama
+    #görmediği veride precisionlar recall'lar f1'ler accuracy'ler hep düştü
+    #demek ki model göremediği veride berbar train set'ini ezberledi
+    #accuracy 0.71 fena değil ama kötü f1 0.58 çıktı biraz düşük ama kayde değer diyebiliriz
+
+    #aynı y_prob'u bir kere sıralayıp tüm eşiklerdeki accuracy/precision/recall/f1 ve auc'yi tek geçişte alabiliriz
+    #predict 0.5'te 0 sınıfını seçiyor, o yüzden inclusive=False ile 0.5 eşiği classification_report'la aynı
+    test_sweep = threshold_sweep(y_test, y_prob, thresholds=np.linspace(0, 1, 101), inclusive=False)
+    test_sweep["roc_auc"]
+    test_sweep["f1"][50]
+    #f1'i en büyük yapan eşik
+    best_threshold(test_sweep, metric="f1")
+
+    #fold'lar ve eşikler 2 boyutlu dizi olarak tek seferde, sklearn'le aynı mı ve 10M satırda hız
+    verify_metrics(y_test, y_prob)
+    if benchmarks:
+        benchmark_metrics(n_rows=10_000_000)
+
+    #random state'i değiştirip modeli yeniden kurduk baktık ki skorlar hep değişiyor
+    #işin içinden çıkamadık e napıcaz
+    #çapraz doğrulama selamın aleykum ben geliyorum diyecez 
+    #model başarımızı böyle değerlendiricez
+    #####################
+    # CV ile Başarı Değerlendirme
+    #####################
+
+    cart_model = DecisionTreeClassifier(random_state=17).fit(X, y)
+    #tamam aynı şekil modelimizi fit ettik
+    #şimdi cross validate yapıcaz kardeş ama yukarıda zaten sen tüm modeli fit ettin
+    #dersen eğer haklısın ama cross validate kardeş bu durumua ayarlıyor gerektiği gibi
+
+    cv_results = cross_validate(cart_model,
+                                X, y,
+                                cv=5,
+                                scoring=["accuracy", "f1", "roc_auc"])
+
+    cv_results['test_accuracy'].mean()
+    # 0.7058568882098294
+    cv_results['test_f1'].mean()
+    # 0.5710621194523633
+    cv_results['test_roc_auc'].mean()
+    # 0.6719440950384347
+
+    #ŞİMDİ BİZ BURAYA KADAR NE YAPTIK KARDEŞ?
+    #E anlatayım; biz modelimizi kurduk bi baktık skorlarımız 1 geliyor
+    #dedik ki bu terste bir işlik var böyle olmaz ki ya 
+    #en iyisi  holdout yöntemiyle ben bi train test yapıyım dedik
+    #orada da işin içinden çıkamadık random state değiştikçe sonuçlar değişti
+    #aslında belki veri setimiz zengin olsa bu holdout yöntemi yeterli olurdu
+    #ama olmadı o yüzden cross validation yapalım dedik madem en sonunda
+    #en son artık elde ettiğimiz başarı oranları n doğru başarı oranlarıdır
+    #tamam en doğru sonuçları şimdi bulduk ama sonuçlar da biraz düşük kaldı gibi kardeş
+    #model başarımızı nasıl arttırırız şimdi?
+    #cvp: yeni değişkenler ekleyerek veri ön işleme yaparak ya da hiperparametre optimizasyonu yaparak 
+    #ek olarak bu veriseti özelinde dengesiz veri yaklaşımları da tercih edilebilir.
+
+    #biz bu seçeneklerden hiperparametere optimizasyonu seçmeke ve devamkee
+    ################################################
+    # 4. Hyperparameter Optimization with GridSearchCV
+    ################################################
+    section("4. Hyperparameter Optimization with GridSearchCV")
+
+
+    cart_model.get_params()
+
+    #mevcut modelin hiperparametrelerini görmek için get_params kardeşi çağırdık
+    #biz buradaki çıktılardan en önemli olanları seçelimm
+    #mesela min_samples_split var ön tanımlı değeri de 2'ymiş
+    #yani iki tane kalana kadar bölme işlemine devam ediyor e bu overfit'e sebep olabilir 
+    #bi de max_depth var ön tanımlı değeri none bu da overfit yapıyordur muhtemelen
+
+    #şimdi denenecek olan parametre setleri için öntanımlı değerlerimizi verdik
+    cart_params = {'max_depth': range(1, 11),
+                   "min_samples_split": range(2, 20)}
+
+    #şimdi de gridsearchCV kardeşle bu parametrelere göre bi arama yapılmasını sağlayacağız
+    #ne diyordu bu kardeş? bana modeli göster hanhi hiperparametrelerde geziceğimi göster diyordu
+    #kaç katlı çapraz doğrulama ile hatalara bakıcağını gösterdik
+    #işlmciyi tam performans kullan dedik n_jobs=-1'le
+    #verbose true ile rapor ver kardeş dedik
+    cart_best_grid = GridSearchCV(cart_model,
+                                  cart_params,
+                                  cv=5,
+                                  n_jobs=-1,
+                                  verbose=1).fit(X, y)
+    #bu hiperparametre optm. tüm veriyle ya da train test ile de yapılabilir
+    #öneri tüm veri setiyle yapılmasından yana
+    #biz de veri seti boyutu az diye hepsini kullandık 
+    #sen istersen bunu train ile yapar sonra test ile test edebilirsin o da kayda değer bir yoldur
+
+    #yukarıda 10 derinlik x 18 min_samples_split x 5 fold = 900 fit yapıldı
+    #oysa sığ ağaç derin ağacın kesilmiş hali, her fold'da tek bir ağaç kurup
+    #tüm adayları o ağacı keserek türetebiliriz, çıktısı gridsearch ile aynı formatta
+    #ama skorlar birebir aynı değil: eşit kazançlı bölünmelerde sklearn rastgele seçiyor, kesilen ağaç farklı dala gidebiliyor
+    #768 satırda 180 adayın 121'i 0.009'a kadar farklı çıktı, hızlı ön eleme için kullan kazananı GridSearchCV ile doğrula
+    cart_path_grid = TreePathSearchCV(cart_model,
+                                      cart_params,
+                                      cv=5,
+                                      n_jobs=-1,
+                                      verbose=1).fit(X, y)
+
+    cart_path_grid.best_params_
+    cart_path_grid.cv_results_["mean_test_score"]
+    #ccp_alpha da ekleyebiliriz budama yolu da aynı ağaçtan çıkıyor
+    #TreePathSearchCV(cart_model, {**cart_params, "ccp_alpha": [0.0, 0.001, 0.005, 0.01]}, cv=5).fit(X, y)
+
+    #script her çalıştığında bu 900 fit baştan yapılıyor, veri ve adaylar aynı olsa bile
+    #her (veri, parametre, fold) hücresinin skorunu .cache/search.sqlite'a yazıp tekrar kullanabiliriz
+    #yarıda kesilirse kaldığı yerden devam eder, cart_params genişlerse sadece yeni hücreler fit edilir
+    search_cache = SearchCache()
+    cart_cached_grid = CachedGridSearchCV(cart_model,
+                                          cart_params,
+                                          cv=5,
+                                          n_jobs=-1,
+                                          verbose=1,
+                                          cache=search_cache).fit(X, y)
+
+    cart_cached_grid.best_params_
+    #bu çalıştırmada hücrelerin ne kadarı diskten geldi
+    cart_cached_grid.cache_hit_rate_
+
+    #veri büyüdükçe 180 adayın hepsini tüm satırlarda denemek pahalı
+    #successive halving: tüm adaylar küçük tabakalı alt örneklemde, her turda en iyi 1/3'ü 3 kat büyük örnekleme geçiyor
+    #her turda Outcome oranı tüm verideki ile aynı, son tur tüm veri; kazanan tüm veride yeniden fit ediliyor
+    cart_halving_grid = SuccessiveHalvingSearchCV(cart_model,
+                                                  cart_params,
+                                                  cv=5,
+                                                  factor=3,
+                                                  n_jobs=-1,
+                                                  random_state=45,
+                                                  verbose=1).fit(X, y)
+
+    cart_halving_grid.best_params_
+    #her turdaki satır sayısı, aday sayısı ve sınıf oranları
+    cart_halving_grid.n_resources_, cart_halving_grid.n_candidates_, cart_halving_grid.class_balance_
+    #arama süresi ve seçilen parametrelerin tüm verideki CV skoru, gridsearch ile yan yana
+    if benchmarks:
+        compare_with_grid(cart_model, cart_params, X, y, cv=5, n_jobs=-1)
+
+    cart_best_grid.best_params_
+    #max depth: 5, min samples split:4 en iyi değerler bunlar çıktı
+
+    #o zaman şimdi en iy değerlere göre en iyi skorlarımıza bakalım
+    cart_best_grid.best_score_
+    #0.75 çıktı best score'da
+    #bu 0,75 ne? scoring ön tanımlı argüman var ön tanımlı değeri accuracy'dir
+    #bunu değiştirmeye gerek yok ama daha sonra gerekirse değiştirirsin
+    #f1 skor yaparsan bunu max depth ve min samples split değiştii
+    #dökümantasyon oku bol bol metodların detayına girr iyidir kardeşşş
+    #biz accuracy'de kaldık devam edicez
+
+    random = X.sample(1, random_state=45)
+
+    cart_best_grid.predict(random)
+
+
+    ################################################
+    # 5. Final Model
+    ################################################
+    section("5. Final Model")
+    #aha aşağıda modelimizi kurduk
+
+    cart_final = DecisionTreeClassifier(**cart_best_grid.best_params_, random_state=17).fit(X, y)
+    #şimdi bi parametrelerimize bakalım
+    cart_final.get_params()
+    #heh tamam gelmiş istediğimiz ön tanımlı değerlerimiz
+
+    #final model oluşturmanın bir yolu budur
+    #bir de bu var;
+    #en iyi parametreleri modele atamak için;
+    #bunu biye gösterdik bu parametreleri daha sonra metodsal fonksiyonel olarak atamamız gerekebilir
+    #napıyoruz böylece aşağıda: var olan bir modeli set_params'ı kullanarak final model yapabiliriz
+
+    cart_final = cart_model.set_params(**cart_best_grid.best_params_).fit(X, y)
+    #büyük veride halving'in kazananı zaten tüm veride fit edilmiş halde geliyor, cart_final yerine kullanılabilir
+    cart_halving_final = cart_halving_grid.best_estimator_
+    #tahminlerin cart_final ile ne kadarı aynı
+    (cart_halving_final.predict(X) == cart_final.predict(X)).mean()
+
+    #şimdi final modelimizin hata skorlarına  cross validate'lebakalım
+    cv_results = cross_validate(cart_final,
+                                X, y,
+                                cv=5,
+                                scoring=["accuracy", "f1", "roc_auc"])
+
+    #aynısı aramanın cache'inden, cross_validate ile aynı sözlük
+    cv_results = cached_cross_validate(cart_final,
+                                       X, y,
+                                       cv=5,
+                                       scoring=["accuracy", "f1", "roc_auc"],
+                                       cache=search_cache)
+    search_cache.hit_rate
+
+    cv_results['test_accuracy'].mean()
+
+    cv_results['test_f1'].mean()
+
+    cv_results['test_roc_auc'].mean()
+    #evet yukarıdakilerin çıktılarından görecez ki ilerleme kaydettik
+
+    #büyük verilerde DecisionTreeClassifier her düğümde her değişkeni yeniden sıralıyor
+    #histogram ağacı değişkenleri bir kere 256 bin'e bölüp düğümlerde sadece sayım yapıyor
+    #fit/predict/predict_proba/feature_importances_ aynı, cart_final yerine kullanılabilir
+    cart_hist_final = HistDecisionTreeClassifier(**cart_best_grid.best_params_, n_jobs=-1).fit(X, y)
+    #sklearn ile kurulan cart_final'la tahminlerin ne kadarı aynı
+    (cart_hist_final.predict(X) == cart_final.predict(X)).mean()
+
+    #sklearn ile aynı parametrelerde cv skorları yan yana
+    parity_check(X, y, cv=5, **cart_best_grid.best_params_)
+
+    #veri büyüdükçe fit süreleri
+    if benchmarks:
+        benchmark_fit(X, y, sizes=(768, 100_000, 1_000_000), **cart_best_grid.best_params_)
+
+    #veri belleğe sığmıyorsa csv'yi parça parça okuyup ağacı seviye seviye kuran akışlı versiyon
+    #memory_budget baytı aşmadan çalışıyor, çıkan model cart_final gibi her yerde kullanılabilir
+    cart_stream_final = StreamingDecisionTreeClassifier(**cart_best_grid.best_params_,
+                                                        memory_budget=64 * 1024 ** 2,
+                                                        target="Outcome").fit("datasets/diabetes.csv")
+    print(export_text(cart_stream_final, feature_names=list(X.columns)))
+
+    #bütçe aşıldı mı, aynı bin'lerle bellek içi fit ile aynı ağaç mı çıktı
+    verify_streaming("datasets/diabetes.csv", memory_budget=8 * 1024 ** 2, **cart_best_grid.best_params_)
+
+
+    ################################################
+    # 6. Feature Importance
+    ################################################
+    section("6. Feature Importance")
+    #değişkenleri sahip olduğu önem sıralamasına göre sıralıcazke
+
+    cart_final.feature_importances_
+    #değişkenlerin önem özelliği yukarıdakini yapınca geldi ama format anlayabileceğimiz düzeyde değil
+    #o zaman öyle  bişey yapalım ki
+    #kıyamadığım serisinden fonksiyon aşağıdaaa!!!!!!
+    #önem sırasına göre sıralar, isimlerini verir ve bize görselleştirir bu çıktıı ooo
+
+    #plot_importance fonksiyonunu dosyanın başında tanımladık, çizim kütüphaneleri orada çağrılınca import ediliyor
+
+
+    plot_importance(cart_final, X, num=5)
+
+    #feature_importances_ impurity tabanlı, çok farklı değer alan Insulin gibi değişkenleri kayırıyor
+    #permutation importance: değişkeni karıştırınca skor ne kadar düşüyor
+    #ağaçta sadece o değişkene bölünen düğümlerden geçen satırlar yeniden dolaşılıyor, sonuç diske cache'leniyor
+    cart_perm_importance = tree_permutation_importance(cart_final, X, y, scoring="roc_auc", n_repeats=10,
+                                                       n_jobs=-1, random_state=45)
+    plot_importance(cart_final, X, importances=cart_perm_importance)
+
+    #sklearn.inspection.permutation_importance ile aynı sonuç mu ve hız farkı
+    verify_importance(cart_final, X, y, scoring="roc_auc", n_repeats=10)
+    if benchmarks:
+        benchmark_importance(cart_final, pd.concat([X] * 100), pd.concat([y] * 100), n_repeats=10)
+
+    ################################################
+    # 7. Analyzing Model Complexity with Learning Curves (BONUS)
+    ################################################
+    section("7. Analyzing Model Complexity with Learning Curves (BONUS)")
+
+    #overfit'e düştüm mü sorusunun cevabı train ve test setinin farklarının ayrışmaya
+    #başladığı noktadır dedik kardeş..
+    #nasıl yakalarım bunu ayrıştığı noktaya bakarız
+    #önüne geçmek için model karmaşıklığı azaltırız böylece önüne geçeriz
+    #model karmaşıklığı metrikleri modellere göre değişir 
+    #yani başka modelde başka hiperparametreler model karmaşıklığı metrikleridir
+    #şimdi validation curve diye metodumuz var 
+    #diyor ki bize final modeli ver kardeş, bağımsız değişkeni, bağımlı değişkeni ver
+    #bir parametre seç ve buna göre öğrenme eğrilerini ver istiyoruz
+    #bu bana numerik çıktılar vericek ben de görselleştiricem
+    #hangi parametre max depth
+    #hangi aralıkta gir
+    #hangi skoru görmek istersin
+    #kaç katlı cross validate atalım girdik
+
+    train_score, test_score = validation_curve(cart_final, X, y,
+                                               param_name="max_depth",
+                                               param_range=range(1, 11),
+                                               scoring="roc_auc",
+                                               cv=10)
+    #şimdi çıktı geldi de tamam nedir bu?
+    #şimdi bize çıktıdan arraylar içerisinde bazı sayılar geldi ne bunlar
+    #bu arraylar 9'uyla train 1'iyle testin cv=10'da sonuçları
+    #bunları nasıl kullanıcaz bu arrayların ortalamasını alarak
+    #model karmaşıklığına ne dedik train ve test hataları görselleştirilir
+    #veee ayrım noktası üzerinden karar vermeye çalışırız
+    mean_train_score = np.mean(train_score, axis=1)
+    mean_test_score = np.mean(test_score, axis=1)
+
+    #aynı eğriyi her fold'da tek ağaç kurup derinliğe göre keserek de alabiliriz 10 kat az fit
+    #eşit kazançlı bölünmeler yüzünden validation_curve ile birebir değil, roc_auc'de birkaç puan sapabilir
+    train_score_path, test_score_path = path_validation_curve(cart_final, X, y,
+                                                              param_name="max_depth",
+                                                              param_range=range(1, 11),
+                                                              scoring="roc_auc",
+                                                              cv=10)
+
+    #bu da bize train test görselini verecek fonksiyon aşaıda
 
-predict_with_rules(x)
+    plt.plot(range(1, 11), mean_train_score,
+             label="Training Score", color='b')
 
-x = [6, 148, 70, 35, 0, 30, 0.62, 50]
+    plt.plot(range(1, 11), mean_test_score,
+             label="Validation Score", color='g')
 
-predict_with_rules(x)
+    plt.title("Validation Curve for CART")
+    plt.xlabel("Number of max_depth")
+    plt.ylabel("AUC")
+    plt.tight_layout()
+    plt.legend(loc='best')
+    plt.show()
+    #çıktı görselinden anlıyoruz ki max derinlik 2 olduğunda başarımız artmaya devam etmiş
+    #3 olduğunda da artmış ama 4'te train test'in başarısı hala artmaya devam ediyor
+    #1'e kadar çıkmış skor ama test skoru düşmüş orada
+    #max derinliği biz zaten seçtik 5 (emin değilim) ama grafikte 3 gibi çıkıyor
+    #olay ne burada; biz model kurarken çok değişkenli olarak değerlendirip seçtik
+    #max derinliği tek başına optimum değeri seçmiyoruz
+    #biz bu görselle bi çıkarım yapıyoruz bakıyoruz nasılmış doğru şeyler yapmış mıyız diye
 
 
 
-################################################
-# 12. Saving and Loading Model
-################################################
+    #val_curve_params fonksiyonu da dosyanın başında
+
+
+    val_curve_params(cart_final, X, y, "max_depth", range(1, 11), scoring="f1")
+
+    cart_val_params = [["max_depth", range(1, 11)], ["min_samples_split", range(2, 20)]]
+
+    for i in range(len(cart_val_params)):
+        val_curve_params(cart_model, X, y, cart_val_params[i][0], cart_val_params[i][1])
+
+    #yukarıdaki döngü her parametreyi sırayla ve tek çekirdekte çalıştırıyor
+    #tüm (parametre, değer, fold) fit'lerini tek seferde process pool'a dağıtabiliriz
+    #X ve y shared memory'de duruyor, eğriler fit'ler bittikçe grafikte güncelleniyor
+    live_plot = LiveCurvePlot(cart_val_params, scoring="roc_auc")
+    curves = parallel_validation_curves(cart_model, X, y, cart_val_params, scoring="roc_auc", cv=10,
+                                        n_jobs=-1, callback=live_plot)
+    live_plot.show()
+
+    #validation_curve ile aynı (n_values, n_folds) dizileri
+    train_score, test_score = curves["max_depth"]
+
+    #sıralı döngüye göre 1..N çekirdekte hızlanma
+    if benchmarks:
+        benchmark_cores(cart_model, X, y, cart_val_params, scoring="roc_auc", cv=10)
+
+
+    #BONUS BİLGİ
+    ################################################
+    # 8. Visualizing the Decision Tree
+    ################################################
+    section("8. Visualizing the Decision Tree")
+
+    # conda install graphviz 
+    # import graphviz
+    #BU YUKARIDAKILERI KUTUPHANE CALISMAZSA DIYE
+
+    #tree_graph fonksiyonu dosyanın başında, pydotplus sadece çağrılınca import ediliyor
+
+    tree_graph(model=cart_final, col_names=X.columns, file_name="cart_final.png")
+    #yukarıda çalıştırdık
+    #çalışma dizinine git yoksa diskten yeniden yükle de çift tıkla ve aç
+    #grafik de bayağı büyük gelicek he
+
+    #budanmamış ağaçlarda (cart_model gibi) export_graphviz + pydotplus + png dakikalar ve gigabaytlar sürüyor
+    #render_tree DOT ya da SVG'yi doğrudan tree_'den satır satır yazıyor, SVG için graphviz bile gerekmiyor
+    #max_depth'ten derini ve min_samples'tan az örnekli alt ağaçlar tek özet düğüme katlanıyor
+    render_tree(cart_model, "cart_model.svg", max_depth=6, min_samples=20,
+                link_pattern="cart_model_subtree_{node}.svg")
+    #özet düğümüne tıklanınca açılacak alt ağaç sadece istenince çiziliyor
+    export_subtree(cart_model, node=1, link_pattern="cart_model_subtree_{node}.svg")
+    render_tree(cart_final, "cart_final.dot")
+
+    #tree_graph ile süre ve bellek karşılaştırması
+    #cart_model 768 satırda birkaç yüz düğüm, render_tree'nin hedefi on binlerce düğüm:
+    #1M satırlık sentetik veride budanmamış ağaç (~430k düğüm) üzerinde ölçüyoruz
+    if benchmarks:
+        cart_big = synthetic_diabetes(1_000_000)
+        cart_big_model = DecisionTreeClassifier(random_state=17).fit(cart_big.drop("Outcome", axis=1),
+                                                                     cart_big["Outcome"])
+        benchmark_render(cart_big_model, prefix="cart_big_render")
+
+    cart_final.get_params()
+
+
+    ################################################
+    # 9. Extracting Decision Rules
+    ################################################
+    section("9. Extracting Decision Rules")
+
+    tree_rules = export_text(cart_final, feature_names=list(X.columns))
+    print(tree_rules)
+    #bu yaptığımız karar kurallarını konsolda gözlemleyebileceğimiz bir tarzda bize sunmuş oldu
+    #dallanmalardan sonra tüm değişkenler tekrar göz önünde bulunduruluyor bu arada
+
+    #export_text sadece metin; her yaprağı değişken başına (alt, üst] sınırlarıyla bir kurala çeviren indeks
+    #sınıf dağılımı ve support da yanında, yoldaki tekrarlı koşullar en dar sınıra inmiş
+    rule_index = RuleIndex(cart_final)
+    rule_index.to_frame()
+
+    #hangi satırda hangi kural çalıştı, milyonlarca satırda da tek seferde
+    rule_index.explain(X).head()
+
+    #Glucose'u 100 ile 150 arasında sınırlanan ve 1 tahmin eden kurallar
+    rule_index.query("Glucose", 100, 150, prediction=1)
+
+    #satır satır decision_path döngüsüne göre hız
+    if benchmarks:
+        benchmark_explain(cart_final, pd.concat([X] * 1000))
+
+
+    ################################################
+    # 10. Extracting Python Codes of Decision Rules
+    ################################################
+    section("10. Extracting Python Codes of Decision Rules")
+    #burada bir karar ağacı yöntemini canlı sisteme entegre edeceğizz
+
+    # eskiden skompile kullanıyorduk ama o sadece sklearn '0.23.1' ile çalışıyor
+    # ve derin ağaçlarda tek parça iç içe ifadesi parser limitine takılıyordu
+    # şimdi kodları tree_'yi kendimiz dolaşarak üretiyoruz, güncel sklearn ile çalışır
+
+    print(to_python(cart_final))
+    #olasılık da döndürsün istersek
+    print(to_python(cart_final, proba=True))
+
+    print(to_sql(cart_final, table="diabetes"))
+
+    print(to_excel(cart_final))
+
+    #her çıktının boyu, satır sayısı, iç içelik derinliği
+    export_report(cart_final)
+
+    #üretilen kodlar eğitim verisinde predict ile aynı sonucu veriyor mu
+    verify_exports(cart_final, X)
+
+    #yukarıda native'de lokalde kullanmak için ihtiyacımız olan kodları çıkarttık
+    #veri tabanının içinde çalışmak her zaman daha iyi 
+    #canlı ortamda nasıl kullanacaz babuş
+    #sql'den çıkmadan işimizi hallediyoruzkee
+
+    #sql'i sadece yazdırmak yetmez, veri tabanının içinde çalıştıralım
+    #csv'yi parça parça sqlite'a yükledik, tüm tabloyu tek INSERT ... SELECT ile skorluyoruz
+    #case: düz CASE ifadesi, interval: her yaprağın aralık tablosu ile join
+    conn = sqlite3.connect(":memory:")
+    load_csv(conn, "datasets/diabetes.csv", table="diabetes")
+
+    score_table(conn, cart_final, table="diabetes", output_table="predictions", strategy="case")
+    (read_predictions(conn)["prediction"].values == cart_final.predict(X)).all()
+
+    score_table(conn, cart_final, table="diabetes", output_table="predictions", strategy="interval")
+    (read_predictions(conn)["prediction"].values == cart_final.predict(X)).all()
+
+    #hangisi hızlı, veriyi pandas'a çekip predict etmekle karşılaştıralım
+    #büyük tablolar için sizes=(768, 100_000, 1_000_000, 10_000_000) ama 10M uzun sürer
+    if benchmarks:
+        benchmark_sqlite(cart_final, X, sizes=(768, 100_000))
+    ################################################
+    # 11. Prediction using Python Codes
+    ################################################
+    section("11. Prediction using Python Codes")
+
+    #predict_with_rules fonksiyonu dosyanın başında, skompile'ın ürettiği ternary
+
+    X.columns
+
+    x = [12, 13, 20, 23, 4, 55, 12, 7]
+
+    predict_with_rules(x)
+
+    x = [6, 148, 70, 35, 0, 30, 0.62, 50]
 
-joblib.dump(cart_final, "cart_final.pkl")
+    predict_with_rules(x)
 
-cart_model_from_disc = joblib.load("cart_final.pkl")
+    #yukarıdaki fonksiyon tek tek satır skorluyor milyonlarca satırda çok yavaş kalır
+    #ağacı tree_'den düz dizilere derleyip tüm matrisi tek seferde skorlayalım
+    compiled_tree = compile_tree(cart_final)
 
-x = [12, 13, 20, 23, 4, 55, 12, 7]
+    (compiled_tree.predict(X) == cart_final.predict(X)).all()
+    (compiled_tree.predict_proba(X) == cart_final.predict_proba(X)).all()
+    #ikisi de True gelmeli sklearn ile birebir aynı sonuçlar
 
-cart_model_from_disc.predict(pd.DataFrame(x).T)
+    compiled_tree.predict([x, [12, 13, 20, 23, 4, 55, 12, 7]])
 
+    #to_python ile ürettiğimiz kod ternary fonksiyondan hızlı mı
+    if benchmarks:
+        benchmark_rules(cart_final, X, rules_func=predict_with_rules)
 
+    #saniyede kaç satır skorlanıyor bi bakalım
+    #predict_with_rules yukarıdaki skompile çıktısı, cart_final ile aynı ağaç değilse sadece hız için bak
+    if benchmarks:
+        benchmark_scoring(cart_final, pd.concat([X] * 100), rules_func=predict_with_rules)
 
 
 
+    ################################################
+    # 12. Saving and Loading Model
+    ################################################
+    section("12. Saving and Loading Model")
 
+    joblib.dump(cart_final, "cart_final.pkl")
 
+    cart_model_from_disc = joblib.load("cart_final.pkl")
 
+    x = [12, 13, 20, 23, 4, 55, 12, 7]
 
+    cart_model_from_disc.predict(pd.DataFrame(x).T)
 
+    #pickle'ı açmak için tüm sklearn'ü import etmek gerekiyor, skorlama worker'ları için ağır
+    #modeli küçük ikili formatta kaydedip numpy.memmap ile kopyasız açabiliriz
+    #düğümler bfs ya da "hot" (sık gidilen yol önce) sırasıyla diziliyor
+    save_model(cart_final, "cart_final.cart", layout="bfs")
 
+    cart_mapped = load_model("cart_final.cart")
 
+    cart_mapped.predict(np.array([x]))
 
+    #diskten açtığımız pickle ile aynı tahminleri veriyor mu
+    (cart_mapped.predict(X) == cart_model_from_disc.predict(X)).all()
 
+    #yükleme süresi, dosya boyu, süreç başına bellek ve batch tahmin hızı
+    if benchmarks:
+        benchmark_format(cart_final, pd.concat([X] * 100), pkl_path="cart_final.pkl", bin_path="cart_final.cart")
 
+    #tek satırlık istekler için cart_server.py: eşzamanlı gelen istekleri kısa bir süre bekletip
+    #tek numpy batch'i olarak skorluyor, python cart.py serve cart_final.cart --port 8080
+    #max_batch_size=1 batch'lemesiz sunucuyla karşılaştırma için
+    if benchmarks:
+        benchmark_server("cart_final.cart", X, n_requests=20000, concurrency=64)
+        benchmark_server("cart_final.cart", X, n_requests=20000, concurrency=64, max_batch_size=1)
+
+    #yeni model çıkarınca sunucuyu yeniden başlatmamak için sürümlü yerel registry
+    #her sürüm cart_registry/versions altında bir .cart dosyası, CURRENT dosyası aktif sürümü gösteriyor
+    #skorlayan süreç (HotModel, ya da python cart.py serve cart_registry) CURRENT'ı izleyip modeli anında değiştiriyor
+    model_registry = ModelRegistry("cart_registry")
+    cart_version = model_registry.publish(cart_final, note="GridSearchCV best params", activate=True)
+
+    cart_hot = HotModel(model_registry).start()
+    cart_hot.predict(np.array([x]))
+
+    #aday modeli gölgede çalıştırıp aynı batch'lerde aktif modelle ne kadar uyuştuğuna ve ek gecikmesine bakabiliriz
+    cart_candidate = DecisionTreeClassifier(max_depth=8, random_state=17).fit(X, y)
+    candidate_version = model_registry.publish(cart_candidate, note="max_depth=8")
+    model_registry.set_shadow(candidate_version)
+    cart_hot.refresh()
+    cart_hot.predict(X)
+    cart_hot.shadow_report()
+
+    #beğenirsek aktif yapıyoruz, beğenmezsek eski sürüm zaten açık, rollback anında
+    model_registry.set_shadow(None)
+    model_registry.activate(candidate_version)
+    cart_hot.refresh()
+    cart_hot.rollback()
+    cart_hot.version == cart_version
+    cart_hot.stop()
+
+    #skorlama sürerken sürüm değiştirmenin batch gecikmesine etkisi ve yanlış modelle skorlanan satır var mı
+    if benchmarks:
+        benchmark_hot_swap([cart_final, cart_candidate], X)
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Decision Tree Classification: CART")
+    subparsers = parser.add_subparsers(dest="command")
+    train_parser = subparsers.add_parser("train", help="run the whole walkthrough (default)")
+    train_parser.add_argument("--profile", action="store_true", help="time each section and fit, write a trace")
+    train_parser.add_argument("--trace", default="cart_trace.json")
+    train_parser.add_argument("--benchmarks", action="store_true", help="also run the slow benchmark_* calls")
+    score_parser = subparsers.add_parser("score", help="score a csv with a saved .cart model")
+    score_parser.add_argument("model")
+    score_parser.add_argument("data")
+    score_parser.add_argument("--proba", action="store_true")
+    serve_parser = subparsers.add_parser("serve", help="serve a saved .cart model or a cart_registry directory over http")
+    serve_parser.add_argument("model")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument("--unix", default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == "score":
+        from cart_score import score_file
+        for value in score_file(args.model, args.data, proba=args.proba):
+            print(value)
+    elif args.command == "serve":
+        from cart_server import main as serve
+        serve([args.model, "--host", args.host, "--port", str(args.port)]
+              + (["--unix", args.unix] if args.unix else []))
+    elif args.command == "train":
+        train(profile=args.profile, trace_path=args.trace, benchmarks=args.benchmarks)
+    else:
+        train()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+################################################
+# Benchmark Suite on Synthetic Diabetes-Schema Data
+################################################
+
+# bir değişikliğin fit'i, aramayı ya da skorlamayı hızlandırıp yavaşlattığını ölçmenin yolu yoktu
+# burada diabetes.csv şemasında (8 sayısal değişken + Outcome) sentetik veri üretip
+# 768, 100k, 1M ve 10M satırda script'in gerçek giriş noktalarını ölçüyoruz:
+#   fit, GridSearchCV(cart_params), cross_validate, predict, predict_with_rules, joblib.load, export
+# skompile artık projede yok, export ölçümü yerli üreticiyle (cart_codegen.to_python / to_sql)
+# pahalı adımlar büyük boyutlarda max_rows ile sınırlanıyor, sınırı aşan hücreler "skipped" olarak yazılıyor
+# predict_with_rules satır satır python, o yüzden en fazla RULES_ROWS satırda ölçülüp rows/sec veriliyor
+# joblib_load ve export satır sayısıyla değil ağaç boyuyla ölçekleniyor, onlar için sadece saniye yazılıyor
+#
+# python cart_bench.py run --sizes 768 100000 --output bench_before.json
+# python cart_bench.py compare bench_before.json bench_after.json --threshold 0.10
+# compare, süresi eşikten fazla uzayan hücreleri işaretliyor ve varsa 1 ile çıkıyor
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+SIZES = (768, 100_000, 1_000_000, 10_000_000)
+CART_PARAMS = {"max_depth": range(1, 11), "min_samples_split": range(2, 20)}
+FINAL_PARAMS = {"max_depth": 5, "min_samples_split": 4}
+RULES_ROWS = 100_000
+THRESHOLD = 0.10
+
+# diabetes.csv kolonları: (sıfır olmayan değerlerin ortalaması, standart sapması, alt, üst, tamsayı mı, sıfır oranı)
+# sıfırlar orijinal verideki eksik değer kodları gibi
+SCHEMA = {"Pregnancies": (3.8, 3.4, 0, 17, True, 0.0),
+          "Glucose": (121.7, 30.5, 44, 199, True, 0.01),
+          "BloodPressure": (72.4, 12.4, 24, 122, True, 0.05),
+          "SkinThickness": (29.2, 10.5, 7, 99, True, 0.30),
+          "Insulin": (155.5, 118.8, 14, 846, True, 0.49),
+          "BMI": (32.5, 6.9, 18.2, 67.1, False, 0.01),
+          "DiabetesPedigreeFunction": (0.47, 0.33, 0.078, 2.42, False, 0.0),
+          "Age": (33.2, 11.8, 21, 81, True, 0.0)}
+TARGET = "Outcome"
+
+# her ölçümün üst satır sınırı; None sınırsız
+MAX_ROWS = {"fit": None, "grid_search": 100_000, "cross_validate": 1_000_000, "predict": None,
+            "predict_with_rules": None, "joblib_load": None, "export": None}
+
+
+def synthetic_diabetes(n_rows, random_state=45):
+    # değişkenler kendi aralığına kırpılmış normal dağılımdan, Outcome Glucose, BMI, Age ve DPF'ye bağlı lojistik
+    # (orijinaldeki gibi ~%35 pozitif)
+    rng = np.random.default_rng(random_state)
+    data = {}
+    for name, (mean, std, low, high, integer, zero_rate) in SCHEMA.items():
+        values = np.clip(rng.normal(mean, std, n_rows), low, high)
+        if integer:
+            values = np.round(values)
+        if zero_rate:
+            values[rng.random(n_rows) < zero_rate] = 0
+        data[name] = values.astype(np.int64) if integer else np.round(values, 3)
+    frame = pd.DataFrame(data)
+    logit = (0.035 * (frame["Glucose"] - 120) + 0.08 * (frame["BMI"] - 32) + 0.03 * (frame["Age"] - 33)
+             + 0.9 * (frame["DiabetesPedigreeFunction"] - 0.47) - 0.75)
+    frame[TARGET] = (rng.random(n_rows) < 1 / (1 + np.exp(-logit))).astype(np.int64)
+    return frame
+
+
+def _case_fit(X, y, context):
+    from sklearn.tree import DecisionTreeClassifier
+
+    DecisionTreeClassifier(random_state=17).fit(X, y)
+    return len(X)
+
+
+def _case_grid_search(X, y, context):
+    from sklearn.model_selection import GridSearchCV
+    from sklearn.tree import DecisionTreeClassifier
+
+    GridSearchCV(DecisionTreeClassifier(random_state=17), CART_PARAMS, cv=5, n_jobs=-1).fit(X, y)
+    return len(X)
+
+
+def _case_cross_validate(X, y, context):
+    from sklearn.model_selection import cross_validate
+
+    cross_validate(context["model"], X, y, cv=5, scoring=["accuracy", "f1", "roc_auc"])
+    return len(X)
+
+
+def _case_predict(X, y, context):
+    context["model"].predict(X)
+    return len(X)
+
+
+def _case_predict_with_rules(X, y, context):
+    from cart import predict_with_rules
+
+    rows = X.iloc[:RULES_ROWS].to_numpy().tolist()
+    for row in rows:
+        predict_with_rules(row)
+    return len(rows)
+
+
+def _case_joblib_load(X, y, context):
+    import joblib
+
+    joblib.load(context["pkl_path"])
+    # satır işlemiyor, rows/sec anlamsız
+    return None
+
+
+def _case_export(X, y, context):
+    from cart_codegen import to_python, to_sql
+
+    to_python(context["model"])
+    to_sql(context["model"])
+    return None
+
+
+CASES = {"fit": _case_fit,
+         "grid_search": _case_grid_search,
+         "cross_validate": _case_cross_validate,
+         "predict": _case_predict,
+         "predict_with_rules": _case_predict_with_rules,
+         "joblib_load": _case_joblib_load,
+         "export": _case_export}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def environment():
+    import sklearn
+
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "sklearn": sklearn.__version__, "platform": platform.platform(), "cpu_count": os.cpu_count(),
+            "commit": _git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def run_suite(sizes=SIZES, cases=None, n_repeat=3, max_rows=None, random_state=45, verbose=True):
+    # her (ölçüm, boyut) hücresi için n_repeat tekrarın en hızlısı
+    import joblib
+    from sklearn.tree import DecisionTreeClassifier
+
+    cases = list(CASES) if cases is None else list(cases)
+    limits = {**MAX_ROWS, **(max_rows or {})}
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            frame = synthetic_diabetes(size, random_state=random_state)
+            X, y = frame.drop(TARGET, axis=1), frame[TARGET]
+            model = DecisionTreeClassifier(random_state=17, **FINAL_PARAMS).fit(X, y)
+            context = {"model": model, "pkl_path": os.path.join(tmp, "cart_final.pkl")}
+            joblib.dump(model, context["pkl_path"])
+            for case in cases:
+                row = {"case": case, "rows": size}
+                if limits.get(case) is not None and size > limits[case]:
+                    results.append({**row, "skipped": True})
+                    continue
+                best, rows_timed = float("inf"), None
+                for _ in range(n_repeat):
+                    start = time.perf_counter()
+                    rows_timed = CASES[case](X, y, context)
+                    best = min(best, time.perf_counter() - start)
+                results.append({**row, "skipped": False, "seconds": best, "rows_timed": rows_timed,
+                                "rows_per_sec": None if rows_timed is None else rows_timed / best,
+                                "repeats": n_repeat})
+                if verbose:
+                    print(f"{case:<20} {size:>10} rows  {best:10.4f} s")
+    return {"environment": environment(), "results": results}
+
+
+def write_results(results, path):
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2)
+    return path
+
+
+def load_results(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    # hız (baseline süresi / şimdiki süre) eşikten fazla düşmüşse regression; iki tarafta da ölçülmüş hücreler
+    # aynı hücrede işlenen satır sayısı sabit, süre oranı rows/sec oranıyla aynı ve satırla ölçeklenmeyen
+    # joblib_load ve export için de geçerli
+    baseline = load_results(baseline) if isinstance(baseline, str) else baseline
+    current = load_results(current) if isinstance(current, str) else current
+    before = {(row["case"], row["rows"]): row for row in baseline["results"] if not row.get("skipped")}
+    rows = []
+    for row in current["results"]:
+        key = (row["case"], row["rows"])
+        if row.get("skipped") or key not in before:
+            continue
+        ratio = before[key]["seconds"] / row["seconds"]
+        rows.append({"case": row["case"], "rows": row["rows"],
+                     "baseline_seconds": before[key]["seconds"], "current_seconds": row["seconds"],
+                     "change": ratio - 1, "regression": ratio < 1 - threshold})
+    return pd.DataFrame(rows, columns=["case", "rows", "baseline_seconds", "current_seconds", "change", "regression"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CART benchmark suite")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and write a json file")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    run_parser.add_argument("--cases", nargs="+", choices=list(CASES), default=None)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--output", default="cart_bench.json")
+    compare_parser = subparsers.add_parser("compare", help="flag regressions between two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        write_results(run_suite(sizes=args.sizes, cases=args.cases, n_repeat=args.repeat), args.output)
+        print(f"results written to {args.output}")
+        return 0
+    report = compare(args.baseline, args.current, threshold=args.threshold)
+    print(report.to_string(index=False))
+    return 1 if report["regression"].any() else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
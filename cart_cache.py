@@ -0,0 +1,260 @@
+################################################
+# Resumable, Disk-Cached Hyperparameter Search
+################################################
+
+# script her çalıştığında GridSearchCV ve cross_validate tüm fit'leri baştan yapıyordu
+# veri de aday da değişmemiş olsa bile; yarıda kesilen bir arama da tüm işini kaybediyordu
+# burada her (veri hash'i, estimator parametreleri, fold) hücresinin skorlarını ve sürelerini
+# diskte küçük bir sqlite dosyasında tutuyoruz
+# her hücre biter bitmez yazılıyor, çöken arama kaldığı yerden devam ediyor
+# cart_params genişleyince sadece yeni hücreler hesaplanıyor
+# dosya max_bytes'ı geçince en uzun süredir kullanılmayan hücreler siliniyor (LRU)
+#
+# aynı hücreye farklı metriklerle gelinirse (GridSearchCV accuracy, cross_validate accuracy/f1/roc_auc)
+# eksik metrikler için hücre yeniden hesaplanıp metrikler birleştirilerek saklanıyor
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, check_cv
+from sklearn.utils import _safe_indexing
+
+from cart_search import build_cv_results
+
+CACHE_PATH = os.path.join(".cache", "search.sqlite")
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def data_fingerprint(X, y):
+    # kolon kolon hash'liyoruz, DataFrame'i tek matrise kopyalamaya gerek yok
+    digest = hashlib.sha1()
+    columns = [X[name].to_numpy() for name in X.columns] if hasattr(X, "columns") else [np.asarray(X)]
+    if hasattr(X, "columns"):
+        digest.update(json.dumps([str(name) for name in X.columns]).encode())
+    for array in columns + [np.asarray(y)]:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        if array.dtype.hasobject:
+            # object dizisinin belleğinde değerler değil pointer'lar var, değerleri pandas ile hash'liyoruz
+            array = pd.util.hash_pandas_object(pd.Series(array.ravel()), index=False).to_numpy()
+        digest.update(array.data)
+    return digest.hexdigest()
+
+
+def cell_key(data_hash, estimator, params, fold, train, test):
+    model = clone(estimator).set_params(**params)
+    description = {"data": data_hash,
+                   "estimator": f"{type(model).__module__}.{type(model).__qualname__}",
+                   "params": {name: repr(value) for name, value in sorted(model.get_params().items())},
+                   "fold": fold,
+                   # fold indeksi tek başına yetmez, farklı cv nesneleri farklı bölme üretebilir
+                   "split": hashlib.sha1(np.asarray(train).tobytes() + b"|" + np.asarray(test).tobytes()).hexdigest()}
+    return hashlib.sha1(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+
+class SearchCache:
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS cells (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                                "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS cells_last_used ON cells (last_used)")
+        self.connection.commit()
+        self.total_bytes = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM cells").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM cells").fetchone()[0]
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def reset_stats(self):
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        row = self.connection.execute("SELECT value FROM cells WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.connection.execute("UPDATE cells SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        data = json.dumps(value)
+        old = self.connection.execute("SELECT size FROM cells WHERE key = ?", (key,)).fetchone()
+        self.connection.execute("INSERT OR REPLACE INTO cells VALUES (?, ?, ?, ?)",
+                                (key, data, len(data), time.time()))
+        self.total_bytes += len(data) - (old[0] if old else 0)
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+        self.connection.commit()
+
+    def _evict(self):
+        # en eski kullanılandan başlayıp bütçenin altına inene kadar siliyoruz
+        evicted = []
+        for key, size in self.connection.execute("SELECT key, size FROM cells ORDER BY last_used"):
+            if self.total_bytes <= self.max_bytes:
+                break
+            evicted.append((key,))
+            self.total_bytes -= size
+        self.connection.executemany("DELETE FROM cells WHERE key = ?", evicted)
+
+    def commit(self):
+        self.connection.commit()
+
+    def clear(self):
+        self.connection.execute("DELETE FROM cells")
+        self.connection.commit()
+        self.total_bytes = 0
+
+    def close(self):
+        self.connection.close()
+
+
+def _metric_names(scoring):
+    # (çıktı adı, metrik adı); scoring verilmezse sınıflandırıcının score'u yani accuracy
+    if scoring is None:
+        return [("score", "accuracy")]
+    if isinstance(scoring, str):
+        return [("score", scoring)]
+    return [(name, name) for name in scoring]
+
+
+def _fit_and_score(estimator, params, X, y, train, test, metrics, return_train_score):
+    model = clone(estimator).set_params(**params)
+    start = time.perf_counter()
+    model.fit(_safe_indexing(X, train), _safe_indexing(y, train))
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    X_test, y_test = _safe_indexing(X, test), _safe_indexing(y, test)
+    result = {"fit_time": fit_time,
+              "test": {metric: float(get_scorer(metric)(model, X_test, y_test)) for metric in metrics}}
+    result["score_time"] = time.perf_counter() - start
+    if return_train_score:
+        X_train, y_train = _safe_indexing(X, train), _safe_indexing(y, train)
+        result["train"] = {metric: float(get_scorer(metric)(model, X_train, y_train)) for metric in metrics}
+    return result
+
+
+def _covers(value, metrics, return_train_score):
+    return (value is not None and all(metric in value["test"] for metric in metrics)
+            and (not return_train_score or all(metric in value.get("train", {}) for metric in metrics)))
+
+
+def run_cells(estimator, X, y, candidates, splits, metrics, return_train_score=False, n_jobs=None,
+              cache=None, verbose=0):
+    # results[aday][fold] sözlükleri ve bu çalışmanın (hit, miss) sayıları
+    cache = SearchCache() if cache is None else cache
+    data_hash = data_fingerprint(X, y)
+    results = [[None] * len(splits) for _ in candidates]
+    cached, pending = {}, []
+    for c, params in enumerate(candidates):
+        for f, (train, test) in enumerate(splits):
+            key = cell_key(data_hash, estimator, params, f, train, test)
+            value = cache.get(key)
+            if _covers(value, metrics, return_train_score):
+                results[c][f] = value
+            else:
+                cached[(c, f)] = (key, value)
+                pending.append((c, f))
+    cache.commit()
+    hits, misses = len(candidates) * len(splits) - len(pending), len(pending)
+    cache.hits += hits
+    cache.misses += misses
+    if verbose:
+        print(f"{hits} of {hits + misses} cells cached, fitting {misses}")
+
+    def run(c, f):
+        train, test = splits[f]
+        return c, f, _fit_and_score(estimator, candidates[c], X, y, train, test, metrics, return_train_score)
+
+    # sonuçlar bittikçe geliyor ve hemen diske yazılıyor, yarıda kesilse de bitenler kalıyor
+    for c, f, value in Parallel(n_jobs=n_jobs, return_as="generator_unordered")(
+            delayed(run)(c, f) for c, f in pending):
+        key, old = cached[(c, f)]
+        if old is not None:
+            value["test"] = {**old["test"], **value["test"]}
+            if "train" in old or "train" in value:
+                value["train"] = {**old.get("train", {}), **value.get("train", {})}
+        cache.put(key, value)
+        results[c][f] = value
+    return results, hits, misses
+
+
+class CachedGridSearchCV:
+
+    def __init__(self, estimator, param_grid, scoring=None, cv=5, n_jobs=None, refit=True, verbose=0,
+                 cache=None):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.refit = refit
+        self.verbose = verbose
+        self.cache = cache
+
+    def fit(self, X, y):
+        candidates = list(ParameterGrid(self.param_grid))
+        splits = list(check_cv(self.cv, y, classifier=is_classifier(self.estimator)).split(X, y))
+        metric = _metric_names(self.scoring)[0][1]
+        if self.verbose:
+            print(f"Fitting {len(splits)} folds for each of {len(candidates)} candidates, "
+                  f"totalling {len(splits) * len(candidates)} fits")
+        results, hits, misses = run_cells(self.estimator, X, y, candidates, splits, [metric],
+                                          n_jobs=self.n_jobs, cache=self.cache, verbose=self.verbose)
+        self.cache_hits_, self.cache_misses_ = hits, misses
+        self.cache_hit_rate_ = hits / (hits + misses)
+
+        self.cv_results_ = build_cv_results(candidates,
+                                            np.array([[cell["test"][metric] for cell in row] for row in results]),
+                                            np.array([[cell["fit_time"] for cell in row] for row in results]),
+                                            np.array([[cell["score_time"] for cell in row] for row in results]))
+        self.best_index_ = int(np.argmin(self.cv_results_["rank_test_score"]))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = self.cv_results_["mean_test_score"][self.best_index_]
+        self.n_splits_ = len(splits)
+
+        if self.refit:
+            start = time.perf_counter()
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+            self.refit_time_ = time.perf_counter() - start
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X):
+        return self.best_estimator_.predict_proba(X)
+
+
+def cached_cross_validate(estimator, X, y, cv=5, scoring=None, return_train_score=False, n_jobs=None,
+                          cache=None, verbose=0):
+    # cross_validate ile aynı sözlük: fit_time, score_time, test_<metrik> (tek metrikte test_score)
+    splits = list(check_cv(cv, y, classifier=is_classifier(estimator)).split(X, y))
+    names = _metric_names(scoring)
+    results, _, _ = run_cells(estimator, X, y, [{}], splits, [metric for _, metric in names],
+                              return_train_score=return_train_score, n_jobs=n_jobs, cache=cache, verbose=verbose)
+    cells = results[0]
+    output = {"fit_time": np.array([cell["fit_time"] for cell in cells]),
+              "score_time": np.array([cell["score_time"] for cell in cells])}
+    for name, metric in names:
+        output[f"test_{name}"] = np.array([cell["test"][metric] for cell in cells])
+        if return_train_score:
+            output[f"train_{name}"] = np.array([cell["train"][metric] for cell in cells])
+    return output
@@ -0,0 +1,245 @@
+################################################
+# Extracting Python/SQL/Excel Codes of Decision Rules without skompile
+################################################
+
+# skompile sadece sklearn 0.23.1 ile çalışıyor ve tek bir iç içe ifade üretiyor
+# derin ağaçlarda bu ifade Python parser'ının recursion limitine takılıyor
+# burada fit edilmiş ağacın tree_ nesnesini kendimiz dolaşıp kod üretiyoruz:
+# python: erken return'lü if blokları, çok derin dallar ayrı fonksiyonlara bölünür
+# sql: her yaprak için tek bir WHEN, iç içe CASE yok
+# excel: iç içe IF formülü (excel'in 64 seviye sınırını raporda gösteriyoruz)
+
+import sqlite3
+import time
+
+import numpy as np
+
+# bir python fonksiyonunun içinde en fazla bu kadar iç içe if açıyoruz, sonrası yeni fonksiyon
+MAX_NESTING = 32
+
+# excel formüllerinin sınırları
+EXCEL_MAX_NESTING = 64
+EXCEL_MAX_CHARS = 8192
+
+
+def _leaf_output(model, node, proba):
+    value = model.tree_.value[node, 0]
+    if proba:
+        return repr([float(v) for v in value / value.sum()])
+    return repr(model.classes_[int(np.argmax(value))].item())
+
+
+def feature_names_of(model, feature_names=None):
+    if feature_names is not None:
+        return list(feature_names)
+    if hasattr(model, "feature_names_in_"):
+        return list(model.feature_names_in_)
+    return [f"x{i}" for i in range(model.tree_.n_features)]
+
+
+def to_python(model, func_name="predict_with_rules", proba=False, max_nesting=MAX_NESTING):
+    # girdi x, predict_with_rules'taki gibi özellik sırasına göre indekslenen bir satır
+    tree = model.tree_
+    left, right = tree.children_left, tree.children_right
+    lines = []
+    pending = [(func_name, 0)]
+    while pending:
+        name, root = pending.pop(0)
+        lines.append(f"def {name}(x):")
+        # (düğüm, girinti) yığını; önce sol dal yazılır, sağ dal if bloğundan sonra gelir
+        stack = [(root, 1)]
+        while stack:
+            node, level = stack.pop()
+            indent = "    " * level
+            if left[node] < 0:
+                lines.append(f"{indent}return {_leaf_output(model, node, proba)}")
+            elif level > max_nesting:
+                helper = f"_{func_name}_node_{node}"
+                pending.append((helper, node))
+                lines.append(f"{indent}return {helper}(x)")
+            else:
+                lines.append(f"{indent}if x[{tree.feature[node]}] <= {float(tree.threshold[node])!r}:")
+                stack.append((right[node], level))
+                stack.append((left[node], level + 1))
+        lines.append("")
+        lines.append("")
+    return "\n".join(lines[:-1])
+
+
+def leaf_bounds(model):
+    # her yaprak için kökten gelen yoldaki koşulları özellik bazında en dar alt/üst sınıra indiriyoruz
+    tree = model.tree_
+    n_features = tree.n_features
+    stack = [(0, np.full(n_features, -np.inf), np.full(n_features, np.inf))]
+    while stack:
+        node, lower, upper = stack.pop()
+        if tree.children_left[node] < 0:
+            yield node, lower, upper
+            continue
+        feature, threshold = tree.feature[node], tree.threshold[node]
+        left_upper = upper.copy()
+        left_upper[feature] = min(upper[feature], threshold)
+        right_lower = lower.copy()
+        right_lower[feature] = max(lower[feature], threshold)
+        stack.append((tree.children_right[node], right_lower, upper))
+        stack.append((tree.children_left[node], lower, left_upper))
+
+
+def _sql_conditions(lower, upper, names):
+    conditions = []
+    for i, name in enumerate(names):
+        if lower[i] > -np.inf:
+            conditions.append(f'"{name}" > {float(lower[i])!r}')
+        if upper[i] < np.inf:
+            conditions.append(f'"{name}" <= {float(upper[i])!r}')
+    return " AND ".join(conditions) or "1"
+
+
+def to_sql_case(model, feature_names=None, proba_class=None):
+    # proba_class verilirse o sınıfın olasılığını, verilmezse tahmin edilen sınıfı döndüren CASE
+    names = feature_names_of(model, feature_names)
+    whens = []
+    for node, lower, upper in leaf_bounds(model):
+        value = model.tree_.value[node, 0]
+        if proba_class is None:
+            output = repr(model.classes_[int(np.argmax(value))].item())
+        else:
+            class_index = list(model.classes_).index(proba_class)
+            output = repr(float(value[class_index] / value.sum()))
+        whens.append(f"    WHEN {_sql_conditions(lower, upper, names)} THEN {output}")
+    return "CASE\n" + "\n".join(whens) + "\nEND"
+
+
+def to_sql(model, table="data", feature_names=None, proba=False):
+    columns = [to_sql_case(model, feature_names) + " AS prediction"]
+    if proba:
+        columns += [to_sql_case(model, feature_names, proba_class=c) + f' AS "proba_{c}"'
+                    for c in model.classes_]
+    return "SELECT\n" + ",\n".join(columns) + f'\nFROM "{table}"'
+
+
+def _excel_column(index):
+    letters = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        letters = chr(ord("A") + rest) + letters
+    return letters
+
+
+def to_excel(model, row=2):
+    # özellikler X'teki sırayla A, B, C... sütunlarında, veriler de row. satırda duruyor
+    tree = model.tree_
+    left, right = tree.children_left, tree.children_right
+    # iç içe IF'i string birleştirmeyle değil, dolaşım sırasına göre parça listesiyle kuruyoruz
+    parts = []
+    stack = [("node", 0)]
+    while stack:
+        kind, item = stack.pop()
+        if kind == "text":
+            parts.append(item)
+        elif left[item] < 0:
+            parts.append(_leaf_output(model, item, proba=False))
+        else:
+            cell = f"{_excel_column(tree.feature[item])}{row}"
+            parts.append(f"IF({cell}<={float(tree.threshold[item])!r},")
+            stack += [("text", ")"), ("node", right[item]), ("text", ","), ("node", left[item])]
+    return "=" + "".join(parts)
+
+
+def _nesting(code, opener, closer):
+    depth = max_depth = 0
+    for char in code:
+        if char == opener:
+            depth += 1
+            max_depth = max(max_depth, depth)
+        elif char == closer:
+            depth -= 1
+    return max_depth
+
+
+def export_report(model, feature_names=None):
+    # her çıktı formatı için boyut ve derinlik bilgisi
+    python_code = to_python(model)
+    sql_code = to_sql(model, feature_names=feature_names)
+    excel_code = to_excel(model)
+    python_lines = python_code.splitlines()
+    return {
+        "tree": {"depth": int(model.get_depth()), "n_leaves": int(model.get_n_leaves())},
+        "python": {"chars": len(python_code),
+                   "lines": len(python_lines),
+                   "functions": sum(line.startswith("def ") for line in python_lines),
+                   "max_nesting": max((len(line) - len(line.lstrip())) // 4 for line in python_lines)},
+        "sql": {"chars": len(sql_code),
+                "when_clauses": sql_code.count("WHEN "),
+                "max_nesting": 1},
+        "excel": {"chars": len(excel_code),
+                  "max_nesting": _nesting(excel_code, "(", ")"),
+                  "fits_limits": (len(excel_code) <= EXCEL_MAX_CHARS
+                                  and _nesting(excel_code, "(", ")") <= EXCEL_MAX_NESTING)},
+    }
+
+
+def load_python(code, func_name="predict_with_rules"):
+    namespace = {}
+    exec(compile(code, "<cart_codegen>", "exec"), namespace)
+    return namespace[func_name]
+
+
+def _excel_predict(formula, rows, row=2):
+    # formülü python ifadesine çevirip her satır için hücre değerleriyle hesaplıyoruz
+    # sadece doğrulama için, excel'in kendi sınırlarını aşan formüllerde kullanılmamalı
+    def IF(condition, when_true, when_false):
+        return when_true if condition else when_false
+
+    expression = compile(formula.lstrip("="), "<excel>", "eval")
+    cells = [f"{_excel_column(i)}{row}" for i in range(rows.shape[1])]
+    predictions = []
+    for values in rows.tolist():
+        namespace = {"IF": IF}
+        namespace.update(zip(cells, values))
+        predictions.append(eval(expression, namespace))
+    return np.array(predictions)
+
+
+def verify_exports(model, X):
+    # üretilen her kodun X üzerinde model.predict ile aynı sonucu verdiğini kontrol ediyoruz
+    # sklearn float32 ile karşılaştırdığı için satırları float32'den geçiriyoruz
+    X_np = np.asarray(X, dtype=np.float32).astype(np.float64)
+    expected = model.predict(X)
+    names = feature_names_of(model)
+    results = {}
+
+    predict = load_python(to_python(model))
+    results["python"] = bool(np.array_equal([predict(row) for row in X_np.tolist()], expected))
+
+    connection = sqlite3.connect(":memory:")
+    columns = ", ".join(f'"{name}" REAL' for name in names)
+    connection.execute(f'CREATE TABLE "data" ({columns})')
+    connection.executemany(f'INSERT INTO "data" VALUES ({", ".join("?" * len(names))})', X_np.tolist())
+    sql_predictions = [row[0] for row in connection.execute(to_sql(model))]
+    connection.close()
+    results["sql"] = bool(np.array_equal(sql_predictions, expected))
+
+    formula = to_excel(model)
+    if _nesting(formula, "(", ")") <= EXCEL_MAX_NESTING:
+        results["excel"] = bool(np.array_equal(_excel_predict(formula, X_np), expected))
+    return results
+
+
+def benchmark_rules(model, X, rules_func=None, n_repeat=3):
+    # üretilen python kodu ile (varsa) skompile ternary fonksiyonunu satır/saniye olarak karşılaştırıyoruz
+    rows = np.asarray(X, dtype=np.float32).astype(np.float64).tolist()
+    scorers = {"generated": load_python(to_python(model))}
+    if rules_func is not None:
+        scorers["ternary"] = rules_func
+    results = {}
+    for name, scorer in scorers.items():
+        best = float("inf")
+        for _ in range(n_repeat):
+            start = time.perf_counter()
+            for row in rows:
+                scorer(row)
+            best = min(best, time.perf_counter() - start)
+        results[name] = len(rows) / best
+    return results
@@ -0,0 +1,185 @@
+################################################
+# Parallel Validation Curves over Shared Memory
+################################################
+
+# val_curve_params her parametre için validation_curve'ü ayrı ayrı ve tek çekirdekte çağırıyordu
+# burada tüm (parametre, değer, fold) fit'lerini tek seferde bir process pool'a dağıtıyoruz
+# X ve y bir kere shared memory'e kopyalanıyor, worker'lar görevlerde sadece indeks alıyor,
+# veriyi her görevde pickle'lamıyoruz
+# sonuçlar bittikçe geliyor, callback ile grafik eğriler doldukça güncellenebiliyor
+# dönen train/test skor dizileri validation_curve ile aynı: (n_values, n_folds)
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import check_cv, validation_curve
+
+
+def _to_shared(array):
+    array = np.ascontiguousarray(array)
+    if array.dtype.hasobject:
+        # object dizisinde bellekte sadece pointer'lar var, başka süreçte anlamsız
+        raise TypeError("object arrays cannot be shared between processes; convert them to a numeric dtype first")
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    # worker'lar ana sürecin resource tracker'ını paylaşıyor, bloğu sadece ana süreç unlink ediyor
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+# worker sürecinde bir kere kuruluyor
+_worker = {}
+
+
+def _init_worker(x_spec, y_spec, columns, estimator, scoring, splits):
+    x_block, X = _attach(x_spec)
+    y_block, y = _attach(y_spec)
+    if columns is not None:
+        # tek dtype'lı matristen kopyasız DataFrame, feature_names_in_ aynı kalsın diye
+        X = pd.DataFrame(X, columns=columns, copy=False)
+    _worker.update(blocks=(x_block, y_block), X=X, y=y, estimator=estimator,
+                   scorer=check_scoring(estimator, scoring=scoring), splits=splits)
+
+
+def _take(X, rows):
+    return X.iloc[rows] if hasattr(X, "iloc") else X[rows]
+
+
+def _fit_and_score(param_name, value, fold):
+    X, y = _worker["X"], _worker["y"]
+    train, test = _worker["splits"][fold]
+    model = clone(_worker["estimator"]).set_params(**{param_name: value})
+    start = time.perf_counter()
+    model.fit(_take(X, train), y[train])
+    fit_time = time.perf_counter() - start
+    scorer = _worker["scorer"]
+    return {"train_score": scorer(model, _take(X, train), y[train]),
+            "test_score": scorer(model, _take(X, test), y[test]),
+            "fit_time": fit_time}
+
+
+def iter_validation_curves(estimator, X, y, params, scoring=None, cv=5, n_jobs=None):
+    # params: [(param_name, param_range), ...], cart_val_params ile aynı biçim
+    # her biten fit için (param_name, value_index, fold, sonuç) döndürüyor, sıra bitiş sırası
+    n_jobs = os.cpu_count() if n_jobs is None or n_jobs < 0 else n_jobs
+    y = np.asarray(y)
+    if y.dtype.hasobject:
+        # string etiketler sabit genişlikli unicode diziye çevrilince paylaşılabiliyor
+        y = np.asarray(y.tolist())
+    splits = list(check_cv(cv, y, classifier=is_classifier(estimator)).split(X, y))
+    columns = list(X.columns) if hasattr(X, "columns") else None
+    # sayısal olmayan sütunlar burada ValueError veriyor, paylaşılan bellek hep float64
+    x_block, x_spec = _to_shared(np.asarray(X, dtype=np.float64))
+    y_block, y_spec = _to_shared(y)
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(x_spec, y_spec, columns, estimator, scoring, splits)) as pool:
+            futures = {pool.submit(_fit_and_score, name, value, fold): (name, index, value, fold)
+                       for name, param_range in params
+                       for index, value in enumerate(param_range)
+                       for fold in range(len(splits))}
+            for future in as_completed(futures):
+                name, index, value, fold = futures[future]
+                yield dict(param_name=name, value_index=index, value=value, fold=fold, **future.result())
+    finally:
+        for block in (x_block, y_block):
+            block.close()
+            block.unlink()
+
+
+def parallel_validation_curves(estimator, X, y, params, scoring=None, cv=5, n_jobs=None, callback=None):
+    # {param_name: (train_scores, test_scores)} döndürüyor, diziler validation_curve ile aynı şekilde
+    n_splits = check_cv(cv, y, classifier=is_classifier(estimator)).get_n_splits(X, y)
+    curves = {name: (np.full((len(param_range), n_splits), np.nan), np.full((len(param_range), n_splits), np.nan))
+              for name, param_range in params}
+    for result in iter_validation_curves(estimator, X, y, params, scoring=scoring, cv=cv, n_jobs=n_jobs):
+        train_scores, test_scores = curves[result["param_name"]]
+        train_scores[result["value_index"], result["fold"]] = result["train_score"]
+        test_scores[result["value_index"], result["fold"]] = result["test_score"]
+        if callback is not None:
+            callback(result)
+    return curves
+
+
+class LiveCurvePlot:
+    # parallel_validation_curves'a callback olarak verilince her parametre için bir grafik açıp
+    # o ana kadar biten fold'ların ortalamasıyla eğrileri güncelliyor
+
+    def __init__(self, params, scoring="score", title="CART", redraw_every=10):
+        from matplotlib import pyplot as plt
+
+        self.plt = plt
+        self.params = {name: list(param_range) for name, param_range in params}
+        self.scoring = scoring
+        self.redraw_every = redraw_every
+        self.n_results = 0
+        self.sums = {name: np.zeros((2, len(values))) for name, values in self.params.items()}
+        self.counts = {name: np.zeros(len(values)) for name, values in self.params.items()}
+        plt.ion()
+        self.figure, axes = plt.subplots(1, len(self.params), figsize=(6 * len(self.params), 4), squeeze=False)
+        self.lines = {}
+        for ax, name in zip(axes[0], self.params):
+            train_line, = ax.plot([], [], label="Training Score", color='b', marker='.')
+            test_line, = ax.plot([], [], label="Validation Score", color='g', marker='.')
+            ax.set_title(f"Validation Curve for {title}")
+            ax.set_xlabel(f"Number of {name}")
+            ax.set_ylabel(scoring)
+            ax.legend(loc='best')
+            self.lines[name] = (ax, train_line, test_line)
+
+    def __call__(self, result):
+        name, index = result["param_name"], result["value_index"]
+        self.sums[name][:, index] += (result["train_score"], result["test_score"])
+        self.counts[name][index] += 1
+        self.n_results += 1
+        if self.n_results % self.redraw_every == 0:
+            self.redraw()
+
+    def redraw(self):
+        for name, (ax, train_line, test_line) in self.lines.items():
+            done = self.counts[name] > 0
+            values = np.array(self.params[name])[done]
+            means = self.sums[name][:, done] / self.counts[name][done]
+            train_line.set_data(values, means[0])
+            test_line.set_data(values, means[1])
+            ax.relim()
+            ax.autoscale_view()
+        self.figure.tight_layout()
+        self.plt.pause(0.001)
+
+    def show(self):
+        self.redraw()
+        self.plt.ioff()
+        self.plt.show(block=True)
+
+
+def benchmark_cores(estimator, X, y, params, scoring=None, cv=10, max_jobs=None):
+    # sklearn'ün sıralı validation_curve döngüsü ile 1..N çekirdekte paralel motoru karşılaştırıyoruz
+    max_jobs = max_jobs or os.cpu_count()
+    start = time.perf_counter()
+    expected = {name: validation_curve(estimator, X, y, param_name=name, param_range=param_range,
+                                       scoring=scoring, cv=cv)
+                for name, param_range in params}
+    baseline = time.perf_counter() - start
+    rows = [{"engine": "validation_curve", "n_jobs": 1, "seconds": baseline, "speedup": 1.0,
+             "matches_validation_curve": True}]
+    for n_jobs in range(1, max_jobs + 1):
+        start = time.perf_counter()
+        curves = parallel_validation_curves(estimator, X, y, params, scoring=scoring, cv=cv, n_jobs=n_jobs)
+        seconds = time.perf_counter() - start
+        matches = all(np.array_equal(curves[name][0], expected[name][0]) and
+                      np.array_equal(curves[name][1], expected[name][1]) for name in expected)
+        rows.append({"engine": "parallel", "n_jobs": n_jobs, "seconds": seconds, "speedup": baseline / seconds,
+                     "matches_validation_curve": matches})
+    return pd.DataFrame(rows)
@@ -0,0 +1,191 @@
+################################################
+# Columnar, Memory-Mapped Dataset Cache
+################################################
+
+# pd.read_csv her çalıştırmada csv'yi baştan parse ediyor ve float64/int64 kolonlar üretiyor
+# burada csv'yi bir kere parça parça okuyup özellikleri float32, hedefi uint8 olarak saklıyoruz
+# özellikler fortran sıralı (kolon kolon) bir .npy dosyasında duruyor:
+# her kolon diskte ardışık, np.load(mmap_mode="r") ile kopyasız (n, k) X görünümü alıyoruz
+# cache anahtarı dosyanın boyutu, mtime'ı ve baş/son bloklarının hash'i
+# kurulum <cache>/.lock üzerinde özel kilitle yapılıyor: aynı anda başlayan ikinci süreç
+# birincinin bitirmesini bekleyip onun kurduğu cache'i kullanıyor, çökmüş kurulumların tmp-* klasörleri temizleniyor
+
+import fcntl
+import hashlib
+import json
+import os
+import resource
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+FEATURE_DTYPE = np.float32
+TARGET_DTYPE = np.uint8
+
+# hash için dosyanın başından ve sonundan okunan bayt sayısı, yüz milyonlarca satırı baştan okumayalım
+HASH_BLOCK_SIZE = 1 << 20
+
+
+def file_fingerprint(path):
+    stat = os.stat(path)
+    digest = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, "rb") as file:
+        digest.update(file.read(HASH_BLOCK_SIZE))
+        if stat.st_size > HASH_BLOCK_SIZE:
+            file.seek(max(HASH_BLOCK_SIZE, stat.st_size - HASH_BLOCK_SIZE))
+            digest.update(file.read(HASH_BLOCK_SIZE))
+    return digest.hexdigest()[:16]
+
+
+def _cache_root(path, cache_dir):
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), ".cache")
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0])
+
+
+def _write_npy(out_path, column_files, dtype, shape):
+    # fortran sıralı (n, k) dizinin baytları kolonların art arda eklenmiş halidir
+    # o yüzden header'ı yazıp kolon dosyalarını olduğu gibi arkasına ekliyoruz
+    with open(out_path, "wb") as out:
+        header = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                  "fortran_order": len(shape) == 2,
+                  "shape": shape}
+        np.lib.format.write_array_header_1_0(out, header)
+        for column_file in column_files:
+            with open(column_file, "rb") as column:
+                shutil.copyfileobj(column, out)
+
+
+@contextmanager
+def _build_lock(root):
+    with open(os.path.join(root, ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def build_cache(path, target="Outcome", cache_dir=None, chunksize=1_000_000):
+    root = _cache_root(path, cache_dir)
+    os.makedirs(root, exist_ok=True)
+    with _build_lock(root):
+        key = file_fingerprint(path)
+        final_dir = os.path.join(root, key)
+        # kilidi beklerken başka bir süreç aynı cache'i kurmuş olabilir
+        if os.path.exists(os.path.join(final_dir, "meta.json")):
+            return final_dir
+        # kilit bizde, duran tmp-* klasörleri çökmüş kurulumlardan kalma
+        for name in os.listdir(root):
+            if name.startswith("tmp-"):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+        work_dir = tempfile.mkdtemp(dir=root, prefix="tmp-")
+        try:
+            _build(path, target, chunksize, key, work_dir)
+        except BaseException:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+
+        # yarım kalmış bir cache okunmasın diye klasörü en son tek hamlede yerine koyuyoruz
+        # (meta.json'sız yarım bir klasör varsa önce onu kaldırıyoruz)
+        # aynı dosyanın eski anahtarlı cache'lerini de siliyoruz
+        if os.path.exists(final_dir):
+            shutil.rmtree(final_dir)
+        os.rename(work_dir, final_dir)
+        for name in os.listdir(root):
+            if name not in (key, ".lock"):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    return final_dir
+
+
+def _build(path, target, chunksize, key, work_dir):
+    start = time.perf_counter()
+    n_rows = 0
+    features = None
+    column_files = {}
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        if features is None:
+            features = [column for column in chunk.columns if column != target]
+            dtypes = {column: FEATURE_DTYPE for column in features}
+            dtypes[target] = TARGET_DTYPE
+            column_files = {column: open(os.path.join(work_dir, f"{i}.bin"), "wb")
+                            for i, column in enumerate(features + [target])}
+        y_chunk = chunk[target].to_numpy()
+        if y_chunk.min() < 0 or y_chunk.max() > np.iinfo(TARGET_DTYPE).max:
+            raise ValueError(f"{target} values do not fit in {np.dtype(TARGET_DTYPE).name}")
+        for column, file in column_files.items():
+            file.write(chunk[column].to_numpy(dtype=dtypes[column]).tobytes())
+        n_rows += len(chunk)
+    for file in column_files.values():
+        file.close()
+
+    feature_files = [column_files[column].name for column in features]
+    _write_npy(os.path.join(work_dir, "X.npy"), feature_files, FEATURE_DTYPE, (n_rows, len(features)))
+    _write_npy(os.path.join(work_dir, "y.npy"), [column_files[target].name], TARGET_DTYPE, (n_rows,))
+    for file in column_files.values():
+        os.remove(file.name)
+    meta = {"source": os.path.abspath(path), "key": key, "features": features, "target": target,
+            "n_rows": n_rows, "parse_seconds": time.perf_counter() - start}
+    with open(os.path.join(work_dir, "meta.json"), "w") as file:
+        json.dump(meta, file, indent=2)
+
+
+def load_dataset(path, target="Outcome", cache_dir=None, chunksize=1_000_000, as_frame=False):
+    # cache varsa kopyasız memmap görünümleri, yoksa önce cache'i kuruyoruz
+    cache = os.path.join(_cache_root(path, cache_dir), file_fingerprint(path))
+    if not os.path.exists(os.path.join(cache, "meta.json")):
+        cache = build_cache(path, target=target, cache_dir=cache_dir, chunksize=chunksize)
+    with open(os.path.join(cache, "meta.json")) as file:
+        meta = json.load(file)
+
+    X = np.load(os.path.join(cache, "X.npy"), mmap_mode="r")
+    y = np.load(os.path.join(cache, "y.npy"), mmap_mode="r")
+    if as_frame:
+        # float32 tek blok olduğu için copy=False ile DataFrame de memmap'in üstünde duruyor
+        X = pd.DataFrame(X, columns=meta["features"], copy=False)
+        y = pd.Series(y, name=meta["target"], copy=False)
+    return X, y
+
+
+def _rss_bytes():
+    # linux'ta anlık RSS /proc'tan, diğer sistemlerde en yüksek RSS'e düşüyoruz
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def benchmark_loader(path, target="Outcome", cache_dir=None):
+    # düz read_csv, cache'i kurma (parse) ve cache'ten yükleme sürelerini ve RSS artışını karşılaştırıyoruz
+    # cache_dir verilmezse geçici bir klasörde ölçüyoruz, kullanılan cache silinip yeniden kurulmasın
+    if cache_dir is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            return benchmark_loader(path, target=target, cache_dir=tmp)
+    results = {}
+
+    rss = _rss_bytes()
+    start = time.perf_counter()
+    df = pd.read_csv(path)
+    X, y = df.drop([target], axis=1), df[target]
+    results["read_csv"] = {"seconds": time.perf_counter() - start, "rss_delta": _rss_bytes() - rss}
+    del df, X, y
+
+    shutil.rmtree(os.path.join(_cache_root(path, cache_dir), file_fingerprint(path)), ignore_errors=True)
+    rss = _rss_bytes()
+    start = time.perf_counter()
+    build_cache(path, target=target, cache_dir=cache_dir)
+    results["parse"] = {"seconds": time.perf_counter() - start, "rss_delta": _rss_bytes() - rss}
+
+    rss = _rss_bytes()
+    start = time.perf_counter()
+    X, y = load_dataset(path, target=target, cache_dir=cache_dir)
+    results["cache_hit"] = {"seconds": time.perf_counter() - start, "rss_delta": _rss_bytes() - rss}
+    # sayfalar ancak dokunulunca belleğe girer, tam tarama sonrası RSS'i de verelim
+    X.sum(axis=0), y.sum()
+    results["cache_hit_touched"] = {"seconds": time.perf_counter() - start, "rss_delta": _rss_bytes() - rss}
+    return results
@@ -0,0 +1,260 @@
+################################################
+# Compact, Memory-Mapped Model Format
+################################################
+
+# joblib.dump/load pickle'ı açmak için önce tüm sklearn'ü import etmek gerekiyor
+# burada ağacı sürümlü küçük bir ikili dosyaya yazıyoruz ve numpy.memmap ile kopyasız açıyoruz
+# dosya sayfaları işletim sisteminin page cache'inde, aynı dosyayı açan worker'lar paylaşıyor
+#
+# düğüm dizileri:
+#   feature: uint8/uint16, yapraklarda LEAF (tipin en büyük değeri)
+#   threshold: float32, -inf'e doğru yuvarlanmış; float32 x için x <= t64 <=> x <= t32
+#   child: uint16/uint32, iç düğümde sol çocuğun indeksi (sağ çocuk hep sol + 1),
+#          yaprakta yaprak tablosundaki satır
+# yaprak tablosu: leaf_class (sınıf indeksi) ve proba (float32)
+# düğümler "bfs" (genişlik öncelikli) ya da "hot" (çok örnekli çocuk önce) sırasıyla diziliyor
+# kardeşler her zaman yan yana, sık gidilen yollar dosyada birbirine yakın duruyor
+# sınıflar ve özellik isimleri dosyanın sonunda küçük bir json bölümünde
+
+import json
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+
+import numpy as np
+
+MAGIC = b"CARTMDL\0"
+VERSION = 1
+LAYOUTS = ("bfs", "hot")
+ALIGNMENT = 64
+
+# magic, version, layout, n_nodes, n_leaves, n_features, n_classes, max_depth,
+# feature itemsize, child itemsize, sonra 6 bölümün (offset, length) çiftleri
+HEADER = struct.Struct("<8sHHIIIIIBB2x12Q")
+SECTIONS = ("feature", "threshold", "child", "leaf_class", "proba", "meta")
+
+
+def _narrow_uint(max_value):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+def _float32_floor(threshold):
+    # float32'ye yuvarlanan eşik asıl eşikten büyükse bir alt float32'ye iniyoruz
+    rounded = threshold.astype(np.float32)
+    too_big = rounded.astype(np.float64) > threshold
+    rounded[too_big] = np.nextafter(rounded[too_big], np.float32(-np.inf))
+    return rounded
+
+
+def _layout_order(tree, layout):
+    # yeni sıradaki düğümler (eski id'ler); kardeşler yan yana yerleşiyor
+    left, right = tree.children_left, tree.children_right
+    order = [0]
+    pending = deque([0])
+    while pending:
+        node = pending.popleft() if layout == "bfs" else pending.pop()
+        if left[node] < 0:
+            continue
+        order += [left[node], right[node]]
+        if layout == "bfs":
+            pending += [left[node], right[node]]
+        else:
+            # yığından önce çok örnekli çocuk çıksın ki onun altı hemen arkasına yerleşsin
+            children = sorted([left[node], right[node]], key=lambda child: tree.n_node_samples[child])
+            pending += children
+    return np.array(order)
+
+
+def save_model(model, path, layout="bfs"):
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {LAYOUTS}, got {layout!r}")
+    tree = model.tree_
+    order = _layout_order(tree, layout)
+    new_id = np.empty(len(order), dtype=np.int64)
+    new_id[order] = np.arange(len(order))
+    is_leaf = tree.children_left[order] < 0
+    n_leaves = int(is_leaf.sum())
+
+    feature_dtype = _narrow_uint(max(tree.n_features, 1))
+    leaf_marker = np.iinfo(feature_dtype).max
+    feature = np.where(is_leaf, leaf_marker, tree.feature[order]).astype(feature_dtype)
+    threshold = _float32_floor(np.where(is_leaf, 0.0, tree.threshold[order]))
+    child_dtype = _narrow_uint(max(len(order), n_leaves))
+    leaf_index = np.cumsum(is_leaf) - 1
+    child = np.where(is_leaf, leaf_index, new_id[np.maximum(tree.children_left[order], 0)]).astype(child_dtype)
+
+    value = tree.value[order[is_leaf], 0, :]
+    leaf_class = np.argmax(value, axis=1).astype(_narrow_uint(max(tree.n_classes[0], 1)))
+    proba = (value / value.sum(axis=1, keepdims=True)).astype(np.float32)
+    feature_names = getattr(model, "feature_names_in_", None)
+    meta = json.dumps({"classes": model.classes_.tolist(),
+                       "classes_dtype": model.classes_.dtype.str,
+                       "leaf_class_dtype": leaf_class.dtype.str,
+                       "feature_names": None if feature_names is None else list(feature_names)}).encode()
+
+    sections = [feature.tobytes(), threshold.tobytes(), child.tobytes(), leaf_class.tobytes(),
+                proba.tobytes(), meta]
+    offsets, position = [], HEADER.size
+    for data in sections:
+        position += -position % ALIGNMENT
+        offsets += [position, len(data)]
+        position += len(data)
+
+    header = HEADER.pack(MAGIC, VERSION, LAYOUTS.index(layout), len(order), n_leaves, tree.n_features,
+                         int(tree.n_classes[0]), int(tree.max_depth), feature_dtype.itemsize,
+                         child_dtype.itemsize, *offsets)
+    # yarım yazılmış dosyayı okuyan olmasın diye önce geçici dosyaya yazıp yerine koyuyoruz
+    # geçici dosyanın adı benzersiz, aynı yola aynı anda yazan iki süreç birbirinin dosyasını ezmiyor
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp-", suffix=".cart")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(header)
+            for offset, data in zip(offsets[::2], sections):
+                file.write(b"\0" * (offset - file.tell()))
+                file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+class MappedTree:
+
+    def __init__(self, path):
+        self.path = path
+        self._buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(self._buffer) < HEADER.size:
+            raise ValueError(f"{path} is truncated: {len(self._buffer)} bytes, header needs {HEADER.size}")
+        fields = HEADER.unpack_from(self._buffer, 0)
+        magic, version, layout = fields[:3]
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a CART model file")
+        if version != VERSION:
+            raise ValueError(f"Unsupported model format version {version}, expected {VERSION}")
+        # kesik dosyada memmap dilimi sessizce kısa kalırdı, bölümlerin dosyaya sığdığını kontrol ediyoruz
+        end = max(offset + length for offset, length in zip(fields[10::2], fields[11::2]))
+        if end > len(self._buffer):
+            raise ValueError(f"{path} is truncated: {len(self._buffer)} bytes, sections need {end}")
+        (self.n_nodes, self.n_leaves, self.n_features, self.n_classes, self.max_depth,
+         feature_size, child_size) = fields[3:10]
+        self.layout = LAYOUTS[layout]
+        sections = dict(zip(SECTIONS, zip(fields[10::2], fields[11::2])))
+
+        meta = json.loads(self._section(sections["meta"], np.uint8).tobytes())
+        self.classes_ = np.array(meta["classes"], dtype=np.dtype(meta["classes_dtype"]))
+        self.feature_names = meta["feature_names"]
+        uints = {1: np.uint8, 2: np.uint16, 4: np.uint32, 8: np.uint64}
+        self.feature = self._section(sections["feature"], uints[feature_size])
+        self.threshold = self._section(sections["threshold"], np.float32)
+        self.child = self._section(sections["child"], uints[child_size])
+        self.leaf_class = self._section(sections["leaf_class"], np.dtype(meta["leaf_class_dtype"]))
+        self.proba = self._section(sections["proba"], np.float32).reshape(self.n_leaves, self.n_classes)
+        self.leaf_marker = np.iinfo(self.feature.dtype).max
+
+    def _section(self, section, dtype):
+        # memmap üzerinde kopyasız görünüm
+        offset, length = section
+        return self._buffer[offset:offset + length].view(dtype)
+
+    def _to_matrix(self, X):
+        if hasattr(X, "columns"):
+            if self.feature_names is not None:
+                X = X[self.feature_names]
+            X = X.to_numpy(dtype=np.float32)
+        X = np.asarray(X, dtype=np.float32)
+        return X.reshape(1, -1) if X.ndim == 1 else X
+
+    def apply(self, X):
+        # sonuç her satırın yaprak tablosundaki indeksi
+        # yaprağa ulaşan satırları her seviyede aktif kümeden çıkarıyoruz, derin ağaçlarda
+        # satırların çoğu erken yaprağa düştüğü için sonraki seviyeler küçülüyor
+        X = self._to_matrix(X)
+        node = np.zeros(X.shape[0], dtype=np.intp)
+        active = np.arange(X.shape[0])
+        current = node
+        for _ in range(self.max_depth):
+            feature = self.feature[current]
+            internal = feature != self.leaf_marker
+            if not internal.all():
+                node[active[~internal]] = current[~internal]
+                active, current, feature = active[internal], current[internal], feature[internal]
+                if len(active) == 0:
+                    break
+            go_right = X[active, feature] > self.threshold[current]
+            current = self.child[current].astype(np.intp) + go_right
+        node[active] = current
+        return self.child[node].astype(np.intp)
+
+    def predict(self, X):
+        return self.classes_[self.leaf_class[self.apply(X)]]
+
+    def predict_proba(self, X):
+        return self.proba[self.apply(X)]
+
+
+def load_model(path):
+    return MappedTree(path)
+
+
+def verify_format(model, X, path, layout="bfs"):
+    # kaydedip geri açtığımız modelin tahminleri sklearn modeliyle aynı mı
+    loaded = load_model(save_model(model, path, layout=layout))
+    return {"predict": bool((loaded.predict(X) == model.predict(X)).all()),
+            "predict_proba_max_abs_diff": float(np.abs(loaded.predict_proba(X) - model.predict_proba(X)).max())}
+
+
+_LOAD_SCRIPTS = {
+    "pickle": "import joblib\nmodel = joblib.load(path)",
+    "mmap": "from cart_format import load_model\nmodel = load_model(path)",
+}
+
+_PROBE = """
+import json, os, sys, time
+path = sys.argv[1]
+start = time.perf_counter()
+{load}
+seconds = time.perf_counter() - start
+with open("/proc/self/statm") as file:
+    rss = int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+print(json.dumps({{"load_seconds": seconds, "rss_bytes": rss}}))
+"""
+
+
+def _probe(kind, path):
+    # yeni bir python sürecinde yükleme süresini (importlar dahil) ve RSS'i ölçüyoruz
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(__file__)),
+                                                                    os.environ.get("PYTHONPATH")])))
+    output = subprocess.run([sys.executable, "-c", _PROBE.format(load=_LOAD_SCRIPTS[kind]), path],
+                            capture_output=True, text=True, check=True, env=env).stdout
+    return json.loads(output)
+
+
+def benchmark_format(model, X, pkl_path="cart_final.pkl", bin_path="cart_final.cart", layout="bfs",
+                     n_repeat=3):
+    import joblib
+
+    joblib.dump(model, pkl_path)
+    save_model(model, bin_path, layout=layout)
+    loaded = {"pickle": joblib.load(pkl_path), "mmap": load_model(bin_path)}
+    results = {}
+    for kind, path in [("pickle", pkl_path), ("mmap", bin_path)]:
+        probes = [_probe(kind, path) for _ in range(n_repeat)]
+        best = float("inf")
+        for _ in range(n_repeat):
+            start = time.perf_counter()
+            loaded[kind].predict(X)
+            best = min(best, time.perf_counter() - start)
+        results[kind] = {"file_bytes": os.path.getsize(path),
+                         "load_seconds": min(probe["load_seconds"] for probe in probes),
+                         "process_rss_bytes": min(probe["rss_bytes"] for probe in probes),
+                         "predict_rows_per_sec": len(X) / best}
+    return results
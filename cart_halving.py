@@ -0,0 +1,175 @@
+################################################
+# Successive-Halving Search over Stratified Subsamples
+################################################
+
+# diabetes.csv küçük olduğu için cart_params'taki her aday tüm satırlarla aranıyor
+# büyük tablolarda tüm adayları tüm veride cross validate etmek karşılanamaz
+# burada her aday önce küçük bir alt örneklemde deneniyor, her turda en iyi 1/factor'ü
+# factor kat daha büyük bir alt örnekleme terfi ediyor; son tur tüm veri
+# sklearn'deki gibi kalan aday sayısı factor'e inince duruluyor, son turun en iyisi kazanan;
+# tek kalan aday için ayrıca tüm veride bir tur harcanmıyor
+# Outcome dengesiz olduğu için alt örneklemler tabakalı: her turdaki sınıf oranı tüm verideki ile aynı
+# alt örneklemler iç içe (küçük tur büyüğün ilk satırları), turlar arası karşılaştırma tutarlı
+# kazanan tüm veride yeniden fit ediliyor (best_estimator_)
+# cv_results_ diğer aramalar gibi build_cv_results sözlüğü, her (tur, aday) bir satır, ek iter ve n_resources kolonları;
+# rank_test_score sklearn'ün HalvingGridSearchCV'si gibi önce tura, sonra skora göre, best_index_ bu satırlardan biri
+#
+# sklearn'ün HalvingGridSearchCV'si (experimental) alt örneklemi tabakalamıyor
+
+import time
+from math import ceil
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import GridSearchCV, ParameterGrid, check_cv, cross_val_score
+from sklearn.utils import _safe_indexing, check_random_state
+
+from cart_search import build_cv_results
+
+# en küçük turda fold başına sınıf başına düşmesi gereken örnek sayısı
+MIN_SAMPLES_PER_CLASS_FOLD = 10
+
+
+def stratified_order(y, random_state=None):
+    # her ön eki sınıf oranlarını koruyan bir satır sırası:
+    # her sınıfı kendi içinde karıştırıp i. elemana (i + u) / n_sınıf anahtarı veriyoruz, anahtara göre sıralıyoruz
+    rng = check_random_state(random_state)
+    y = np.asarray(y)
+    keys = np.empty(len(y))
+    for label in np.unique(y):
+        members = np.flatnonzero(y == label)
+        rng.shuffle(members)
+        keys[members] = (np.arange(len(members)) + rng.uniform(size=len(members))) / len(members)
+    return np.argsort(keys, kind="stable")
+
+
+def _fit_and_score(estimator, params, X, y, train, test, scorer):
+    model = clone(estimator).set_params(**params)
+    start = time.perf_counter()
+    model.fit(_safe_indexing(X, train), _safe_indexing(y, train))
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    score = scorer(model, _safe_indexing(X, test), _safe_indexing(y, test))
+    return score, fit_time, time.perf_counter() - start
+
+
+def _rank_by_iter(iters, mean_scores):
+    # son turdaki adaylar önce, tur içinde skora göre; eşit (tur, skor) aynı sırayı alıyor
+    order = np.lexsort((-mean_scores, -iters))
+    ranks = np.empty(len(order), dtype=np.int32)
+    for position, row in enumerate(order):
+        previous = order[position - 1] if position else None
+        tied = previous is not None and iters[row] == iters[previous] and mean_scores[row] == mean_scores[previous]
+        ranks[row] = ranks[previous] if tied else position + 1
+    return ranks
+
+
+class SuccessiveHalvingSearchCV:
+
+    def __init__(self, estimator, param_grid, scoring=None, cv=5, factor=3, min_resources=None, n_jobs=None,
+                 refit=True, random_state=None, verbose=0):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.factor = factor
+        self.min_resources = min_resources
+        self.n_jobs = n_jobs
+        self.refit = refit
+        self.random_state = random_state
+        self.verbose = verbose
+
+    def _schedule(self, n_candidates, n_samples, n_classes, n_splits):
+        # tur sayısı: kalan aday factor'e ya da altına inene kadar; ilk tur son tur / factor^(tur-1)
+        # log(9, 3) = 2.0000000000000004 gibi yuvarlama hataları tur eklemesin diye tamsayı bölmeyle sayıyoruz
+        minimum = self.min_resources or MIN_SAMPLES_PER_CLASS_FOLD * n_classes * n_splits
+        n_rungs, remaining = 1, n_candidates
+        while remaining > self.factor:
+            remaining = int(-(-remaining // self.factor))
+            n_rungs += 1
+        # veri yetmiyorsa ilk tur minimum'un altına düşmesin diye tur sayısını azaltıyoruz
+        while n_rungs > 1 and n_samples / self.factor ** (n_rungs - 1) < minimum:
+            n_rungs -= 1
+        return [int(min(n_samples, ceil(n_samples / self.factor ** (n_rungs - 1 - rung)))) for rung in range(n_rungs)]
+
+    def fit(self, X, y):
+        candidates = list(ParameterGrid(self.param_grid))
+        y_array = np.asarray(y)
+        scorer = check_scoring(self.estimator, scoring=self.scoring)
+        cv = check_cv(self.cv, y_array, classifier=is_classifier(self.estimator))
+        classes = np.unique(y_array)
+        resources = self._schedule(len(candidates), len(y_array), len(classes), cv.get_n_splits())
+        order = stratified_order(y_array, self.random_state)
+
+        alive = list(range(len(candidates)))
+        iters, n_resources_rows, params, scores, fit_times, score_times = [], [], [], [], [], []
+        self.n_resources_, self.n_candidates_, self.class_balance_ = [], [], []
+        for rung, n_resources in enumerate(resources):
+            subset = np.sort(order[:n_resources])
+            X_rung, y_rung = _safe_indexing(X, subset), y_array[subset]
+            splits = list(cv.split(X_rung, y_rung))
+            self.n_resources_.append(n_resources)
+            self.n_candidates_.append(len(alive))
+            self.class_balance_.append({label.item(): float((y_rung == label).mean()) for label in classes})
+            if self.verbose:
+                print(f"iter {rung}: {len(alive)} candidates on {n_resources} rows, "
+                      f"totalling {len(alive) * len(splits)} fits")
+            results = Parallel(n_jobs=self.n_jobs)(
+                delayed(_fit_and_score)(self.estimator, candidates[c], X_rung, y_rung, train, test, scorer)
+                for c in alive for train, test in splits)
+            results = np.array(results).reshape(len(alive), len(splits), 3)
+            iters += [rung] * len(alive)
+            n_resources_rows += [n_resources] * len(alive)
+            params += [candidates[c] for c in alive]
+            scores.append(results[:, :, 0])
+            fit_times.append(results[:, :, 1])
+            score_times.append(results[:, :, 2])
+            # en iyi 1/factor terfi ediyor; eşitlikte grid sırası (GridSearchCV gibi ilk gelen)
+            keep = max(1, ceil(len(alive) / self.factor)) if rung < len(resources) - 1 else 1
+            ranking = np.argsort(-results[:, :, 0].mean(axis=1), kind="stable")[:keep]
+            alive = [alive[i] for i in sorted(ranking)]
+
+        self.cv_results_ = build_cv_results(params, np.concatenate(scores), np.concatenate(fit_times),
+                                            np.concatenate(score_times))
+        self.cv_results_["iter"] = np.array(iters)
+        self.cv_results_["n_resources"] = np.array(n_resources_rows)
+        self.cv_results_["rank_test_score"] = _rank_by_iter(self.cv_results_["iter"],
+                                                            self.cv_results_["mean_test_score"])
+        self.n_iterations_ = len(resources)
+        self.best_index_ = int(np.argmin(self.cv_results_["rank_test_score"]))
+        self.best_params_ = params[self.best_index_]
+        self.best_score_ = float(self.cv_results_["mean_test_score"][self.best_index_])
+
+        if self.refit:
+            start = time.perf_counter()
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+            self.refit_time_ = time.perf_counter() - start
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X):
+        return self.best_estimator_.predict_proba(X)
+
+
+def compare_with_grid(estimator, param_grid, X, y, scoring=None, cv=5, factor=3, n_jobs=None, random_state=45):
+    # arama süresi ve seçilen parametrelerin tüm verideki CV skoru, GridSearchCV ile yan yana
+    rows = []
+    searches = {"grid": GridSearchCV(estimator, param_grid, scoring=scoring, cv=cv, n_jobs=n_jobs, refit=False),
+                "halving": SuccessiveHalvingSearchCV(estimator, param_grid, scoring=scoring, cv=cv, factor=factor,
+                                                     n_jobs=n_jobs, refit=False, random_state=random_state)}
+    for name, search in searches.items():
+        start = time.perf_counter()
+        search.fit(X, y)
+        seconds = time.perf_counter() - start
+        model = clone(estimator).set_params(**search.best_params_)
+        score = cross_val_score(model, X, y, scoring=scoring, cv=cv, n_jobs=n_jobs).mean()
+        rows.append({"search": name, "seconds": seconds, "best_params": search.best_params_,
+                     "full_data_cv_score": score})
+    frame = pd.DataFrame(rows)
+    frame["speedup"] = frame["seconds"].iloc[0] / frame["seconds"]
+    return frame
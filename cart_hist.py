@@ -0,0 +1,303 @@
+################################################
+# Histogram-Binned CART
+################################################
+
+# DecisionTreeClassifier her düğümde her sürekli değişkeni yeniden sıralıyor
+# burada değişkenleri en fazla 256 quantile bin'e bir kere bölüp uint8 olarak tutuyoruz
+# her düğümde bin x sınıf sayım histogramı çıkarıp en iyi gini bölünmesini histogramdan buluyoruz
+# kardeş çıkarma hilesi: küçük çocuğun histogramını sayıyoruz, büyüğünki ebeveyn - küçük
+# histogramlar değişken grupları halinde thread havuzunda hesaplanıyor (np.bincount, fancy indexing ve
+# astype GIL'i bırakıyor); her grup kendi değişkenlerini tek bir np.bincount ile sayıyor
+# satırlar HIST_CHUNK_ROWS'luk parçalarla sayılıp toplanıyor, 10M satırlık kökte bile
+# satır x değişken boyu bir kod matrisi kurulmuyor
+#
+# sonuçta gerçek bir sklearn Tree nesnesi kuruyoruz, o yüzden predict, predict_proba,
+# feature_importances_, export_text, export_graphviz, joblib ve compile_tree aynen çalışıyor
+# bir değişkenin farklı değer sayısı max_bins'i geçmiyorsa bin'ler tam değerlerdir
+# ve eşik sklearn gibi iki komşu değerin ortası seçilir
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import cross_validate
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.tree._tree import NODE_DTYPE, Tree
+from sklearn.utils import check_random_state
+from sklearn.utils.validation import validate_data
+
+MAX_BINS = 256
+
+# bin sınırlarını bulmak için en fazla bu kadar satırlık örneklem kullanıyoruz
+BIN_SUBSAMPLE = 200_000
+
+# histogram işi (satır x değişken) bundan küçükse thread açmaya değmez
+PARALLEL_MIN_CELLS = 200_000
+
+# histogram parça boyu: thread başına en fazla HIST_CHUNK_ROWS x grup değişken sayısı intp kod
+HIST_CHUNK_ROWS = 1 << 17
+
+TREE_LEAF = -1
+TREE_UNDEFINED = -2
+
+
+class BinMapper:
+
+    def __init__(self, max_bins=MAX_BINS, subsample=BIN_SUBSAMPLE, random_state=0):
+        if not 2 <= max_bins <= 256:
+            raise ValueError(f"max_bins must be in [2, 256], got {max_bins}")
+        self.max_bins = max_bins
+        self.subsample = subsample
+        self.random_state = random_state
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if self.subsample is not None and X.shape[0] > self.subsample:
+            rows = check_random_state(self.random_state).choice(X.shape[0], self.subsample, replace=False)
+            X = X[rows]
+        self.edges_, self.values_ = [], []
+        for column in X.T:
+            values = np.unique(column).astype(np.float64)
+            if len(values) <= self.max_bins:
+                # her bin tek bir değer, sınırlar sklearn'deki gibi komşu değerlerin ortası
+                edges = values[:-1] / 2.0 + values[1:] / 2.0
+                edges = np.where((edges == values[1:]) | np.isinf(edges), values[:-1], edges)
+                self.values_.append(values)
+            else:
+                quantiles = np.linspace(0, 1, self.max_bins + 1)[1:-1]
+                edges = np.unique(np.quantile(column.astype(np.float64), quantiles, method="midpoint"))
+                self.values_.append(None)
+            self.edges_.append(edges)
+        self.n_bins_ = np.array([len(edges) + 1 for edges in self.edges_])
+        return self
+
+    def transform(self, X):
+        # bin = x'ten kesin küçük sınır sayısı; yani x <= edges[b] <=> bin <= b
+        X = np.asarray(X, dtype=np.float32)
+        binned = np.empty(X.shape, dtype=np.uint8, order="F")
+        for i, edges in enumerate(self.edges_):
+            binned[:, i] = np.searchsorted(edges, X[:, i], side="left")
+        return binned
+
+    def threshold(self, feature, bin_index, node_counts):
+        # bin_index'e kadar sol çocuk; tam değerli bin'lerde eşik, düğümdeki bir sonraki dolu bin'in
+        # değeriyle arasındaki orta nokta, quantile bin'lerde doğrudan bin sınırı
+        values = self.values_[feature]
+        if values is None:
+            return float(self.edges_[feature][bin_index])
+        next_bin = bin_index + 1 + int(np.argmax(node_counts[bin_index + 1:] > 0))
+        threshold = values[bin_index] / 2.0 + values[next_bin] / 2.0
+        if threshold == values[next_bin] or np.isinf(threshold):
+            threshold = values[bin_index]
+        return float(threshold)
+
+
+def gini(counts):
+    n = counts.sum()
+    return 1.0 - float(((counts / n) ** 2).sum()) if n else 0.0
+
+
+def best_split(hist, min_samples_leaf=1):
+    # hist: (n_features, n_bins, n_classes) sayımlar
+    # her değişken ve her bin sınırı için sol/sağ gini proxy'sini vektörel hesaplıyoruz
+    # dönen değer (feature, bin) ya da geçerli bölünme yoksa None
+    hist = hist.astype(np.float64)
+    total = hist[0].sum(axis=0)
+    n = total.sum()
+    left = np.cumsum(hist, axis=1)[:, :-1, :]
+    right = total - left
+    n_left = left.sum(axis=2)
+    n_right = n - n_left
+    valid = (n_left >= min_samples_leaf) & (n_right >= min_samples_leaf)
+    if not valid.any():
+        return None
+    with np.errstate(divide="ignore", invalid="ignore"):
+        proxy = (left ** 2).sum(axis=2) / n_left + (right ** 2).sum(axis=2) / n_right
+    proxy = np.where(valid, proxy, -np.inf)
+    feature, bin_index = np.unravel_index(int(np.argmax(proxy)), proxy.shape)
+    return int(feature), int(bin_index)
+
+
+class TreeArrays:
+    # sklearn'ün depth-first sırasıyla düğüm ekleyip sonunda gerçek bir sklearn Tree kuruyoruz
+
+    def __init__(self, n_features, n_classes):
+        self.n_features = n_features
+        self.n_classes = n_classes
+        self.nodes = []
+        self.values = []
+        self.max_depth = 0
+
+    def add_node(self, parent, is_left, counts, depth):
+        node_id = len(self.nodes)
+        n = int(counts.sum())
+        self.nodes.append([TREE_LEAF, TREE_LEAF, TREE_UNDEFINED, float(TREE_UNDEFINED), gini(counts), n, float(n), 0])
+        self.values.append(counts / n)
+        if parent is not None:
+            self.nodes[parent][0 if is_left else 1] = node_id
+        self.max_depth = max(self.max_depth, depth)
+        return node_id
+
+    def set_split(self, node_id, feature, threshold):
+        self.nodes[node_id][2] = feature
+        self.nodes[node_id][3] = threshold
+
+    def to_tree(self):
+        tree = Tree(self.n_features, np.array([self.n_classes], dtype=np.intp), 1)
+        nodes = np.array([tuple(node) for node in self.nodes], dtype=NODE_DTYPE)
+        values = np.array(self.values, dtype=np.float64).reshape(len(self.nodes), 1, self.n_classes)
+        tree.__setstate__({"max_depth": self.max_depth, "node_count": len(self.nodes),
+                           "nodes": nodes, "values": values})
+        return tree
+
+
+def _n_threads(n_jobs):
+    if n_jobs is None:
+        return 1
+    return os.cpu_count() if n_jobs < 0 else n_jobs
+
+
+class HistDecisionTreeClassifier(DecisionTreeClassifier):
+
+    # DecisionTreeClassifier metotlarının okuduğu ama bu sınıfta ayarlanmayan parametreler
+    splitter = "best"
+    max_features = None
+    max_leaf_nodes = None
+    min_weight_fraction_leaf = 0.0
+    min_impurity_decrease = 0.0
+    class_weight = None
+    ccp_alpha = 0.0
+    monotonic_cst = None
+
+    # bin_mapper verilirse (önceden fit edilmiş BinMapper) bin sınırları yeniden hesaplanmıyor
+    def __init__(self, *, criterion="gini", max_depth=None, min_samples_split=2, min_samples_leaf=1,
+                 max_bins=MAX_BINS, bin_mapper=None, n_jobs=None, random_state=None):
+        self.criterion = criterion
+        self.max_depth = max_depth
+        self.min_samples_split = min_samples_split
+        self.min_samples_leaf = min_samples_leaf
+        self.max_bins = max_bins
+        self.bin_mapper = bin_mapper
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def fit(self, X, y, sample_weight=None, check_input=True):
+        if self.criterion != "gini":
+            raise ValueError("HistDecisionTreeClassifier only supports criterion='gini'")
+        if sample_weight is not None:
+            raise ValueError("HistDecisionTreeClassifier does not support sample_weight")
+        X, y = validate_data(self, X, y, dtype=np.float32, reset=True)
+        self.classes_, y_encoded = np.unique(y, return_inverse=True)
+        self.n_classes_ = len(self.classes_)
+        self.n_outputs_ = 1
+        self.max_features_ = X.shape[1]
+
+        self.bin_mapper_ = self.bin_mapper
+        if self.bin_mapper_ is None:
+            random_state = 0 if self.random_state is None else self.random_state
+            self.bin_mapper_ = BinMapper(self.max_bins, random_state=random_state).fit(X)
+        X_binned = self.bin_mapper_.transform(X)
+        n_threads = min(_n_threads(self.n_jobs), X.shape[1])
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            builder = _HistBuilder(X_binned, y_encoded.astype(np.intp), self.n_classes_, self.bin_mapper_.max_bins,
+                                   executor, n_threads)
+            self.tree_ = builder.build(self.bin_mapper_, self.max_depth, self.min_samples_split,
+                                       self.min_samples_leaf)
+        return self
+
+
+class _HistBuilder:
+
+    def __init__(self, X_binned, y, n_classes, n_bins, executor=None, n_threads=1):
+        self.X_binned = X_binned
+        self.y = y
+        self.n_classes = n_classes
+        self.n_bins = n_bins
+        self.executor = executor
+        self.feature_groups = np.array_split(np.arange(X_binned.shape[1]), n_threads)
+
+    def _count(self, rows, features):
+        # gruptaki i. değişkenin b. bin'i, c. sınıfı tek düz dizide i * n_bins * n_classes + b * n_classes + c
+        offsets = np.arange(len(features), dtype=np.intp) * self.n_bins * self.n_classes
+        counts = np.zeros(len(features) * self.n_bins * self.n_classes, dtype=np.intp)
+        for start in range(0, len(rows), HIST_CHUNK_ROWS):
+            chunk = rows[start:start + HIST_CHUNK_ROWS]
+            codes = self.X_binned[np.ix_(chunk, features)].astype(np.intp) * self.n_classes
+            codes += self.y[chunk, None] + offsets
+            counts += np.bincount(codes.ravel(), minlength=len(counts))
+        return counts.reshape(len(features), self.n_bins, self.n_classes)
+
+    def histogram(self, rows):
+        if len(rows) * self.X_binned.shape[1] < PARALLEL_MIN_CELLS or len(self.feature_groups) == 1:
+            return self._count(rows, np.arange(self.X_binned.shape[1]))
+        return np.concatenate(list(self.executor.map(lambda features: self._count(rows, features),
+                                                     self.feature_groups)))
+
+    def build(self, bin_mapper, max_depth, min_samples_split, min_samples_leaf):
+        n_samples, n_features = self.X_binned.shape
+        max_depth = np.inf if max_depth is None else max_depth
+        if isinstance(min_samples_split, float):
+            min_samples_split = max(2, int(np.ceil(min_samples_split * n_samples)))
+        if isinstance(min_samples_leaf, float):
+            min_samples_leaf = int(np.ceil(min_samples_leaf * n_samples))
+
+        arrays = TreeArrays(n_features, self.n_classes)
+        rows = np.arange(n_samples)
+        stack = [(rows, self.histogram(rows), 0, None, False)]
+        while stack:
+            rows, hist, depth, parent, is_left = stack.pop()
+            counts = hist[0].sum(axis=0)
+            node_id = arrays.add_node(parent, is_left, counts, depth)
+
+            n = len(rows)
+            is_leaf = (depth >= max_depth or n < min_samples_split or n < 2 * min_samples_leaf
+                       or np.count_nonzero(counts) <= 1)
+            split = None if is_leaf else best_split(hist, min_samples_leaf)
+            if split is None:
+                continue
+
+            feature, bin_index = split
+            threshold = bin_mapper.threshold(feature, bin_index, hist[feature].sum(axis=1))
+            arrays.set_split(node_id, feature, threshold)
+            goes_left = self.X_binned[rows, feature] <= bin_index
+            left_rows, right_rows = rows[goes_left], rows[~goes_left]
+            # kardeş çıkarma: küçük çocuğu say, büyüğü ebeveynden çıkar
+            if len(left_rows) <= len(right_rows):
+                left_hist = self.histogram(left_rows)
+                right_hist = hist - left_hist
+            else:
+                right_hist = self.histogram(right_rows)
+                left_hist = hist - right_hist
+            stack.append((right_rows, right_hist, depth + 1, node_id, False))
+            stack.append((left_rows, left_hist, depth + 1, node_id, True))
+        return arrays.to_tree()
+
+
+def parity_check(X, y, cv=5, scoring=("accuracy", "f1", "roc_auc"), **params):
+    # aynı parametrelerle sklearn ve histogram ağacının cv skorlarını yan yana koyuyoruz
+    results = {}
+    for name, model in [("sklearn", DecisionTreeClassifier(**params)),
+                        ("hist", HistDecisionTreeClassifier(**params))]:
+        cv_results = cross_validate(model, X, y, cv=cv, scoring=list(scoring))
+        results[name] = {metric: cv_results[f"test_{metric}"].mean() for metric in scoring}
+    return pd.DataFrame(results)
+
+
+def benchmark_fit(X, y, sizes=(768, 100_000, 1_000_000), n_jobs=-1, random_state=45, **params):
+    # X'ten yerine koyarak büyütülmüş verilerde fit süresini karşılaştırıyoruz
+    results = []
+    for size in sizes:
+        rows = np.random.RandomState(random_state).choice(len(X), size, replace=True)
+        X_big = np.asarray(X, dtype=np.float32)[rows]
+        y_big = np.asarray(y)[rows]
+        row = {"rows": size}
+        for name, model in [("sklearn", DecisionTreeClassifier(**params)),
+                            ("hist", HistDecisionTreeClassifier(n_jobs=1, **params)),
+                            ("hist_threads", HistDecisionTreeClassifier(n_jobs=n_jobs, **params))]:
+            start = time.perf_counter()
+            model.fit(X_big, y_big)
+            row[name] = time.perf_counter() - start
+        results.append(row)
+    return pd.DataFrame(results)
@@ -0,0 +1,189 @@
+################################################
+# Batched Permutation Importance on the Fitted Tree
+################################################
+
+# feature_importances_ impurity tabanlı, Insulin ve DiabetesPedigreeFunction gibi çok farklı değer alan
+# değişkenleri kayırıyor; permutation importance bu yanlılığı taşımıyor
+# ama düz hali 8 değişken x n_repeats x tüm veri için predict demek
+#
+# burada ağacın yapısını kullanıyoruz:
+# bir satırın yolu j değişkeniyle bölünen hiçbir düğümden geçmiyorsa j'yi karıştırmak o satırı etkilemez
+# dokunuyorsa da yolu j'ye bölünen ilk düğüme kadar aynı kalır
+# o yüzden tek geçişte her satırın her değişken için ilk karşılaştığı düğümü (entry) işaretleyip
+# sadece dokunan satırları ve sadece o düğümden itibaren yeniden dolaşıyoruz
+# karıştırılmış matris hiç kurulmuyor: j'ye bölünen düğümlerde değer X[perm[i], j] sütun görünümünden okunuyor
+# bir değişkenin tüm tekrarları (n_repeats, n_rows) tek batch olarak ağaçtan geçiyor
+# değişkenler joblib ile worker'lara dağıtılıyor, büyük X'i joblib memmap ile paylaşıyor
+#
+# permütasyonlar sklearn.inspection.permutation_importance ile aynı sırada üretiliyor,
+# aynı random_state ile sonuçlar birebir aynı
+# random_state sabitse sonuç model/veri hash'iyle .cache/importance altında saklanıyor
+
+import hashlib
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.utils import Bunch, check_random_state
+
+from cart_cache import data_fingerprint
+from cart_metrics import threshold_sweep
+from cart_scoring import CHUNK_SIZE, compile_tree
+
+CACHE_DIR = os.path.join(".cache", "importance")
+SCORINGS = ("accuracy", "f1", "roc_auc")
+
+
+def model_fingerprint(model):
+    tree = model.tree_
+    digest = hashlib.sha1(repr(sorted(model.get_params().items())).encode())
+    for array in (tree.feature, tree.threshold, tree.children_left, tree.children_right, tree.value,
+                  np.asarray(model.classes_)):
+        digest.update(np.ascontiguousarray(array).data)
+    return digest.hexdigest()
+
+
+def _permutations(n_rows, n_repeats, random_state):
+    # sklearn her tekrarda shuffling_idx'i yerinde karıştırıp sütunu bir önceki karıştırılmış sütundan alıyor
+    # yani r. tekrardaki satır i'nin değeri X[P_r[i]], P_r = P_{r-1}[idx_r]
+    seed = check_random_state(random_state).randint(np.iinfo(np.int32).max + 1)
+    rng = check_random_state(seed)
+    dtype = np.int32 if n_rows < np.iinfo(np.int32).max else np.int64
+    shuffling_idx = np.arange(n_rows)
+    current = np.arange(n_rows)
+    perms = np.empty((n_repeats, n_rows), dtype=dtype)
+    for r in range(n_repeats):
+        rng.shuffle(shuffling_idx)
+        current = current[shuffling_idx]
+        perms[r] = current
+    return perms
+
+
+def _entry_nodes(compiled, X):
+    # entry[i, j]: satır i'nin yolunda j'ye bölünen ilk düğüm, hiç yoksa -1; yanında asıl yapraklar
+    entry = np.full(X.shape, -1, dtype=np.int32 if len(compiled.feature) < np.iinfo(np.int32).max else np.int64)
+    leaves = np.empty(X.shape[0], dtype=np.intp)
+    for start in range(0, X.shape[0], CHUNK_SIZE):
+        # yaprağa ulaşan satırları aktif kümeden çıkarıyoruz, derin ağaçlarda sonraki seviyeler küçülüyor
+        rows = np.arange(start, min(start + CHUNK_SIZE, X.shape[0]))
+        node = np.zeros(len(rows), dtype=np.intp)
+        while len(rows):
+            done = compiled.is_leaf[node]
+            leaves[rows[done]] = node[done]
+            rows, node = rows[~done], node[~done]
+            feature = compiled.feature[node]
+            first = entry[rows, feature] < 0
+            entry[rows[first], feature[first]] = node[first]
+            go_left = X[rows, feature] <= compiled.threshold[node]
+            node = np.where(go_left, compiled.children_left[node], compiled.children_right[node])
+    return entry, leaves
+
+
+def _permuted_leaves(compiled, X, column, rows, entry, perms, base_leaves):
+    # column'u karıştırılmış tüm tekrarlar için yapraklar (n_repeats, n_rows)
+    # sadece rows (column'a dokunan satırlar) kendi entry düğümlerinden başlayarak yeniden dolaşılıyor
+    n_repeats = perms.shape[0]
+    leaves = np.broadcast_to(base_leaves, (n_repeats, len(base_leaves))).copy()
+    step = max(1, CHUNK_SIZE // n_repeats)
+    for start in range(0, len(rows), step):
+        chunk = rows[start:start + step]
+        # position: (tekrar, satır) çiftinin leaves.ravel() içindeki yeri
+        position = (np.arange(n_repeats)[:, np.newaxis] * len(base_leaves) + chunk).ravel()
+        row = np.tile(chunk, n_repeats)
+        source = perms[:, chunk].ravel()
+        node = np.tile(entry[chunk], n_repeats).astype(np.intp)
+        while len(row):
+            done = compiled.is_leaf[node]
+            leaves.ravel()[position[done]] = node[done]
+            position, row, source, node = position[~done], row[~done], source[~done], node[~done]
+            feature = compiled.feature[node]
+            values = X[row, feature]
+            permuted = feature == column
+            values[permuted] = X[source[permuted], column]
+            go_left = values <= compiled.threshold[node]
+            node = np.where(go_left, compiled.children_left[node], compiled.children_right[node])
+    return leaves
+
+
+def _batch_scores(compiled, leaves, y, scoring):
+    # leaves (n_repeats, n_rows); her tekrarın skoru tek vektörel işlemle
+    positive = compiled.classes_[1] if len(compiled.classes_) > 1 else compiled.classes_[0]
+    if scoring == "accuracy":
+        return (compiled.classes_[compiled.leaf_class[leaves]] == y).mean(axis=1)
+    if scoring == "f1":
+        pred = compiled.classes_[compiled.leaf_class[leaves]] == positive
+        actual = y == positive
+        tp = (pred & actual).sum(axis=1)
+        denominator = pred.sum(axis=1) + actual.sum()
+        return np.where(denominator > 0, 2 * tp / np.maximum(denominator, 1), 0.0)
+    if scoring == "roc_auc":
+        return threshold_sweep(np.broadcast_to(y == positive, leaves.shape), compiled.proba[leaves, 1],
+                               thresholds=[0.5])["roc_auc"]
+    raise ValueError(f"scoring must be one of {SCORINGS}, got {scoring!r}")
+
+
+def _feature_scores(compiled, X, y, column, entry, perms, base_leaves, scoring):
+    rows = np.flatnonzero(entry >= 0)
+    leaves = _permuted_leaves(compiled, X, column, rows, entry, perms, base_leaves)
+    return _batch_scores(compiled, leaves, y, scoring)
+
+
+def tree_permutation_importance(model, X, y, scoring="accuracy", n_repeats=5, n_jobs=None, random_state=None,
+                                cache_dir=CACHE_DIR):
+    # sklearn.inspection.permutation_importance ile aynı Bunch: importances_mean, importances_std, importances
+    if scoring not in SCORINGS:
+        raise ValueError(f"scoring must be one of {SCORINGS}, got {scoring!r}")
+    cache_path = None
+    if cache_dir is not None and isinstance(random_state, (int, np.integer)):
+        key = hashlib.sha1(f"{model_fingerprint(model)}:{data_fingerprint(X, y)}:{scoring}:{n_repeats}:"
+                           f"{random_state}".encode()).hexdigest()
+        cache_path = os.path.join(cache_dir, f"{key}.npz")
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                return Bunch(**cached)
+
+    compiled = compile_tree(model)
+    X = compiled._to_matrix(X)
+    y = np.asarray(y)
+    perms = _permutations(X.shape[0], n_repeats, random_state)
+    entry, base_leaves = _entry_nodes(compiled, X)
+    baseline = _batch_scores(compiled, base_leaves[np.newaxis], y, scoring)[0]
+
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_feature_scores)(compiled, X, y, column, entry[:, column], perms, base_leaves, scoring)
+        for column in range(X.shape[1]))
+    importances = baseline - np.array(scores)
+    result = Bunch(importances_mean=importances.mean(axis=1), importances_std=importances.std(axis=1),
+                   importances=importances)
+    if cache_path is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(f"{cache_path}.tmp.npz", **result)
+        os.replace(f"{cache_path}.tmp.npz", cache_path)
+    return result
+
+
+def verify_importance(model, X, y, scoring="accuracy", n_repeats=5, random_state=45):
+    from sklearn.inspection import permutation_importance
+
+    ours = tree_permutation_importance(model, X, y, scoring=scoring, n_repeats=n_repeats,
+                                       random_state=random_state, cache_dir=None)
+    expected = permutation_importance(model, X, y, scoring=scoring, n_repeats=n_repeats, random_state=random_state)
+    return {"importances_max_abs_diff": float(np.abs(ours.importances - expected.importances).max()),
+            "identical": bool(np.allclose(ours.importances, expected.importances))}
+
+
+def benchmark_importance(model, X, y, scoring="accuracy", n_repeats=5, n_jobs=None, random_state=45):
+    from sklearn.inspection import permutation_importance
+
+    results = {}
+    start = time.perf_counter()
+    permutation_importance(model, X, y, scoring=scoring, n_repeats=n_repeats, n_jobs=n_jobs,
+                           random_state=random_state)
+    results["sklearn_seconds"] = time.perf_counter() - start
+    start = time.perf_counter()
+    tree_permutation_importance(model, X, y, scoring=scoring, n_repeats=n_repeats, n_jobs=n_jobs,
+                                random_state=random_state, cache_dir=None)
+    results["tree_seconds"] = time.perf_counter() - start
+    results["speedup"] = results["sklearn_seconds"] / results["tree_seconds"]
+    return results
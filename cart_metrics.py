@@ -0,0 +1,165 @@
+################################################
+# Single-Pass Vectorized Metrics and Threshold Sweeps
+################################################
+
+# classification_report ve roc_auc_score aynı y_prob/y_pred üzerinde ayrı ayrı çalışıyor
+# eşik seçmek için de her eşikte yeniden çağırmak gerekiyordu
+# burada her fold'un olasılıklarını bir kere (büyükten küçüğe) sıralıyoruz
+# sıralı etiketlerin kümülatif toplamı her eşikteki TP/FP sayılarını veriyor:
+# eşik t için pozitif tahmin edilenler sıralı dizinin ilk k elemanı (k = skoru >= t olanların sayısı)
+# accuracy, precision, recall, f1 bu sayılardan, ROC-AUC da aynı kümülatif toplamlardan
+# (eşit skorlu grupları yarım sayarak, sklearn ile aynı) çıkıyor
+# fold'lar ve eşikler 2 boyutlu dizi olarak tek seferde: sonuçlar (n_folds, n_thresholds)
+# farklı uzunluktaki fold'lar ağırlığı 0 olan -inf skorlarla dolduruluyor
+
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+
+METRICS = ("accuracy", "precision", "recall", "f1")
+
+
+def _stack(y_true, y_score):
+    # 1 boyutlu, 2 boyutlu ya da fold listesi girdileri (n_rows, n) dizilere çeviriyoruz
+    if isinstance(y_true, (list, tuple)) and len(y_true) and np.ndim(y_true[0]) == 1:
+        rows = [np.asarray(row) for row in y_true]
+        scores = [np.asarray(row, dtype=np.float64) for row in y_score]
+    else:
+        rows = np.atleast_2d(np.asarray(y_true))
+        scores = np.atleast_2d(np.asarray(y_score, dtype=np.float64))
+    width = max(len(row) for row in rows)
+    labels = np.zeros((len(rows), width))
+    weights = np.zeros((len(rows), width))
+    padded = np.full((len(rows), width), -np.inf)
+    for i, (row, score) in enumerate(zip(rows, scores)):
+        labels[i, :len(row)] = row
+        weights[i, :len(row)] = 1.0
+        padded[i, :len(row)] = score
+    return labels, weights, padded
+
+
+def _sort_pass(labels, weights, scores):
+    # tek sıralama, sonra her şey kümülatif toplamlardan
+    order = np.argsort(scores, axis=1)[:, ::-1]
+    scores = np.take_along_axis(scores, order, axis=1)
+    positives = np.take_along_axis(labels * weights, order, axis=1)
+    negatives = np.take_along_axis((1 - labels) * weights, order, axis=1)
+    return scores, np.cumsum(positives, axis=1), np.cumsum(negatives, axis=1), negatives
+
+
+def _roc_auc(scores, tps, fps, negatives):
+    # her negatif, kendinden yüksek skorlu pozitifler kadar + eşit skorlu pozitiflerin yarısı kadar alan katıyor
+    n_rows, width = scores.shape
+    positions = np.broadcast_to(np.arange(width), scores.shape)
+    new_group = np.ones(scores.shape, dtype=bool)
+    new_group[:, 1:] = scores[:, 1:] != scores[:, :-1]
+    group_end = np.ones(scores.shape, dtype=bool)
+    group_end[:, :-1] = new_group[:, 1:]
+    start = np.maximum.accumulate(np.where(new_group, positions, 0), axis=1)
+    end = np.minimum.accumulate(np.where(group_end, positions, width)[:, ::-1], axis=1)[:, ::-1]
+    positive_before = np.where(start > 0, np.take_along_axis(tps, np.maximum(start - 1, 0), axis=1), 0.0)
+    positive_through = np.take_along_axis(tps, end, axis=1)
+    area = (negatives * (positive_before + positive_through) / 2).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return area / (tps[:, -1] * fps[:, -1])
+
+
+def _counts_at(scores, tps, fps, thresholds, inclusive):
+    # her satırda skoru eşiği geçen ilk k eleman pozitif tahmin ediliyor
+    side = "right" if inclusive else "left"
+    k = np.stack([np.searchsorted(-row, -thresholds, side=side) for row in scores])
+    zero = np.zeros((len(scores), 1))
+    tp = np.take_along_axis(np.hstack([zero, tps]), k, axis=1)
+    fp = np.take_along_axis(np.hstack([zero, fps]), k, axis=1)
+    return tp, fp
+
+
+def threshold_sweep(y_true, y_score, thresholds=None, inclusive=True):
+    # inclusive=True: skor >= eşik pozitif; inclusive=False: skor > eşik pozitif
+    # (DecisionTreeClassifier.predict argmax'ı 0.5 eşitliğinde 0 sınıfını seçiyor, yani > 0.5)
+    # thresholds verilmezse verideki tüm farklı skorlar
+    squeeze = not isinstance(y_true, (list, tuple)) and np.ndim(y_true) == 1
+    labels, weights, scores = _stack(y_true, y_score)
+    scores, tps, fps, negatives = _sort_pass(labels, weights, scores)
+    if thresholds is None:
+        # sıralı dizilerde farklı değerler grup başları, hepsinin birleşimi
+        starts = np.ones(scores.shape, dtype=bool)
+        starts[:, 1:] = scores[:, 1:] != scores[:, :-1]
+        thresholds = np.unique(scores[starts & np.isfinite(scores)])[::-1]
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+
+    tp, fp = _counts_at(scores, tps, fps, thresholds, inclusive)
+    positive, negative = tps[:, -1:], fps[:, -1:]
+    predicted = tp + fp
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(positive > 0, tp / positive, 0.0)
+        f1 = np.where(predicted + positive > 0, 2 * tp / (predicted + positive), 0.0)
+    result = {"threshold": thresholds,
+              "tp": tp, "fp": fp,
+              "accuracy": (tp + negative - fp) / (positive + negative),
+              "precision": precision, "recall": recall, "f1": f1,
+              "roc_auc": _roc_auc(scores, tps, fps, negatives)}
+    if squeeze:
+        result = {name: value[0] if name != "threshold" else value for name, value in result.items()}
+    return result
+
+
+def best_threshold(sweep, metric="f1"):
+    # (satır başına) seçilen metriği en büyük yapan eşik
+    index = np.argmax(sweep[metric], axis=-1)
+    return sweep["threshold"][index]
+
+
+def verify_metrics(y_true, y_score, thresholds=(0.25, 0.5, 0.75), inclusive=True):
+    # aynı değerler sklearn'ün metrikleriyle her eşikte tek tek hesaplanınca çıkıyor mu
+    sweep = threshold_sweep(y_true, y_score, thresholds, inclusive=inclusive)
+    y_true, y_score = np.asarray(y_true), np.asarray(y_score)
+    rows = []
+    for i, threshold in enumerate(sweep["threshold"]):
+        y_pred = (y_score >= threshold) if inclusive else (y_score > threshold)
+        expected = {"accuracy": accuracy_score(y_true, y_pred),
+                    "precision": precision_score(y_true, y_pred, zero_division=0),
+                    "recall": recall_score(y_true, y_pred, zero_division=0),
+                    "f1": f1_score(y_true, y_pred, zero_division=0)}
+        rows.append({"threshold": threshold,
+                     **{name: bool(np.isclose(sweep[name][i], expected[name])) for name in METRICS}})
+    rows.append({"threshold": None, "roc_auc": bool(np.isclose(sweep["roc_auc"], roc_auc_score(y_true, y_score)))})
+    return pd.DataFrame(rows)
+
+
+def benchmark_metrics(n_rows=10_000_000, n_thresholds=100, n_folds=1, n_distinct=None, random_state=45):
+    # n_distinct verilirse skorlar o kadar farklı değerden seçiliyor (ağaç yaprakları gibi, bol eşitlik)
+    rng = np.random.default_rng(random_state)
+    size = (n_folds, n_rows) if n_folds > 1 else n_rows
+    y_true = rng.integers(0, 2, size=size)
+    y_score = np.clip(rng.normal(0.35 + 0.3 * y_true, 0.25), 0, 1)
+    if n_distinct is not None:
+        y_score = np.round(y_score * (n_distinct - 1)) / (n_distinct - 1)
+    thresholds = np.linspace(0, 1, n_thresholds)
+
+    start = time.perf_counter()
+    threshold_sweep(y_true, y_score, thresholds)
+    engine = time.perf_counter() - start
+
+    # sklearn'de her fold için roc_auc_score ve her eşikte 4 metrik; birkaç eşik ölçüp eşik sayısına ölçekliyoruz
+    rows_true, rows_score = np.atleast_2d(y_true), np.atleast_2d(y_score)
+    sampled = thresholds[::max(1, n_thresholds // 3)][:3]
+    start = time.perf_counter()
+    for fold_true, fold_score in zip(rows_true, rows_score):
+        roc_auc_score(fold_true, fold_score)
+    auc_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for fold_true, fold_score in zip(rows_true, rows_score):
+        for threshold in sampled:
+            y_pred = fold_score >= threshold
+            accuracy_score(fold_true, y_pred)
+            precision_score(fold_true, y_pred, zero_division=0)
+            recall_score(fold_true, y_pred, zero_division=0)
+            f1_score(fold_true, y_pred, zero_division=0)
+    sklearn_seconds = auc_seconds + (time.perf_counter() - start) * n_thresholds / len(sampled)
+    return {"n_rows": n_rows, "n_folds": n_folds, "n_thresholds": n_thresholds,
+            "engine_seconds": engine, "sklearn_seconds_estimated": sklearn_seconds,
+            "speedup": sklearn_seconds / engine}
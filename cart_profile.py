@@ -0,0 +1,261 @@
+################################################
+# Stage Profiling and Instrumentation
+################################################
+
+# script veri yükleme, fit, holdout, CV, grid search, validation curve, çizim, export ve kaydetme yapıyor
+# ama zamanın ve belleğin nereye gittiğini göstermiyor, tek sinyal GridSearchCV'nin verbose=1'i
+# burada iki seviye ölçüm var:
+#   section(ad): script bölümlerinin işaretçisi, bir öncekini kapatıp yenisini açıyor (girinti gerekmiyor)
+#   estimator fit'leri: fit/predict/predict_proba metodları sarılıyor, her fit bir olay, predict'ler sayaç
+# her bölüm ve fit için duvar süresi, CPU süresi ve RSS; bölümlerde tepe RSS
+# (linux'ta bölüm başında /proc/self/clear_refs ile tepe değer sıfırlanıyor, yoksa süreç ömrü boyunca tepe)
+# çıktı chrome://tracing ya da Perfetto ile açılabilen bir JSON trace ve çıkışta özet tablo
+#
+# kapalıyken section() sadece bir bayrak kontrolü; açıkken de olay başına birkaç sistem çağrısı,
+# predict'lerde sadece sayaç artıyor, canlıda açık bırakılabilir
+# çağrı başı ek maliyet measure_overhead ile ölçülüyor, sınırlar OVERHEAD_BUDGET'ta (testte de kontrol ediliyor)
+# not: n_jobs ile başka süreçlerde yapılan fit'ler (GridSearchCV worker'ları) sayılmıyor,
+# onların süresi bulundukları bölümün süresinde görünüyor
+
+import atexit
+import functools
+import json
+import os
+import resource
+import threading
+import time
+from collections import Counter
+
+INSTRUMENTED_METHODS = ("fit", "predict", "predict_proba")
+TRACE_PATH = "cart_trace.json"
+
+# sarılı çağrı başına izin verilen ek süre (saniye); en küçük sklearn predict ~50 mikrosaniye, fit ~300
+OVERHEAD_BUDGET = {"predict": 20e-6, "fit": 200e-6}
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+def _reset_peak_rss():
+    # linux 4.0+: 5 yazmak VmHWM'i (tepe RSS) o anki RSS'e çekiyor
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_bytes():
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Profiler:
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.stages = []
+        self.counts = Counter()
+        self._current = None
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._patched = []
+        self._thread_ids = {}
+
+    def _tid(self):
+        return self._thread_ids.setdefault(threading.get_ident(), len(self._thread_ids))
+
+    def _event(self, name, category, start, wall, cpu, args):
+        self.events.append({"name": name, "cat": category, "ph": "X", "pid": os.getpid(), "tid": self._tid(),
+                            "ts": (start - self._origin) * 1e6, "dur": wall * 1e6,
+                            "args": {"cpu_ms": cpu * 1000, **args}})
+
+    # bölümler
+
+    def section(self, name):
+        if not self.enabled:
+            return
+        self.end_section()
+        self._current = {"name": name, "start": time.perf_counter(), "cpu": time.process_time(),
+                         "counts": Counter(self.counts), "peak_reset": _reset_peak_rss()}
+
+    def end_section(self):
+        if self._current is None:
+            return
+        stage, self._current = self._current, None
+        wall = time.perf_counter() - stage["start"]
+        cpu = time.process_time() - stage["cpu"]
+        counts = self.counts - stage["counts"]
+        record = {"stage": stage["name"], "wall_s": wall, "cpu_s": cpu, "rss_bytes": _rss_bytes(),
+                  "peak_rss_bytes": _peak_rss_bytes(), "peak_is_per_stage": stage["peak_reset"],
+                  "fits": sum(n for (_, method), n in counts.items() if method == "fit"),
+                  "predicts": sum(n for (_, method), n in counts.items() if method != "fit")}
+        self.stages.append(record)
+        self._event(stage["name"], "stage", stage["start"], wall, cpu,
+                    {key: record[key] for key in ("rss_bytes", "peak_rss_bytes", "fits", "predicts")})
+
+    # estimator'lar
+
+    def _wrap(self, method_name, method):
+        profiler = self
+
+        @functools.wraps(method)
+        def wrapper(estimator, *args, **kwargs):
+            # super().fit içinden tekrar girilirse sadece en dıştaki çağrı sayılıyor
+            if not profiler.enabled or getattr(profiler._local, "depth", 0):
+                return method(estimator, *args, **kwargs)
+            profiler._local.depth = 1
+            try:
+                name = type(estimator).__name__
+                profiler.counts[(name, method_name)] += 1
+                if method_name != "fit":
+                    return method(estimator, *args, **kwargs)
+                start, cpu = time.perf_counter(), time.process_time()
+                result = method(estimator, *args, **kwargs)
+                wall = time.perf_counter() - start
+                # X dizi değilse (ör. StreamingDecisionTreeClassifier'a verilen csv yolu) satır sayısı bilinmiyor
+                n_samples = getattr(args[0], "shape", (None,))[0] if args else None
+                args_ = {"n_samples": None if n_samples is None else int(n_samples), "rss_bytes": _rss_bytes()}
+                profiler._event(f"{name}.fit", "fit", start, wall, time.process_time() - cpu, args_)
+                return result
+            finally:
+                profiler._local.depth = 0
+
+        wrapper.__cart_profile_original__ = method
+        return wrapper
+
+    def instrument(self, classes):
+        for cls in classes:
+            for method_name in INSTRUMENTED_METHODS:
+                # miras alınan metodlar da (ör. BaseDecisionTree.predict) bu sınıfın üzerinde sarılıyor
+                method = getattr(cls, method_name, None)
+                if method is None or hasattr(method, "__cart_profile_original__"):
+                    continue
+                self._patched.append((cls, method_name, method, method_name in cls.__dict__))
+                setattr(cls, method_name, self._wrap(method_name, method))
+
+    def uninstrument(self):
+        for cls, method_name, method, own in reversed(self._patched):
+            if own:
+                setattr(cls, method_name, method)
+            else:
+                delattr(cls, method_name)
+        self._patched = []
+
+    # çıktılar
+
+    def write_trace(self, path=TRACE_PATH):
+        self.end_section()
+        with open(path, "w") as file:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, file)
+        return path
+
+    def summary(self):
+        self.end_section()
+        rows = list(self.stages)
+        fits = {}
+        for event in self.events:
+            if event["cat"] == "fit":
+                row = fits.setdefault(event["name"], {"stage": f"  {event['name']}", "wall_s": 0.0, "cpu_s": 0.0,
+                                                      "fits": 0})
+                row["wall_s"] += event["dur"] / 1e6
+                row["cpu_s"] += event["args"]["cpu_ms"] / 1000
+                row["fits"] += 1
+        return rows + list(fits.values())
+
+    def format_summary(self):
+        lines = [f"{'stage':<48} {'wall s':>9} {'cpu s':>9} {'peak rss MB':>12} {'fits':>6} {'predicts':>9}"]
+        for row in self.summary():
+            peak = row.get("peak_rss_bytes")
+            lines.append(f"{row['stage'][:48]:<48} {row['wall_s']:>9.3f} {row['cpu_s']:>9.3f} "
+                         f"{'' if peak is None else f'{peak / 2 ** 20:.1f}':>12} {row['fits']:>6} "
+                         f"{row.get('predicts', ''):>9}")
+        return "\n".join(lines)
+
+
+PROFILER = Profiler()
+
+
+def default_estimators():
+    # projedeki tüm ağaç sınıfları; import edilemeyen (ör. sklearn'süz skorlama ortamı) atlanıyor
+    classes = []
+    for module, names in (("sklearn.tree", ("DecisionTreeClassifier",)),
+                          ("cart_hist", ("HistDecisionTreeClassifier",)),
+                          ("cart_stream", ("StreamingDecisionTreeClassifier",)),
+                          ("cart_scoring", ("CompiledTree",)),
+                          ("cart_format", ("MappedTree",))):
+        try:
+            imported = __import__(module, fromlist=list(names))
+        except ImportError:
+            continue
+        classes += [getattr(imported, name) for name in names]
+    return classes
+
+
+def enable(trace_path=TRACE_PATH, summary=True, estimators=None, profiler=PROFILER):
+    profiler.enabled = True
+    profiler.instrument(default_estimators() if estimators is None else estimators)
+
+    def report():
+        profiler.write_trace(trace_path)
+        if summary:
+            print(profiler.format_summary())
+            print(f"trace written to {trace_path}")
+
+    atexit.register(report)
+    return profiler
+
+
+def section(name, profiler=PROFILER):
+    profiler.section(name)
+
+
+def measure_overhead(n_calls=100_000, profiler=None):
+    # sarılı ve sarılmamış predict ve fit çağrısının çağrı başı maliyet farkı (saniye)
+    profiler = profiler or Profiler()
+
+    class Dummy:
+        def fit(self, X):
+            return self
+
+        def predict(self, X):
+            return X
+
+    def per_call(method_name):
+        method = getattr(Dummy(), method_name)
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            method(None)
+        return (time.perf_counter() - start) / n_calls
+
+    base = {name: per_call(name) for name in OVERHEAD_BUDGET}
+    n_patched = len(profiler._patched)
+    profiler.instrument([Dummy])
+    enabled, profiler.enabled = profiler.enabled, True
+    try:
+        wrapped = {name: per_call(name) for name in OVERHEAD_BUDGET}
+    finally:
+        # sadece Dummy'nin sarmalarını geri alıyoruz, profiler canlıdaysa diğer sınıflar sarılı kalıyor
+        profiler.enabled = enabled
+        for cls, method_name, method, _ in profiler._patched[n_patched:]:
+            setattr(cls, method_name, method)
+        del profiler._patched[n_patched:]
+    # ölçüm olaylarını trace'e bırakmıyoruz
+    profiler.events = [event for event in profiler.events if event["name"] != "Dummy.fit"]
+    profiler.counts = Counter({key: n for key, n in profiler.counts.items() if key[0] != "Dummy"})
+    report = {f"{name}_overhead_s": wrapped[name] - base[name] for name in OVERHEAD_BUDGET}
+    report["ok"] = all(report[f"{name}_overhead_s"] <= budget for name, budget in OVERHEAD_BUDGET.items())
+    return report
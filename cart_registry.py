@@ -0,0 +1,436 @@
+################################################
+# Hot-Swappable Local Model Registry
+################################################
+
+# 12. bölümde tek bir cart_final.pkl cart_model_from_disc'e yükleniyor
+# yeni model çıkarmak skorlayan süreci yeniden başlatmak demek: uçuştaki istekler düşüyor, soğuk başlangıç gecikmesi
+# burada yerel bir klasörde sürümlü .cart dosyaları (cart_format) tutuyoruz:
+#   <root>/versions/v0001.cart, v0001.json (oluşturulma zamanı, sha256, parametreler, not)
+#   <root>/CURRENT  aktif sürümün adı
+#   <root>/SHADOW   gölge skorlanacak aday (yoksa boş)
+#   <root>/history.log  CURRENT'ın geçmişi ("zaman sürüm" ya da geri alımlar için "zaman sürüm rollback")
+# rollback bir yığın: her activate üstüne ekliyor, her rollback en üsttekini atıyor; art arda rollback hep daha geriye
+# her yazma geçici dosya + os.replace ile atomik; okuyan süreç ya eski ya yeni içeriği görüyor, yarımı asla
+#
+# skorlayan süreçte HotModel CURRENT'ı aralıklarla okuyor, yeni sürümü memmap'leyip tek bir atamayla
+# (sürüm, model) çiftini değiştiriyor; her batch başta çifti bir kere aldığı için bir batch hep tek modelle skorlanıyor
+# eski sürümler açık kalıyor (resident), rollback dosya açmadan anında
+# gölge model aynı batch'leri skorluyor; aktif modelle uyum oranı ve eklediği gecikme raporlanıyor
+# dış servis yok, sadece dosya sistemi
+#
+# python cart_registry.py cart_registry publish cart_final.cart --note "max_depth=5" --activate
+# python cart_registry.py cart_registry shadow v0002
+# python cart_registry.py cart_registry rollback
+# python cart_server.py cart_registry --port 8080
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from cart_format import load_model, save_model
+
+REGISTRY_ROOT = "cart_registry"
+POLL_INTERVAL = 0.5
+# süreçte açık tutulan en fazla sürüm sayısı (aktif ve gölge hariç)
+RESIDENT_VERSIONS = 4
+SHADOW_WINDOW = 10_000
+
+
+def _write_atomic(path, data):
+    # aynı klasörde geçici dosya, fsync, os.replace: okuyan ya eski ya yeni dosyayı görür
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data if isinstance(data, bytes) else data.encode())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+
+    def __init__(self, root=REGISTRY_ROOT):
+        self.root = root
+        self.versions_dir = os.path.join(root, "versions")
+        os.makedirs(self.versions_dir, exist_ok=True)
+
+    def _pointer(self, name):
+        try:
+            with open(os.path.join(self.root, name)) as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def path(self, version):
+        return os.path.join(self.versions_dir, f"{version}.cart")
+
+    def versions(self):
+        return sorted(name[:-5] for name in os.listdir(self.versions_dir)
+                      if name.endswith(".cart") and not name.startswith("."))
+
+    def metadata(self, version):
+        with open(os.path.join(self.versions_dir, f"{version}.json")) as file:
+            return json.load(file)
+
+    def _reserve(self):
+        # sürüm adını O_EXCL ile ayırıyoruz, aynı anda yayınlayan iki süreç aynı adı alamaz
+        numbers = [int(name[1:-5]) for name in os.listdir(self.versions_dir)
+                   if name.startswith("v") and name.endswith(".json") and name[1:-5].isdigit()]
+        number = max(numbers, default=0)
+        while True:
+            number += 1
+            version = f"v{number:04d}"
+            try:
+                os.close(os.open(os.path.join(self.versions_dir, f"{version}.json"),
+                                 os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return version
+            except FileExistsError:
+                continue
+
+    def publish(self, model, note=None, layout="bfs", activate=False):
+        # model bir sklearn ağacı ya da hazır bir .cart dosyasının yolu olabilir
+        version = self._reserve()
+        fd, tmp = tempfile.mkstemp(dir=self.versions_dir, prefix=".tmp-", suffix=".cart")
+        os.close(fd)
+        try:
+            if isinstance(model, (str, os.PathLike)):
+                shutil.copyfile(model, tmp)
+                params = None
+            else:
+                save_model(model, tmp, layout=layout)
+                params = {key: value for key, value in model.get_params().items()
+                          if isinstance(value, (int, float, str, bool, type(None)))}
+            # yazılan dosya açılabiliyor mu; bozuk bir dosya hiç yayınlanmasın
+            mapped = load_model(tmp)
+            meta = {"version": version, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "sha256": _sha256(tmp),
+                    "n_nodes": int(mapped.n_nodes), "n_features": int(mapped.n_features),
+                    "layout": mapped.layout, "params": params, "note": note}
+            del mapped
+            os.replace(tmp, self.path(version))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            os.unlink(os.path.join(self.versions_dir, f"{version}.json"))
+            raise
+        _write_atomic(os.path.join(self.versions_dir, f"{version}.json"), json.dumps(meta, indent=2))
+        if activate:
+            self.activate(version)
+        return version
+
+    def _check(self, version):
+        if not os.path.exists(self.path(version)):
+            raise ValueError(f"Unknown model version {version!r}, available: {self.versions()}")
+
+    def current(self):
+        return self._pointer("CURRENT")
+
+    def shadow(self):
+        return self._pointer("SHADOW")
+
+    def activate(self, version):
+        self._check(version)
+        _write_atomic(os.path.join(self.root, "CURRENT"), version)
+        with open(os.path.join(self.root, "history.log"), "a") as file:
+            file.write(f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {version}\n")
+        return version
+
+    def history(self):
+        try:
+            with open(os.path.join(self.root, "history.log")) as file:
+                return [line.split()[1] for line in file if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _stack(self):
+        # history.log'u baştan oynatıp rollback yığınını kuruyoruz; rollback satırı hedefe kadar olanları atıyor
+        stack = []
+        try:
+            with open(os.path.join(self.root, "history.log")) as file:
+                for line in file:
+                    fields = line.split()
+                    if len(fields) < 2:
+                        continue
+                    if fields[2:] == ["rollback"]:
+                        while stack and stack[-1] != fields[1]:
+                            stack.pop()
+                        if not stack:
+                            stack.append(fields[1])
+                    else:
+                        stack.append(fields[1])
+        except FileNotFoundError:
+            pass
+        return stack
+
+    def rollback(self):
+        # aktif sürümü yığından atıp altındaki ilk sürüme dönüyoruz; aynı sürümün tekrarları ve
+        # silinmiş sürümler atlanıyor
+        stack = self._stack()
+        current = self.current()
+        while stack and (stack[-1] == current or not os.path.exists(self.path(stack[-1]))):
+            stack.pop()
+        if not stack:
+            raise ValueError("No earlier version to roll back to")
+        version = stack[-1]
+        _write_atomic(os.path.join(self.root, "CURRENT"), version)
+        with open(os.path.join(self.root, "history.log"), "a") as file:
+            file.write(f"{time.strftime('%Y-%m-%dT%H:%M:%S')} {version} rollback\n")
+        return version
+
+    def set_shadow(self, version=None):
+        if version is not None:
+            self._check(version)
+        _write_atomic(os.path.join(self.root, "SHADOW"), version or "")
+        return version
+
+    def prune(self, keep=10):
+        # en yeni keep sürümü, aktif, gölge ve rollback yığınındakileri bırakıp gerisini siliyoruz
+        protected = {self.current(), self.shadow()} | set(self._stack())
+        removed = [version for version in self.versions()[:-keep] if version not in protected]
+        for version in removed:
+            os.unlink(self.path(version))
+            os.unlink(os.path.join(self.versions_dir, f"{version}.json"))
+        return removed
+
+
+def _score(model, rows):
+    leaves = model.apply(rows)
+    return model.classes_[model.leaf_class[leaves]], model.proba[leaves]
+
+
+class HotModel:
+
+    def __init__(self, registry, resident=RESIDENT_VERSIONS):
+        self.registry = registry if isinstance(registry, ModelRegistry) else ModelRegistry(registry)
+        self.resident = resident
+        self.models = OrderedDict()
+        self.swaps = 0
+        self._active = None
+        self._shadow = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._reset_shadow_stats()
+        self.refresh()
+        if self._active is None:
+            raise ValueError(f"Registry {self.registry.root} has no active version")
+
+    def _reset_shadow_stats(self):
+        self.shadow_rows = 0
+        self.shadow_agreements = 0
+        self.shadow_errors = 0
+        self.shadow_latencies = deque(maxlen=SHADOW_WINDOW)
+        self.active_latencies = deque(maxlen=SHADOW_WINDOW)
+
+    def _open(self, version):
+        # açık sürümler LRU; aktif ve gölge dışındakiler resident sınırını aşınca kapanıyor
+        if version in self.models:
+            self.models.move_to_end(version)
+            return self.models[version]
+        model = load_model(self.registry.path(version))
+        self.models[version] = model
+        pinned = {pair[0] for pair in (self._active, self._shadow) if pair is not None} | {version}
+        for old in list(self.models):
+            if len(self.models) <= self.resident + len(pinned):
+                break
+            if old not in pinned:
+                del self.models[old]
+        return model
+
+    def refresh(self):
+        # CURRENT ve SHADOW değiştiyse yeni modeli açıp tek atamayla değiştiriyoruz; değişen aktif sürümü döndürüyor
+        with self._lock:
+            swapped = None
+            version = self.registry.current()
+            if version is not None and (self._active is None or self._active[0] != version):
+                self._active = (version, self._open(version))
+                self.swaps += 1
+                swapped = version
+            shadow = self.registry.shadow()
+            if shadow != (self._shadow[0] if self._shadow else None):
+                self._shadow = (shadow, self._open(shadow)) if shadow else None
+                self._reset_shadow_stats()
+            return swapped
+
+    def swap(self, version):
+        # sadece bu süreçte, registry'ye dokunmadan
+        with self._lock:
+            self._active = (version, self._open(version))
+            self.swaps += 1
+        return version
+
+    def rollback(self):
+        # registry'deki CURRENT'ı geri alıp hemen uyguluyoruz, önceki sürüm açıksa dosya okunmuyor
+        self.registry.rollback()
+        return self.refresh()
+
+    def start(self, poll_interval=POLL_INTERVAL):
+        def poll():
+            while not self._stop.wait(poll_interval):
+                try:
+                    self.refresh()
+                except (OSError, ValueError):
+                    # yarım kalmış bir yayın ya da silinmiş sürüm: eski model hizmet vermeye devam ediyor
+                    pass
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=poll, name="cart-registry-poll", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def version(self):
+        return self._active[0]
+
+    @property
+    def n_features(self):
+        return self._active[1].n_features
+
+    @property
+    def classes_(self):
+        return self._active[1].classes_
+
+    def score_batch(self, rows):
+        # aktif ve gölge çifti batch başında bir kere okunuyor, arada swap olsa bile batch tutarlı
+        active, shadow = self._active, self._shadow
+        rows = active[1]._to_matrix(rows)
+        start = time.perf_counter()
+        predictions, probas = _score(active[1], rows)
+        self.active_latencies.append(time.perf_counter() - start)
+        if shadow is not None:
+            start = time.perf_counter()
+            try:
+                shadow_predictions, _ = _score(shadow[1], rows)
+                self.shadow_agreements += int((shadow_predictions == predictions).sum())
+                self.shadow_rows += len(rows)
+            except Exception:
+                # gölgenin hatası canlı skoru bozmamalı
+                self.shadow_errors += 1
+            self.shadow_latencies.append(time.perf_counter() - start)
+        return predictions, probas
+
+    def predict(self, X):
+        return self.score_batch(X)[0]
+
+    def predict_proba(self, X):
+        return self.score_batch(X)[1]
+
+    def shadow_report(self):
+        shadow = self._shadow
+        active = np.array(self.active_latencies)
+        added = np.array(self.shadow_latencies)
+        return {"active_version": self.version,
+                "shadow_version": shadow[0] if shadow else None,
+                "shadow_rows": self.shadow_rows,
+                "agreement": self.shadow_agreements / self.shadow_rows if self.shadow_rows else None,
+                "shadow_errors": self.shadow_errors,
+                "active_ms_per_batch": active.mean() * 1000 if len(active) else None,
+                "added_ms_per_batch": added.mean() * 1000 if len(added) else None,
+                "added_p99_ms": np.percentile(added, 99) * 1000 if len(added) else None,
+                "resident_versions": list(self.models),
+                "swaps": self.swaps}
+
+
+def benchmark_hot_swap(models, X, root=None, n_batches=2000, batch_size=64, swap_every=100):
+    # modelleri yayınlayıp batch'leri skorlarken her swap_every batch'te CURRENT'ı değiştiriyoruz;
+    # swap'lı batch'lerin gecikmesi normal batch'lerle, gölgenin ek maliyeti gölgesizle karşılaştırılıyor
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ModelRegistry(root or tmp)
+        versions = [registry.publish(model) for model in models]
+        # her sürümün beklenen tahminleri tek seferde; swap'tan sonra hiçbir batch yanlış modelle skorlanmamalı
+        expected = {version: model.predict(X) for version, model in zip(versions, models)}
+        X = np.asarray(X, dtype=np.float32)
+        registry.activate(versions[0])
+        hot = HotModel(registry)
+        normal, swapping, refresh_times, mismatches = [], [], [], 0
+        for i in range(n_batches):
+            offset = (i * batch_size) % len(X)
+            rows = X[offset:offset + batch_size]
+            is_swap = i and i % swap_every == 0
+            start = time.perf_counter()
+            if is_swap:
+                registry.activate(versions[(i // swap_every) % len(versions)])
+                refresh_start = time.perf_counter()
+                hot.refresh()
+                refresh_times.append(time.perf_counter() - refresh_start)
+            predictions, _ = hot.score_batch(rows)
+            (swapping if is_swap else normal).append(time.perf_counter() - start)
+            mismatches += int((predictions != expected[hot.version][offset:offset + batch_size]).sum())
+        registry.activate(versions[0])
+        hot.refresh()
+        registry.set_shadow(versions[-1])
+        hot.refresh()
+        for i in range(n_batches):
+            offset = (i * batch_size) % len(X)
+            hot.score_batch(X[offset:offset + batch_size])
+        report = hot.shadow_report()
+    return {"batches": n_batches, "batch_size": batch_size, "swaps": len(swapping),
+            "batch_p50_ms": np.percentile(normal, 50) * 1000,
+            "batch_p99_ms": np.percentile(normal, 99) * 1000,
+            "swap_batch_max_ms": max(swapping) * 1000 if swapping else None,
+            "refresh_mean_ms": np.mean(refresh_times) * 1000 if refresh_times else None,
+            "mismatched_predictions": mismatches,
+            "shadow": report}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local CART model registry")
+    parser.add_argument("root")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    publish_parser = subparsers.add_parser("publish", help="add a .cart file as a new version")
+    publish_parser.add_argument("model")
+    publish_parser.add_argument("--note", default=None)
+    publish_parser.add_argument("--activate", action="store_true")
+    activate_parser = subparsers.add_parser("activate", help="make a version current")
+    activate_parser.add_argument("version")
+    subparsers.add_parser("rollback", help="go back to the previous current version")
+    shadow_parser = subparsers.add_parser("shadow", help="shadow score a version, or stop without one")
+    shadow_parser.add_argument("version", nargs="?", default=None)
+    subparsers.add_parser("list", help="list versions")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.root)
+    if args.command == "publish":
+        print(registry.publish(args.model, note=args.note, activate=args.activate))
+    elif args.command == "activate":
+        print(registry.activate(args.version))
+    elif args.command == "rollback":
+        print(registry.rollback())
+    elif args.command == "shadow":
+        print(registry.set_shadow(args.version))
+    else:
+        current, shadow = registry.current(), registry.shadow()
+        for version in registry.versions():
+            meta = registry.metadata(version)
+            marker = "*" if version == current else "s" if version == shadow else " "
+            print(f"{marker} {version}  {meta['created']}  {meta['n_nodes']:>6} nodes  {meta.get('note') or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+################################################
+# Scalable Tree Rendering (streamed DOT / SVG)
+################################################
+
+# tree_graph tüm DOT metnini export_graphviz ile kurup pydotplus ile parse ediyor, sonra graphviz PNG basıyor
+# budanmamış ağaçlarda (on binlerce düğüm) bu dakikalar ve gigabaytlar sürüyor ya da hiç bitmiyor
+# burada doğrudan tree_ dizilerinden DOT ya da SVG'yi satır satır dosyaya yazıyoruz
+# SVG için graphviz'e gerek yok, yerleşimi kendimiz yapıyoruz:
+# yapraklar soldan sağa sırayla dizilir, iç düğüm iki çocuğunun ortasına gelir, y ekseni derinlik
+#
+# max_depth: bu derinlikten sonrası çizilmiyor
+# min_samples: bu kadardan az örneği olan iç düğümlerin alt ağacı tek bir özet düğümüne katlanıyor
+# katlanan özet düğümleri link_pattern verilirse o alt ağacın dosyasına link oluyor,
+# export_subtree ile alt ağaç sadece istendiğinde ayrıca çiziliyor (drill-down)
+
+import html
+import os
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+NODE_WIDTH = 190
+NODE_HEIGHT = 92
+H_GAP = 12
+V_GAP = 40
+PAD = 10
+LINE_HEIGHT = 16
+
+# export_graphviz'in sınıf renkleri
+COLORS = ("#e58139", "#399de5", "#47e539", "#d739e5", "#e5d739", "#39e5d7")
+
+
+class _TreeView:
+    # traversal'ın her düğümde okuduğu diziler python listesi (düğüm başına numpy erişimi yavaş),
+    # sadece etikette okunanlar numpy'de kalıyor; renk ve sayım metni görünen düğüm için o an üretiliyor
+    # yüz binlerce düğümde her düğüm için liste/string tutmak export_graphviz'den fazla bellek yiyordu
+
+    def __init__(self, model, feature_names=None, class_names=None):
+        tree = model.tree_
+        self.left = tree.children_left.tolist()
+        self.right = tree.children_right.tolist()
+        self.samples = tree.n_node_samples.tolist()
+        self.feature = tree.feature
+        self.threshold = tree.threshold
+        self.impurity = tree.impurity
+        value = tree.value[:, 0, :]
+        # sklearn sürümüne göre value sayım ya da oran olabiliyor, ikisinde de oranı ve ağırlıklı sayımı çıkarıyoruz
+        proba = value / np.maximum(value.sum(axis=1, keepdims=True), 1e-12)
+        self.counts = np.rint(proba * tree.weighted_n_node_samples[:, np.newaxis]).astype(np.int64)
+        self.rgb = _fill_colors(proba)
+        self.predicted = np.argmax(proba, axis=1)
+        if feature_names is None:
+            feature_names = getattr(model, "feature_names_in_", None)
+        if feature_names is None:
+            feature_names = [f"x[{i}]" for i in range(tree.n_features)]
+        self.feature_names = [str(name) for name in feature_names]
+        self.class_names = [str(name) for name in (model.classes_ if class_names is None else class_names)]
+        self.criterion = getattr(model, "criterion", "impurity")
+
+    def fill(self, node):
+        r, g, b = self.rgb[node].tolist()
+        return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def _fill_colors(proba):
+    # export_graphviz gibi: çoğunluk sınıfının rengi, saflık arttıkça koyulaşıyor; tüm düğümler için tek seferde
+    ordered = np.sort(proba, axis=1)
+    top = ordered[:, -1]
+    second = ordered[:, -2] if proba.shape[1] > 1 else np.zeros(len(proba))
+    alpha = (top - second) / np.maximum(1 - second, 1e-12)
+    base = np.array([[int(color[i:i + 2], 16) for i in (1, 3, 5)] for color in COLORS])
+    rgb = base[np.argmax(proba, axis=1) % len(COLORS)]
+    return np.rint(alpha[:, np.newaxis] * rgb + (1 - alpha[:, np.newaxis]) * 255).astype(np.uint8)
+
+
+def _visible(view, root, max_depth, min_samples):
+    # pre-order (düğüm, derinlik, tür); tür "split", "leaf" ya da "summary"
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        left = view.left[node]
+        if left < 0:
+            yield node, depth, "leaf"
+        elif (max_depth is not None and depth >= max_depth) or view.samples[node] < min_samples:
+            yield node, depth, "summary"
+        else:
+            yield node, depth, "split"
+            stack.append((view.right[node], depth + 1))
+            stack.append((left, depth + 1))
+
+
+def _subtree_size(view, node):
+    size, stack = 0, [node]
+    while stack:
+        node = stack.pop()
+        size += 1
+        if view.left[node] >= 0:
+            stack += [view.left[node], view.right[node]]
+    return size
+
+
+def _labels(view, node, kind):
+    lines = []
+    if kind == "split":
+        lines.append(f"{view.feature_names[view.feature[node]]} <= {float(view.threshold[node]):.3f}")
+    elif kind == "summary":
+        lines.append(f"subtree #{node} ({_subtree_size(view, node)} nodes)")
+    lines += [f"{view.criterion} = {float(view.impurity[node]):.3f}",
+              f"samples = {view.samples[node]}",
+              f"value = {view.counts[node].tolist()}",
+              f"class = {view.class_names[view.predicted[node]]}"]
+    return lines
+
+
+def iter_dot(model, feature_names=None, class_names=None, max_depth=None, min_samples=0, root=0,
+             link_pattern=None, view=None):
+    view = view or _TreeView(model, feature_names, class_names)
+    yield "digraph Tree {"
+    yield 'node [shape=box, style="filled, rounded", color="black", fontname="helvetica"] ;'
+    yield 'edge [fontname="helvetica"] ;'
+    parents = {}
+    for node, depth, kind in _visible(view, root, max_depth, min_samples):
+        label = "\\n".join(_labels(view, node, kind)).replace('"', '\\"')
+        extra = ""
+        if kind == "summary":
+            extra = ", shape=folder"
+            if link_pattern is not None:
+                extra += f', URL="{link_pattern.format(node=node)}"'
+        yield f'{node} [label="{label}", fillcolor="{view.fill(node)}"{extra}] ;'
+        if node in parents:
+            parent = parents.pop(node)
+            if parent == root:
+                side = "True" if view.left[root] == node else "False"
+                angle = 45 if side == "True" else -45
+                yield f'{parent} -> {node} [labeldistance=2.5, labelangle={angle}, headlabel="{side}"] ;'
+            else:
+                yield f"{parent} -> {node} ;"
+        if kind == "split":
+            parents[view.left[node]] = parents[view.right[node]] = node
+    yield "}"
+
+
+def iter_svg(model, feature_names=None, class_names=None, max_depth=None, min_samples=0, root=0,
+             link_pattern=None, view=None):
+    view = view or _TreeView(model, feature_names, class_names)
+    # yerleşim için sadece görünen düğümlerin (düğüm, derinlik, tür) listesini tutuyoruz, metni değil
+    visible = list(_visible(view, root, max_depth, min_samples))
+    children_of = {node: (view.left[node], view.right[node]) for node, _, kind in visible if kind == "split"}
+    x, n_columns = _layout(visible, children_of)
+    depth_of = {node: depth for node, depth, _ in visible}
+    n_levels = max(depth_of.values()) + 1
+    width = PAD * 2 + n_columns * (NODE_WIDTH + H_GAP)
+    height = PAD * 2 + n_levels * (NODE_HEIGHT + V_GAP)
+
+    def left_top(node):
+        return (PAD + x[node] * (NODE_WIDTH + H_GAP), PAD + depth_of[node] * (NODE_HEIGHT + V_GAP))
+
+    yield (f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+           f'width="{width:.0f}" height="{height:.0f}" font-family="helvetica" font-size="12">')
+    # önce kenarlar, kutular üstlerine çizilsin
+    yield '<g stroke="black" fill="none">'
+    for node, (left, right) in children_of.items():
+        px, py = left_top(node)
+        for child in (left, right):
+            cx, cy = left_top(child)
+            yield (f'<line x1="{px + NODE_WIDTH / 2:.1f}" y1="{py + NODE_HEIGHT:.1f}" '
+                   f'x2="{cx + NODE_WIDTH / 2:.1f}" y2="{cy:.1f}"/>')
+    yield "</g>"
+    for node, _, kind in visible:
+        nx, ny = left_top(node)
+        link = kind == "summary" and link_pattern is not None
+        if link:
+            yield f'<a xlink:href="{html.escape(link_pattern.format(node=node))}">'
+        dash = ' stroke-dasharray="4,2"' if kind == "summary" else ""
+        yield (f'<rect x="{nx:.1f}" y="{ny:.1f}" width="{NODE_WIDTH}" height="{NODE_HEIGHT}" rx="6" '
+               f'fill="{view.fill(node)}" stroke="black"{dash}/>')
+        for i, line in enumerate(_labels(view, node, kind)):
+            yield (f'<text x="{nx + NODE_WIDTH / 2:.1f}" y="{ny + 16 + i * LINE_HEIGHT:.1f}" '
+                   f'text-anchor="middle">{html.escape(line)}</text>')
+        if link:
+            yield "</a>"
+    yield "</svg>"
+
+
+def _layout(visible, children_of):
+    # uç düğümler (yaprak/özet) pre-order'da soldan sağa geliyor; iç düğümler çocuklarının ortasında
+    x, position = {}, 0
+    for node, _, kind in visible:
+        if kind != "split":
+            x[node] = position
+            position += 1
+    for node, _, kind in reversed(visible):
+        if kind == "split":
+            left, right = children_of[node]
+            x[node] = (x[left] + x[right]) / 2
+    return x, position
+
+
+def render_tree(model, path, feature_names=None, class_names=None, max_depth=None, min_samples=0, root=0,
+                link_pattern=None):
+    # uzantıya göre .dot ya da .svg; satırlar üretildikçe dosyaya yazılıyor
+    extension = os.path.splitext(path)[1].lower()
+    writers = {".dot": iter_dot, ".gv": iter_dot, ".svg": iter_svg}
+    if extension not in writers:
+        raise ValueError(f"Unsupported output format {extension!r}, expected one of {sorted(writers)}")
+    lines = writers[extension](model, feature_names=feature_names, class_names=class_names, max_depth=max_depth,
+                               min_samples=min_samples, root=root, link_pattern=link_pattern)
+    with open(path, "w") as file:
+        for line in lines:
+            file.write(line)
+            file.write("\n")
+    return path
+
+
+def export_subtree(model, node, path=None, max_depth=6, min_samples=0, link_pattern=None, **kwargs):
+    # özet düğümüne tıklanınca açılacak alt ağaç, sadece istendiğinde çiziliyor
+    if path is None:
+        path = link_pattern.format(node=node) if link_pattern else f"cart_subtree_{node}.svg"
+    return render_tree(model, path, max_depth=max_depth, min_samples=min_samples, root=node,
+                       link_pattern=link_pattern, **kwargs)
+
+
+def _measure(func):
+    # tracemalloc python'u birkaç kat yavaşlatıyor, süreyi ve tepe belleği ayrı çalıştırmalarda ölçüyoruz
+    start = time.perf_counter()
+    try:
+        output = func()
+    except Exception as exception:
+        return None, {"seconds": None, "peak_python_bytes": None,
+                      "error": f"{type(exception).__name__}: {exception}"}
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return output, {"seconds": seconds, "peak_python_bytes": peak, "error": None}
+
+
+def benchmark_render(model, feature_names=None, prefix="cart_render", max_depth=8, min_samples=20):
+    # tracemalloc sadece python tarafını ölçüyor, tree_graph'ta graphviz'in ayrı sürecindeki bellek dahil değil
+    from sklearn.tree import export_graphviz
+
+    from cart import tree_graph
+
+    if feature_names is None:
+        feature_names = getattr(model, "feature_names_in_", None)
+    feature_names = None if feature_names is None else list(feature_names)
+    runs = {
+        "tree_graph (png)": lambda: tree_graph(model, feature_names, f"{prefix}_tree_graph.png"),
+        "export_graphviz (dot string)": lambda: export_graphviz(model, feature_names=feature_names, filled=True,
+                                                                out_file=None),
+        "render_tree (dot)": lambda: render_tree(model, f"{prefix}.dot", feature_names),
+        "render_tree (svg)": lambda: render_tree(model, f"{prefix}.svg", feature_names),
+        "render_tree (svg, collapsed)": lambda: render_tree(model, f"{prefix}_collapsed.svg", feature_names,
+                                                            max_depth=max_depth, min_samples=min_samples,
+                                                            link_pattern=f"{prefix}_subtree_{{node}}.svg"),
+    }
+    rows = []
+    for name, func in runs.items():
+        output, stats = _measure(func)
+        size = os.path.getsize(output) if isinstance(output, str) and os.path.exists(output) else None
+        rows.append({"method": name, "n_nodes": model.tree_.node_count, **stats, "file_bytes": size})
+    return pd.DataFrame(rows)
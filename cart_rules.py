@@ -0,0 +1,141 @@
+################################################
+# Structured Rule Index and Batch Explanations
+################################################
+
+# export_text sadece okunacak bir metin veriyor; canlıda bir tahmini açıklamak için
+# ya bu metni parse ediyoruz ya da satır satır decision_path çağırıyoruz
+# burada her yaprağı bir hiper-dikdörtgene çeviriyoruz: her değişken için (alt, üst] sınırı
+# yanında sınıf dağılımı ve support (yapraktaki eğitim örneği sayısı)
+# yoldaki koşullar değişken başına en dar sınıra indiği için kural zaten minimal:
+# "Glucose <= 150 ve Glucose <= 127" yerine sadece "Glucose <= 127"
+#
+# explain(X) milyonlarca satır için vektörel: yaprak id'si, kural id'si ve kuralın metni
+# (metin kural başına bir kere üretiliyor, satırlara kategorik olarak bağlanıyor)
+# query ile "Glucose'u [a, b] içinde sınırlanan tüm kurallar" gibi sorgular dizi karşılaştırmasıyla yapılıyor
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from cart_codegen import leaf_bounds
+from cart_scoring import compile_tree
+
+
+class RuleIndex:
+
+    def __init__(self, model, feature_names=None, precision=4):
+        self.compiled = compile_tree(model)
+        tree = model.tree_
+        if feature_names is None:
+            feature_names = getattr(model, "feature_names_in_", None)
+        if feature_names is None:
+            feature_names = [f"x[{i}]" for i in range(tree.n_features)]
+        self.feature_names = [str(name) for name in feature_names]
+        self.classes_ = model.classes_
+
+        bounds = list(leaf_bounds(model))
+        self.leaf_id = np.array([node for node, _, _ in bounds], dtype=np.intp)
+        self.lower = np.array([lower for _, lower, _ in bounds])
+        self.upper = np.array([upper for _, _, upper in bounds])
+        self.distribution = self.compiled.proba[self.leaf_id]
+        self.prediction = self.classes_[self.compiled.leaf_class[self.leaf_id]]
+        self.support = tree.n_node_samples[self.leaf_id]
+        # düğüm id'sinden kural id'sine, iç düğümlerde -1
+        self.rule_of_node = np.full(tree.node_count, -1, dtype=np.intp)
+        self.rule_of_node[self.leaf_id] = np.arange(len(self.leaf_id))
+        self.rules = [self._conjunction(i, precision) for i in range(len(self.leaf_id))]
+
+    def __len__(self):
+        return len(self.leaf_id)
+
+    def _conjunction(self, rule, precision):
+        predicates = []
+        for feature, name in enumerate(self.feature_names):
+            low, high = self.lower[rule, feature], self.upper[rule, feature]
+            if np.isfinite(low):
+                predicates.append(f"{name} > {low:.{precision}f}")
+            if np.isfinite(high):
+                predicates.append(f"{name} <= {high:.{precision}f}")
+        return " and ".join(predicates) or "True"
+
+    def bounded(self):
+        # (n_rules, n_features): kural o değişkeni sınırlıyor mu
+        return np.isfinite(self.lower) | np.isfinite(self.upper)
+
+    def rule_ids(self, X):
+        return self.rule_of_node[self.compiled.apply(X)]
+
+    def explain(self, X):
+        # her satır için yaprak, kural, tahmin ve minimal koşul; kural metni kategorik olduğu için satır başına kopya yok
+        rule = self.rule_ids(X)
+        categories = self.rules if len(set(self.rules)) == len(self.rules) else \
+            [f"[{leaf}] {text}" for leaf, text in zip(self.leaf_id, self.rules)]
+        return pd.DataFrame({"leaf_id": self.leaf_id[rule],
+                             "rule_id": rule,
+                             "prediction": self.prediction[rule],
+                             "support": self.support[rule],
+                             "conjunction": pd.Categorical.from_codes(rule, categories=categories)})
+
+    def bounds(self, rule_ids):
+        # seçilen kuralların hiper-dikdörtgenleri (alt, üst)
+        return self.lower[rule_ids], self.upper[rule_ids]
+
+    def _feature_index(self, feature):
+        return self.feature_names.index(feature) if isinstance(feature, str) else int(feature)
+
+    def query(self, feature, low=-np.inf, high=np.inf, how="within", prediction=None, min_support=0):
+        # how="within": kural değişkeni sınırlıyor ve (alt, üst] tamamen [low, high] içinde
+        # how="overlaps": kuralın aralığı [low, high] ile kesişiyor (sınırsız kurallar dahil)
+        column = self._feature_index(feature)
+        lower, upper = self.lower[:, column], self.upper[:, column]
+        if how == "within":
+            mask = (np.isfinite(lower) | np.isfinite(upper)) & (lower >= low) & (upper <= high)
+        elif how == "overlaps":
+            mask = (lower < high) & (upper >= low)
+        else:
+            raise ValueError(f"how must be 'within' or 'overlaps', got {how!r}")
+        if prediction is not None:
+            mask &= self.prediction == prediction
+        mask &= self.support >= min_support
+        return self.to_frame().loc[mask]
+
+    def to_frame(self):
+        frame = pd.DataFrame({"leaf_id": self.leaf_id,
+                              "prediction": self.prediction,
+                              "support": self.support,
+                              "conjunction": self.rules})
+        for i, name in enumerate(self.classes_):
+            frame[f"proba_{name}"] = self.distribution[:, i]
+        return frame
+
+
+def _decision_path_rule(model, row, feature_names):
+    # eski yol: tek satır için decision_path, yoldaki düğümlerden koşulları topluyoruz
+    tree = model.tree_
+    path = model.decision_path(row).indices
+    predicates = []
+    for node in path[:-1]:
+        feature, threshold = tree.feature[node], tree.threshold[node]
+        value = row.iloc[0, feature] if hasattr(row, "iloc") else row[0, feature]
+        op = "<=" if value <= threshold else ">"
+        predicates.append(f"{feature_names[feature]} {op} {threshold:.4f}")
+    return path[-1], " and ".join(predicates)
+
+
+def benchmark_explain(model, X, n_loop=1000):
+    # decision_path döngüsünü n_loop satırda ölçüp satır başı hıza çeviriyoruz
+    index = RuleIndex(model)
+    start = time.perf_counter()
+    explanation = index.explain(X)
+    vectorized = time.perf_counter() - start
+    rows = X.iloc[:n_loop] if hasattr(X, "iloc") else X[:n_loop]
+    start = time.perf_counter()
+    loop_leaves = [_decision_path_rule(model, rows[i:i + 1], index.feature_names)[0] for i in range(len(rows))]
+    loop = time.perf_counter() - start
+    return {"n_rows": len(X),
+            "rule_index_rows_per_sec": len(X) / vectorized,
+            "decision_path_rows_per_sec": len(rows) / loop,
+            "speedup": (len(X) / vectorized) / (len(rows) / loop),
+            "leaves_match_apply": bool((explanation["leaf_id"].to_numpy() == model.apply(X)).all()),
+            "leaves_match_loop": bool((explanation["leaf_id"].to_numpy()[:len(rows)] == loop_leaves).all())}
@@ -0,0 +1,109 @@
+################################################
+# Lightweight Scoring Entry Point
+################################################
+
+# canlı ortamda tahmin için cart.py'yi import etmek seaborn, matplotlib, sklearn... hepsini yüklüyordu
+# bu modül sadece numpy ve cart_format ile çalışıyor, model cart_format.save_model ile kaydedilmiş .cart dosyası
+#
+# python cart_score.py cart_final.cart datasets/diabetes.csv
+# python cart_score.py --check-import-time
+#
+# check_import_time, python -X importtime ile bu modülün import süresinin bütçe içinde kaldığını
+# ve ağır kütüphanelerden hiçbirinin import edilmediğini kontrol ediyor
+
+import argparse
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from cart_format import load_model
+
+# soğuk başlangıçta bu modülün import süresi için bütçe (saniye)
+IMPORT_TIME_BUDGET = 0.5
+
+# skorlama yolunda import edilmemesi gereken kütüphaneler
+HEAVY_MODULES = ("sklearn", "scipy", "pandas", "matplotlib", "seaborn", "pydotplus", "graphviz", "skompiler",
+                 "joblib")
+
+_models = {}
+
+
+def get_model(path):
+    # aynı süreçte modeli bir kere açıyoruz, memmap zaten kopyasız
+    if path not in _models:
+        _models[path] = load_model(path)
+    return _models[path]
+
+
+def read_csv(path, feature_names=None, n_features=None):
+    # başlık satırından modelin özellik kolonlarını seçip float32 matris okuyoruz
+    with open(path) as file:
+        header = [name.strip().strip('"') for name in file.readline().split(",")]
+    if feature_names is not None:
+        columns = [header.index(name) for name in feature_names]
+    else:
+        columns = list(range(n_features))
+    return np.loadtxt(path, delimiter=",", skiprows=1, usecols=columns, dtype=np.float32, ndmin=2)
+
+
+def score(model_path, rows, proba=False):
+    model = get_model(model_path)
+    rows = np.asarray(rows, dtype=np.float32)
+    return model.predict_proba(rows) if proba else model.predict(rows)
+
+
+def score_file(model_path, data_path, proba=False):
+    model = get_model(model_path)
+    rows = read_csv(data_path, model.feature_names, model.n_features)
+    return model.predict_proba(rows) if proba else model.predict(rows)
+
+
+def import_time(module="cart_score"):
+    # yeni bir süreçte python -X importtime çıktısından modülün kümülatif import süresini
+    # ve import edilen tüm modül isimlerini çıkarıyoruz
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    seconds, imported = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            seconds = int(cumulative) / 1e6
+    return seconds, imported
+
+
+def check_import_time(module="cart_score", budget=IMPORT_TIME_BUDGET):
+    seconds, imported = import_time(module)
+    heavy = sorted(name for name in imported if name.split(".")[0] in HEAVY_MODULES)
+    return {"module": module, "seconds": seconds, "budget": budget, "heavy_imports": heavy,
+            "ok": seconds is not None and seconds <= budget and not heavy}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score rows with a saved .cart model")
+    parser.add_argument("model", nargs="?")
+    parser.add_argument("data", nargs="?")
+    parser.add_argument("--proba", action="store_true")
+    parser.add_argument("--check-import-time", action="store_true")
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET)
+    args = parser.parse_args(argv)
+
+    if args.check_import_time:
+        report = check_import_time(budget=args.budget)
+        print(report)
+        return 0 if report["ok"] else 1
+    if args.model is None or args.data is None:
+        parser.error("model and data are required unless --check-import-time is given")
+    for value in score_file(args.model, args.data, proba=args.proba):
+        print(value)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
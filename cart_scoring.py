@@ -0,0 +1,141 @@
+################################################
+# Vectorized Scoring of a Fitted CART Tree
+################################################
+
+# predict_with_rules tek bir satırı iç içe ternary ile dolaşıyor
+# burada ağacı düz dizilere çeviriyoruz (feature, threshold, left, right, value)
+# sonra tüm batch'i seviye seviye NumPy ile ilerletiyoruz
+# her seviyede tüm satırlar bir adım aşağı iner, derinlik kadar adım atınca yapraktayız
+
+import time
+
+import numpy as np
+
+# büyük matrislerde ara dizileri şişirmemek için satırları bu boyda parçalarla dolaşıyoruz
+CHUNK_SIZE = 65536
+
+
+class CompiledTree:
+
+    def __init__(self, feature, threshold, children_left, children_right, value, classes,
+                 n_features, feature_names=None):
+        feature = np.asarray(feature, dtype=np.intp)
+        children_left = np.asarray(children_left, dtype=np.intp)
+        children_right = np.asarray(children_right, dtype=np.intp)
+        is_leaf = children_left < 0
+        nodes = np.arange(len(feature), dtype=np.intp)
+
+        # yapraklar kendilerine işaret etsin ki seviye döngüsünde yerinde saysınlar
+        # yaprağın feature'ı 0 olsun ki indeksleme patlamasın, sonucu zaten önemsiz
+        self.feature = np.where(is_leaf, 0, feature)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.children_left = np.where(is_leaf, nodes, children_left)
+        self.children_right = np.where(is_leaf, nodes, children_right)
+        self.is_leaf = is_leaf
+
+        # sklearn predict_proba gibi her düğümün sınıf değerlerini satır toplamına bölüyoruz
+        value = np.asarray(value, dtype=np.float64)
+        normalizer = value.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        self.proba = value / normalizer
+        self.leaf_class = np.argmax(value, axis=1)
+        self.classes_ = np.asarray(classes)
+        self.feature_names = None if feature_names is None else list(feature_names)
+        self.n_features = int(n_features)
+        self.max_depth = _tree_depth(children_left, children_right)
+
+    def _to_matrix(self, X):
+        # sklearn de tahminden önce X'i float32'ye çeviriyor
+        # aynı sayısal karşılaştırmayı yapmak için biz de öyle yapıyoruz
+        if hasattr(X, "columns"):
+            if self.feature_names is not None:
+                X = X[self.feature_names]
+            X = X.to_numpy(dtype=np.float32)
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] < self.n_features:
+            raise ValueError(f"X has shape {X.shape}, expected (n_samples, {self.n_features})")
+        return X
+
+    def apply(self, X):
+        X = self._to_matrix(X)
+        leaves = np.empty(X.shape[0], dtype=np.intp)
+        for start in range(0, X.shape[0], CHUNK_SIZE):
+            chunk = X[start:start + CHUNK_SIZE]
+            leaves[start:start + CHUNK_SIZE] = self._apply_chunk(chunk)
+        return leaves
+
+    def _apply_chunk(self, X):
+        rows = np.arange(X.shape[0])
+        node = np.zeros(X.shape[0], dtype=np.intp)
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.children_left[node], self.children_right[node])
+        return node
+
+    def node_paths(self, X):
+        # her satırın her seviyede hangi düğümde olduğunu (n_samples, max_depth + 1) matriste tutuyoruz
+        # yaprağa erken ulaşan satırların kalan sütunları o yaprakla dolu kalır
+        X = self._to_matrix(X)
+        rows = np.arange(X.shape[0])
+        paths = np.zeros((X.shape[0], self.max_depth + 1), dtype=np.intp)
+        for level in range(self.max_depth):
+            node = paths[:, level]
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            paths[:, level + 1] = np.where(go_left, self.children_left[node], self.children_right[node])
+        return paths
+
+    def predict_proba(self, X):
+        return self.proba[self.apply(X)]
+
+    def predict(self, X):
+        return self.classes_[self.leaf_class[self.apply(X)]]
+
+
+def _tree_depth(children_left, children_right):
+    # kökten başlayıp seviye seviye inerek ağacın derinliğini buluyoruz
+    depth = 0
+    level = np.array([0])
+    while True:
+        level = np.concatenate([children_left[level], children_right[level]])
+        level = level[level >= 0]
+        if len(level) == 0:
+            return depth
+        depth += 1
+
+
+def compile_tree(model):
+    # fit edilmiş bir DecisionTreeClassifier'ın tree_ nesnesinden düz dizileri alıyoruz
+    tree = model.tree_
+    return CompiledTree(feature=tree.feature,
+                        threshold=tree.threshold,
+                        children_left=tree.children_left,
+                        children_right=tree.children_right,
+                        value=tree.value[:, 0, :],
+                        classes=model.classes_,
+                        n_features=tree.n_features,
+                        feature_names=getattr(model, "feature_names_in_", None))
+
+
+def benchmark_scoring(model, X, rules_func=None, n_repeat=3):
+    # aynı veriyi sklearn, derlenmiş ağaç ve (varsa) ternary fonksiyonla skorluyoruz
+    # her biri için saniyede kaç satır skorlandığını döndürüyoruz
+    compiled = compile_tree(model)
+    X_np = X.to_numpy(dtype=np.float32) if hasattr(X, "columns") else np.asarray(X, dtype=np.float32)
+    rows = X_np.tolist()
+
+    scorers = {"sklearn": lambda: model.predict(X),
+               "compiled": lambda: compiled.predict(X_np)}
+    if rules_func is not None:
+        scorers["rules"] = lambda: [rules_func(row) for row in rows]
+
+    results = {}
+    for name, scorer in scorers.items():
+        best = float("inf")
+        for _ in range(n_repeat):
+            start = time.perf_counter()
+            scorer()
+            best = min(best, time.perf_counter() - start)
+        results[name] = len(rows) / best
+    return results
@@ -0,0 +1,271 @@
+################################################
+# Fit-Once, Derive-Many Hyperparameter Search for CART
+################################################
+
+# GridSearchCV her (max_depth, min_samples_split) için her fold'da ağacı sıfırdan kuruyor
+# oysa sığ bir CART ağacı derin ağacın budanmış halidir:
+# max_depth=d ağacı, derin ağacın d. seviyede kesilmiş halidir
+# min_samples_split=m ağacı, n_node_samples < m olan düğümleri yaprak yapmaktır
+# ccp_alpha ise kesilmiş ağacın üzerinde weakest-link budamasıdır
+# o yüzden her fold'da tek bir büyük ağaç kurup tüm adayları bu ağaçtan türetiyoruz
+#
+# dikkat: bu GridSearchCV'nin birebir yerine geçmez (drop-in değil), sadece cv_results_ formatı aynı
+# sklearn eşit gini kazançlı bölünmeleri random_state'ten gelen özellik sırasıyla çözüyor
+# sığ ağaç daha az rastgele sayı çektiği için eşitliklerde türetilen ağaç sıfırdan kurulandan farklı bir bölünme seçebilir
+# 768 satırlık diabetes şemalı veride 180 adayın 121'inin ortalama skoru farklı çıktı (en fazla 0.009),
+# path_validation_curve de validation_curve'den roc_auc'de 0.069'a kadar sapabiliyor
+# aday sıralaması için hızlı bir ön eleme olarak kullanın, kesin skor gerekiyorsa kazananı GridSearchCV ile doğrulayın
+#
+# max_features, max_leaf_nodes, min_impurity_decrease ve class_weight ayarlı estimator'lar reddediliyor:
+# bunlarla kurulan ağacı kesmek, aynı parametrelerle yeniden fit etmekle eşdeğer değil
+
+import time
+from math import ceil
+
+import numpy as np
+from joblib import Parallel, delayed
+from scipy.stats import rankdata
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+from sklearn.model_selection import ParameterGrid, check_cv
+from sklearn.utils import _safe_indexing
+
+from cart_scoring import compile_tree
+
+SUPPORTED_PARAMS = ("max_depth", "min_samples_split", "ccp_alpha")
+# (parametre, kesmenin eşdeğer olduğu tek değer)
+UNSUPPORTED_ESTIMATOR_PARAMS = (("max_features", None), ("max_leaf_nodes", None),
+                                ("min_impurity_decrease", 0.0), ("class_weight", None))
+
+SCORERS = {"accuracy": lambda y, pred, prob: accuracy_score(y, pred),
+           "f1": lambda y, pred, prob: f1_score(y, pred),
+           "roc_auc": lambda y, pred, prob: roc_auc_score(y, prob[:, 1])}
+
+
+class TreePathSearchCV:
+
+    def __init__(self, estimator, param_grid, scoring=None, cv=5, n_jobs=None, refit=True, verbose=0):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.scoring = scoring
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.refit = refit
+        self.verbose = verbose
+
+    def fit(self, X, y):
+        _check_estimator(self.estimator)
+        candidates = list(ParameterGrid(self.param_grid))
+        for params in candidates:
+            unsupported = set(params) - set(SUPPORTED_PARAMS)
+            if unsupported:
+                raise ValueError(f"TreePathSearchCV can only derive {SUPPORTED_PARAMS}, got {sorted(unsupported)}")
+
+        scorer = SCORERS[self.scoring or "accuracy"]
+        cv = check_cv(self.cv, y, classifier=True)
+        splits = list(cv.split(X, y))
+        if self.verbose:
+            print(f"Fitting 1 full tree per fold ({len(splits)} fits), "
+                  f"deriving all {len(candidates)} candidates from each")
+
+        fold_results = Parallel(n_jobs=self.n_jobs)(
+            delayed(_evaluate_fold)(self.estimator, X, y, train, test, candidates, scorer)
+            for train, test in splits)
+
+        # paylaşılan fit süresini adaylara bölüştürüyoruz, score süresine türetme süresi de dahil
+        fit_times = np.array([[fold["fit_time"] / len(candidates)] * len(candidates) for fold in fold_results]).T
+        self.cv_results_ = build_cv_results(candidates,
+                                            np.array([fold["test_scores"] for fold in fold_results]).T,
+                                            fit_times,
+                                            np.array([fold["score_times"] for fold in fold_results]).T)
+        self.best_index_ = int(np.argmin(self.cv_results_["rank_test_score"]))
+        self.best_params_ = candidates[self.best_index_]
+        self.best_score_ = self.cv_results_["mean_test_score"][self.best_index_]
+        self.n_splits_ = len(splits)
+
+        if self.refit:
+            start = time.perf_counter()
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+            self.refit_time_ = time.perf_counter() - start
+        return self
+
+    def predict(self, X):
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X):
+        return self.best_estimator_.predict_proba(X)
+
+
+def path_validation_curve(estimator, X, y, param_name, param_range, scoring="accuracy", cv=5, n_jobs=None):
+    # validation_curve ile aynı (n_values, n_folds) train/test skorlarını tek fit ile üretiyoruz
+    _check_estimator(estimator)
+    candidates = [{param_name: value} for value in param_range]
+    scorer = SCORERS[scoring]
+    splits = list(check_cv(cv, y, classifier=True).split(X, y))
+    fold_results = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_fold)(estimator, X, y, train, test, candidates, scorer, return_train_score=True)
+        for train, test in splits)
+    train_scores = np.array([fold["train_scores"] for fold in fold_results]).T
+    test_scores = np.array([fold["test_scores"] for fold in fold_results]).T
+    return train_scores, test_scores
+
+
+def _check_estimator(estimator):
+    params = estimator.get_params()
+    invalid = [f"{name}={params[name]!r}" for name, allowed in UNSUPPORTED_ESTIMATOR_PARAMS
+               if name in params and params[name] != allowed]
+    if invalid:
+        raise ValueError(f"Path truncation is not equivalent to refitting with {', '.join(invalid)}; "
+                         f"use GridSearchCV for this estimator")
+
+
+def _resolve(estimator, params, n_samples):
+    # adayın parametrelerini (derinlik, min_samples_split, alpha) üçlüsüne çeviriyoruz
+    # gridde olmayanlar için estimator'ın kendi değerini kullanıyoruz
+    defaults = estimator.get_params()
+    depth = params.get("max_depth", defaults["max_depth"])
+    min_split = params.get("min_samples_split", defaults["min_samples_split"])
+    alpha = params.get("ccp_alpha", defaults["ccp_alpha"])
+    if isinstance(min_split, float):
+        # sklearn'ün oransal min_samples_split hesabı
+        min_split = max(2, int(ceil(min_split * n_samples)))
+    return (np.inf if depth is None else depth), min_split, alpha
+
+
+def _evaluate_fold(estimator, X, y, train, test, candidates, scorer, return_train_score=False):
+    X_train, y_train = _safe_indexing(X, train), _safe_indexing(y, train)
+    X_test, y_test = _safe_indexing(X, test), _safe_indexing(y, test)
+    resolved = [_resolve(estimator, params, len(train)) for params in candidates]
+
+    # en derin ve en az kısıtlı ağacı bir kere kuruyoruz
+    depths = [depth for depth, _, _ in resolved]
+    start = time.perf_counter()
+    model = clone(estimator).set_params(max_depth=None if np.isinf(max(depths)) else int(max(depths)),
+                                        min_samples_split=min(split for _, split, _ in resolved),
+                                        ccp_alpha=0.0).fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    tree = model.tree_
+    compiled = compile_tree(model)
+    node_depth = _node_depths(tree.children_left, tree.children_right)
+    test_paths = compiled.node_paths(X_test)
+    train_paths = compiled.node_paths(X_train) if return_train_score else None
+
+    test_scores, train_scores, score_times = [], [], []
+    pruning_sequences = {}
+    for depth, min_split, alpha in resolved:
+        start = time.perf_counter()
+        leaf_mask = compiled.is_leaf | (node_depth >= depth) | (tree.n_node_samples < min_split)
+        if alpha > 0.0:
+            key = (depth, min_split)
+            if key not in pruning_sequences:
+                pruning_sequences[key] = _pruning_sequence(tree, leaf_mask)
+            leaf_mask = _select_pruned(pruning_sequences[key], alpha)
+        test_scores.append(_score_paths(compiled, test_paths, leaf_mask, y_test, scorer))
+        if return_train_score:
+            train_scores.append(_score_paths(compiled, train_paths, leaf_mask, y_train, scorer))
+        score_times.append(time.perf_counter() - start)
+
+    return {"fit_time": fit_time, "test_scores": test_scores, "train_scores": train_scores,
+            "score_times": score_times}
+
+
+def _score_paths(compiled, paths, leaf_mask, y_true, scorer):
+    # her satır için yolu üzerindeki ilk yaprak düğüm, türetilmiş ağaçtaki yaprağıdır
+    first_leaf = np.argmax(leaf_mask[paths], axis=1)
+    nodes = paths[np.arange(len(paths)), first_leaf]
+    proba = compiled.proba[nodes]
+    pred = compiled.classes_[compiled.leaf_class[nodes]]
+    return scorer(y_true, pred, proba)
+
+
+def _node_depths(children_left, children_right):
+    depth = np.zeros(len(children_left), dtype=np.intp)
+    # sklearn ağaçlarında çocuk düğümlerin indeksi her zaman ebeveynden büyük
+    for node in range(len(children_left)):
+        if children_left[node] >= 0:
+            depth[children_left[node]] = depth[node] + 1
+            depth[children_right[node]] = depth[node] + 1
+    return depth
+
+
+def _pruning_sequence(tree, leaf_mask):
+    # sklearn'ün minimal cost-complexity budamasını (_cost_complexity_prune) yaprak maskesi üzerinde tekrarlıyoruz
+    # dal toplamları bir kere aşağıdan yukarı hesaplanıyor; her adımda en zayıf halka budanınca sadece onun
+    # ataları (en fazla derinlik kadar) ve alt ağacı güncelleniyor, sklearn de böyle yapıyor
+    # (effective_alpha'lar, budanan düğümler) döndürüyoruz; maskeler _select_pruned'da kuruluyor
+    left, right = tree.children_left, tree.children_right
+    n_nodes = len(left)
+    r_node = tree.weighted_n_node_samples / tree.weighted_n_node_samples[0] * tree.impurity
+    internal = np.flatnonzero(left >= 0)
+    parent = np.full(n_nodes, -1, dtype=np.intp)
+    parent[left[internal]] = internal
+    parent[right[internal]] = internal
+
+    # sklearn ağaçları önce-kök sırasıyla numaralıyor, her düğümün alt ağacı [node, end[node]) aralığı
+    # çocuklar ebeveynden büyük olduğu için tersten tek geçiş yetiyor
+    end = np.arange(1, n_nodes + 1, dtype=np.intp)
+    r_branch = np.where(leaf_mask, r_node, 0.0)
+    n_leaves = leaf_mask.astype(np.intp)
+    for node in internal[::-1]:
+        end[node] = end[right[node]]
+        if not leaf_mask[node]:
+            r_branch[node] = r_branch[left[node]] + r_branch[right[node]]
+            n_leaves[node] = n_leaves[left[node]] + n_leaves[right[node]]
+
+    # maskeli yaprağın altında kalan düğümler ağaçta yok sayılıyor
+    reachable = np.ones(n_nodes, dtype=bool)
+    for node in internal:
+        if leaf_mask[node] or not reachable[node]:
+            reachable[node + 1:end[node]] = False
+    candidates = reachable & ~leaf_mask
+    alphas = np.full(n_nodes, np.inf)
+    alphas[candidates] = (r_node[candidates] - r_branch[candidates]) / (n_leaves[candidates] - 1)
+
+    effective_alphas, pruned = [], []
+    while candidates[0]:
+        weakest = int(np.argmin(alphas))
+        effective_alphas.append(alphas[weakest])
+        pruned.append(weakest)
+        r_diff = r_node[weakest] - r_branch[weakest]
+        leaves_diff = n_leaves[weakest] - 1
+        candidates[weakest:end[weakest]] = False
+        alphas[weakest:end[weakest]] = np.inf
+        node = parent[weakest]
+        while node >= 0:
+            r_branch[node] += r_diff
+            n_leaves[node] -= leaves_diff
+            alphas[node] = (r_node[node] - r_branch[node]) / (n_leaves[node] - 1)
+            node = parent[node]
+    return leaf_mask, np.array(effective_alphas), np.array(pruned, dtype=np.intp)
+
+
+def _select_pruned(sequence, alpha):
+    # effective_alpha <= ccp_alpha olan son budama adımı sklearn'ün vereceği ağaçtır
+    leaf_mask, effective_alphas, pruned = sequence
+    above = np.flatnonzero(effective_alphas > alpha)
+    n_steps = above[0] if len(above) else len(pruned)
+    leaf_mask = leaf_mask.copy()
+    leaf_mask[pruned[:n_steps]] = True
+    return leaf_mask
+
+
+def build_cv_results(candidates, test_scores, fit_times, score_times):
+    # GridSearchCV'nin cv_results_ sözlüğü; skor ve süreler (aday, fold) dizileri
+    results = {"params": candidates}
+    for name in sorted({name for params in candidates for name in params}):
+        column = np.ma.MaskedArray(np.empty(len(candidates), dtype=object), mask=True)
+        for i, params in enumerate(candidates):
+            if name in params:
+                column[i] = params[name]
+        results[f"param_{name}"] = column
+    for split in range(test_scores.shape[1]):
+        results[f"split{split}_test_score"] = test_scores[:, split]
+    results["mean_test_score"] = test_scores.mean(axis=1)
+    results["std_test_score"] = test_scores.std(axis=1)
+    results["rank_test_score"] = rankdata(-results["mean_test_score"], method="min").astype(np.int32)
+    results["mean_fit_time"] = fit_times.mean(axis=1)
+    results["std_fit_time"] = fit_times.std(axis=1)
+    results["mean_score_time"] = score_times.mean(axis=1)
+    results["std_score_time"] = score_times.std(axis=1)
+    return results
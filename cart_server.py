@@ -0,0 +1,293 @@
+################################################
+# Asyncio Micro-Batching Prediction Service
+################################################
+
+# cart_model_from_disc.predict(pd.DataFrame(x).T) tek satır için DataFrame kurup sklearn doğrulamasından geçiyor
+# yük altında ağacı dolaşmak değil bu sabit maliyet bizi sınırlıyor
+# burada eşzamanlı gelen tek satırlık istekleri bir kuyrukta topluyoruz:
+# ilk istek geldikten sonra max_wait saniye ya da max_batch_size satır dolana kadar bekleyip
+# hepsini tek bir numpy matrisi olarak .cart modeliyle (cart_format) tek çağrıda skorluyoruz
+#
+# protokol çok basit bir HTTP/1.1 (keep-alive destekli), tcp ya da unix socket üzerinden:
+#   POST /predict  {"x": [6, 148, 70, 35, 0, 30, 0.62, 50]}  ->  {"prediction": 1, "proba": [...]}
+#   GET /metrics   ->  p50/p99 gecikme ve batch boyu histogramı
+#
+# python cart_server.py cart_final.cart --port 8080
+# python cart_server.py cart_registry --port 8080   (cart_registry klasörü: sürüm değişince yeniden başlatma yok)
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter, deque
+
+import numpy as np
+
+from cart_format import load_model
+
+MAX_BATCH_SIZE = 256
+MAX_WAIT = 0.002
+
+# gecikme yüzdelikleri için tutulan son ölçüm sayısı
+LATENCY_WINDOW = 100_000
+
+
+class MicroBatcher:
+
+    def __init__(self, model, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.batch_sizes = Counter()
+        self.n_requests = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def predict(self, row):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        # ilk isteği bekle, sonra max_wait dolana ya da batch dolana kadar topla
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                rows = np.stack([row for row, _, _ in batch])
+                if hasattr(self.model, "score_batch"):
+                    # cart_registry.HotModel: batch tek bir sürümle skorlanıyor, gölge de aynı batch'i görüyor
+                    predictions, probas = self.model.score_batch(rows)
+                else:
+                    leaves = self.model.apply(rows)
+                    predictions, probas = self.model.classes_[self.model.leaf_class[leaves]], self.model.proba[leaves]
+                predictions, probas = predictions.tolist(), probas.tolist()
+            except Exception as error:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            now = time.perf_counter()
+            for (_, future, started), prediction, proba in zip(batch, predictions, probas):
+                if not future.done():
+                    future.set_result({"prediction": prediction, "proba": proba})
+                self.latencies.append(now - started)
+            self.batch_sizes[len(batch)] += 1
+            self.n_requests += len(batch)
+
+    def metrics(self):
+        latencies = np.array(self.latencies)
+        percentiles = np.percentile(latencies, [50, 99]) if len(latencies) else [None, None]
+        return {"requests": self.n_requests,
+                "batches": sum(self.batch_sizes.values()),
+                "latency_p50_ms": None if percentiles[0] is None else percentiles[0] * 1000,
+                "latency_p99_ms": None if percentiles[1] is None else percentiles[1] * 1000,
+                "batch_size_histogram": dict(sorted(self.batch_sizes.items()))}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split(" ", 2)
+    if len(parts) != 3:
+        raise BadRequest(f"malformed request line {request_line[:100]!r}")
+    method, path, _ = parts
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise BadRequest(f"invalid content-length {headers['content-length']!r}") from None
+    if length < 0:
+        raise BadRequest(f"invalid content-length {length}")
+    body = await reader.readexactly(length)
+    return method, path, body
+
+
+def _parse_row(body, n_features):
+    # satır kuyruğa girmeden önce doğrulanıyor; bozuk bir istek aynı batch'teki diğer istekleri düşürmesin
+    row = np.asarray(json.loads(body)["x"], dtype=np.float32)
+    if row.shape != (n_features,):
+        raise ValueError(f"expected {n_features} features, got shape {row.shape}")
+    if not np.isfinite(row).all():
+        raise ValueError("features must be finite numbers")
+    return row
+
+
+def _response(status, payload):
+    body = json.dumps(payload).encode()
+    return (f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode() + body
+
+
+class PredictionServer:
+
+    def __init__(self, model_path, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT):
+        if os.path.isdir(model_path):
+            # model yolu bir cart_registry klasörüyse yeni sürümler yeniden başlatmadan devreye giriyor
+            from cart_registry import HotModel
+            self.model = HotModel(model_path).start()
+        else:
+            self.model = load_model(model_path)
+        self.batcher = MicroBatcher(self.model, max_batch_size=max_batch_size, max_wait=max_wait)
+        self.server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except BadRequest as error:
+                    # istek sınırları belirsiz, bağlantıyı 400 ile kapatıyoruz
+                    writer.write(_response("400 Bad Request", {"error": str(error)}))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, path, body = request
+                if method == "POST" and path == "/predict":
+                    try:
+                        row = _parse_row(body, self.model.n_features)
+                        writer.write(_response("200 OK", await self.batcher.predict(row)))
+                    except (KeyError, TypeError, ValueError) as error:
+                        writer.write(_response("400 Bad Request", {"error": str(error)}))
+                elif method == "GET" and path == "/metrics":
+                    metrics = self.batcher.metrics()
+                    if hasattr(self.model, "shadow_report"):
+                        metrics["registry"] = self.model.shadow_report()
+                    writer.write(_response("200 OK", metrics))
+                else:
+                    writer.write(_response("404 Not Found", {"error": f"{method} {path}"}))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host="127.0.0.1", port=8080, unix_path=None):
+        self.batcher.start()
+        if unix_path is not None:
+            self.server = await asyncio.start_unix_server(self._handle, path=unix_path)
+        else:
+            self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.batcher.stop()
+        if hasattr(self.model, "stop"):
+            self.model.stop()
+
+
+async def _client(host, port, rows, n_requests, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    for i in range(n_requests):
+        body = json.dumps({"x": rows[i % len(rows)]}).encode()
+        started = time.perf_counter()
+        writer.write(f"POST /predict HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+                     + body)
+        await writer.drain()
+        await _read_response(reader)
+        latencies.append(time.perf_counter() - started)
+    writer.close()
+
+
+async def _read_response(reader):
+    await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return json.loads(await reader.readexactly(length))
+
+
+async def _benchmark(model_path, rows, n_requests, concurrency, max_batch_size, max_wait):
+    server = PredictionServer(model_path, max_batch_size=max_batch_size, max_wait=max_wait)
+    listener = await server.start(port=0)
+    host, port = listener.sockets[0].getsockname()[:2]
+    latencies = []
+    per_client = n_requests // concurrency
+    started = time.perf_counter()
+    await asyncio.gather(*[_client(host, port, rows, per_client, latencies) for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    metrics = server.batcher.metrics()
+    await server.stop()
+    client = np.array(latencies)
+    return {"requests_per_sec": len(client) / elapsed,
+            "client_p50_ms": np.percentile(client, 50) * 1000,
+            "client_p99_ms": np.percentile(client, 99) * 1000,
+            "server": metrics}
+
+
+def benchmark_server(model_path, X, n_requests=20_000, concurrency=64, max_batch_size=MAX_BATCH_SIZE,
+                     max_wait=MAX_WAIT):
+    # aynı süreçte yerel bir sunucu açıp concurrency adet keep-alive bağlantıdan istek yağdırıyoruz
+    rows = np.asarray(X, dtype=np.float64).tolist()
+    return asyncio.run(_benchmark(model_path, rows, n_requests, concurrency, max_batch_size, max_wait))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-batching CART prediction server")
+    parser.add_argument("model")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", default=None, help="listen on a unix socket instead of tcp")
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--max-wait", type=float, default=MAX_WAIT)
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = PredictionServer(args.model, max_batch_size=args.max_batch_size, max_wait=args.max_wait)
+        listener = await server.start(args.host, args.port, unix_path=args.unix)
+        async with listener:
+            await listener.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
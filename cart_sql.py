@@ -0,0 +1,109 @@
+################################################
+# In-Database Bulk Scoring with SQLite
+################################################
+
+# skompile sadece SQL'i yazdırıyordu, çalıştıran yoktu
+# burada ağacı SQLite'a gömüp bütün tabloyu tek bir INSERT ... SELECT ile skorluyoruz
+# iki strateji var, ikisi de aynı sonucu verir:
+# case: her yaprak için tek WHEN'li düz CASE ifadesi (cart_codegen.to_sql_case)
+# interval: her yaprak bir satır, özellik başına (alt, üst] aralığı; veri tablosu bu tabloyla join'lenir
+
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from cart_codegen import feature_names_of, leaf_bounds, to_sql_case
+
+STRATEGIES = ("case", "interval")
+
+
+def load_csv(connection, path, table="diabetes", batch_size=50000):
+    # csv'yi parça parça okuyup executemany ile yüklüyoruz, tüm dosya belleğe alınmıyor
+    n_rows = 0
+    for chunk in pd.read_csv(path, chunksize=batch_size):
+        n_rows += load_frame(connection, chunk, table, batch_size=batch_size, create=n_rows == 0)
+    return n_rows
+
+
+def load_frame(connection, df, table="diabetes", batch_size=50000, create=True):
+    if create:
+        columns = ", ".join(f'"{column}" REAL' for column in df.columns)
+        connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+        connection.execute(f'CREATE TABLE "{table}" ({columns})')
+    insert = f'INSERT INTO "{table}" VALUES ({", ".join("?" * df.shape[1])})'
+    values = df.to_numpy(dtype=np.float64)
+    for start in range(0, len(values), batch_size):
+        connection.executemany(insert, values[start:start + batch_size].tolist())
+    connection.commit()
+    return len(values)
+
+
+def _create_leaf_table(connection, model, names, leaf_table):
+    columns = ", ".join(f'"lo_{name}" REAL, "hi_{name}" REAL' for name in names)
+    connection.execute(f'DROP TABLE IF EXISTS "{leaf_table}"')
+    connection.execute(f'CREATE TABLE "{leaf_table}" (leaf_id INTEGER PRIMARY KEY, {columns}, '
+                       f'prediction, proba REAL)')
+    positive = len(model.classes_) - 1
+    rows = []
+    for node, lower, upper in leaf_bounds(model):
+        value = model.tree_.value[node, 0]
+        bounds = [bound for pair in zip(lower, upper) for bound in pair]
+        rows.append([int(node), *bounds, model.classes_[int(np.argmax(value))].item(),
+                     float(value[positive] / value.sum())])
+    connection.executemany(f'INSERT INTO "{leaf_table}" VALUES ({", ".join("?" * len(rows[0]))})', rows)
+
+
+def score_table(connection, model, table="diabetes", output_table="predictions", strategy="case",
+                feature_names=None):
+    # output_table(row_id, prediction, proba) tablosunu tek bir INSERT ... SELECT ile dolduruyoruz
+    # proba pozitif sınıfın (classes_[-1]) olasılığı
+    if strategy not in STRATEGIES:
+        raise ValueError(f"strategy must be one of {STRATEGIES}, got {strategy!r}")
+    names = feature_names_of(model, feature_names)
+    connection.execute(f'DROP TABLE IF EXISTS "{output_table}"')
+    connection.execute(f'CREATE TABLE "{output_table}" (row_id INTEGER PRIMARY KEY, prediction, proba REAL)')
+
+    if strategy == "case":
+        prediction = to_sql_case(model, names)
+        proba = to_sql_case(model, names, proba_class=model.classes_[-1])
+        connection.execute(f'INSERT INTO "{output_table}" SELECT rowid, {prediction}, {proba} FROM "{table}"')
+    else:
+        leaf_table = f"{output_table}_leaves"
+        _create_leaf_table(connection, model, names, leaf_table)
+        conditions = " AND ".join(f'd."{name}" > l."lo_{name}" AND d."{name}" <= l."hi_{name}"'
+                                  for name in names)
+        connection.execute(f'INSERT INTO "{output_table}" SELECT d.rowid, l.prediction, l.proba '
+                           f'FROM "{table}" AS d JOIN "{leaf_table}" AS l ON {conditions}')
+    connection.commit()
+    return connection.execute(f'SELECT COUNT(*) FROM "{output_table}"').fetchone()[0]
+
+
+def read_predictions(connection, output_table="predictions"):
+    return pd.read_sql(f'SELECT prediction, proba FROM "{output_table}" ORDER BY row_id', connection)
+
+
+def benchmark_sqlite(model, X, sizes=(768, 100_000, 1_000_000, 10_000_000), path=":memory:",
+                     batch_size=50000, random_state=45):
+    # her boyut için X'ten yerine koyarak örneklenmiş bir tablo kurup üç yolu satır/saniye olarak ölçüyoruz
+    # pandas: satırları read_sql ile çekip model.predict çağırmak
+    names = feature_names_of(model)
+    results = []
+    for size in sizes:
+        df = X[names].sample(size, replace=True, random_state=random_state)
+        connection = sqlite3.connect(path)
+        load_frame(connection, df, "bench", batch_size=batch_size)
+        row = {"rows": size}
+        for strategy in STRATEGIES:
+            start = time.perf_counter()
+            score_table(connection, model, "bench", f"bench_{strategy}", strategy=strategy)
+            row[strategy] = size / (time.perf_counter() - start)
+        start = time.perf_counter()
+        model.predict(pd.read_sql('SELECT * FROM "bench"', connection))
+        row["pandas"] = size / (time.perf_counter() - start)
+        row["agree"] = bool((read_predictions(connection, "bench_case")
+                             == read_predictions(connection, "bench_interval")).all().all())
+        connection.close()
+        results.append(row)
+    return pd.DataFrame(results)
@@ -0,0 +1,274 @@
+################################################
+# Out-of-Core Streaming CART
+################################################
+
+# X = df.drop(["Outcome"], axis=1) tüm veriyi belleğe alıyor, hatta bir kopyasını daha çıkarıyor
+# burada veriyi csv ya da memmap'ten parça parça okuyup ağacı seviye seviye kuruyoruz:
+# 0. geçiş: sınıfları, sınıf sayımlarını ve bin sınırları için rastgele örneklemi topluyoruz
+# sonra her seviye için bir geçiş: her parçayı bin'leyip mevcut ağaçtan geçiriyoruz
+# o seviyedeki düğümlere düşen satırlardan düğüm x değişken x bin x sınıf histogramı biriktiriyoruz
+# histogramlar memory_budget'a sığmazsa seviye birden fazla geçişe bölünüyor
+#
+# bölünme seçimi cart_hist ile aynı (best_split, BinMapper.threshold)
+# yani aynı bin sınırlarıyla bellek içi HistDecisionTreeClassifier ile birebir aynı ağaç çıkar
+# sonuç gerçek bir sklearn Tree, cart_final'ın kullanıldığı her yerde kullanılabilir
+
+import os
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from cart_hist import BIN_SUBSAMPLE, MAX_BINS, BinMapper, HistDecisionTreeClassifier, TreeArrays, best_split
+
+# varsayılan bellek bütçesi (bayt)
+MEMORY_BUDGET = 256 * 1024 ** 2
+
+# csv parçası parse edilirken satır başına düşen yaklaşık bayt (pandas float64 + float32 kopya +
+# bin'lenmiş satır + histogram indeksleri) değişken sayısıyla çarpılıyor
+BYTES_PER_CELL = 48
+BYTES_PER_ROW = 64
+
+# pandas'ın csv okuyucusunun parça boyundan bağımsız tampon payı (tokenizer ve okuma tamponları)
+# csv kaynaklarında bütçeden önce bu düşülüyor, küçük bütçelerde asıl aşım buradan geliyordu
+CSV_READER_OVERHEAD = 2 * 1024 ** 2
+
+
+def iter_chunks(source, target="Outcome", chunksize=100_000):
+    # source bir csv yolu ya da (X, y) ikilisi (cart_data.load_dataset memmap'leri gibi)
+    # her parça (float32 X, y, özellik isimleri) olarak dönüyor
+    if isinstance(source, (str, os.PathLike)):
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            features = [column for column in chunk.columns if column != target]
+            yield chunk[features].to_numpy(dtype=np.float32), chunk[target].to_numpy(), features
+        return
+    X, y = source
+    features = list(X.columns) if hasattr(X, "columns") else None
+    for start in range(0, len(X), chunksize):
+        X_chunk = X.iloc[start:start + chunksize] if hasattr(X, "iloc") else X[start:start + chunksize]
+        y_chunk = y.iloc[start:start + chunksize] if hasattr(y, "iloc") else y[start:start + chunksize]
+        yield np.asarray(X_chunk, dtype=np.float32), np.asarray(y_chunk), features
+
+
+class StreamingDecisionTreeClassifier(HistDecisionTreeClassifier):
+
+    def __init__(self, *, criterion="gini", max_depth=None, min_samples_split=2, min_samples_leaf=1,
+                 max_bins=MAX_BINS, bin_mapper=None, memory_budget=MEMORY_BUDGET, chunksize=None,
+                 target="Outcome", random_state=None):
+        super().__init__(criterion=criterion, max_depth=max_depth, min_samples_split=min_samples_split,
+                         min_samples_leaf=min_samples_leaf, max_bins=max_bins, bin_mapper=bin_mapper,
+                         random_state=random_state)
+        self.memory_budget = memory_budget
+        self.chunksize = chunksize
+        self.target = target
+
+    def fit(self, X, y=None, sample_weight=None, check_input=True):
+        # X bir csv yolu olabilir (y verilmez, hedef kolon target'tan okunur) ya da X, y dizileri
+        if self.criterion != "gini":
+            raise ValueError("StreamingDecisionTreeClassifier only supports criterion='gini'")
+        if sample_weight is not None:
+            raise ValueError("StreamingDecisionTreeClassifier does not support sample_weight")
+        source = X if y is None else (X, y)
+        self._budget = self._usable_budget(source)
+        chunksize = self.chunksize or self._chunk_rows(source)
+
+        def chunks():
+            return iter_chunks(source, target=self.target, chunksize=chunksize)
+
+        # 0. geçiş: her satıra rastgele bir anahtar verip en küçük anahtarlı sample_rows satırı
+        # sabit boyutlu bir tamponda tutuyoruz, örneklem bütçeyi aşmıyor
+        rng = np.random.RandomState(self.random_state or 0)
+        sample_rows = self._sample_rows(source)
+        sample, sample_keys = None, None
+        labels = []
+        n_samples = 0
+        for X_chunk, y_chunk, features in chunks():
+            if sample is None:
+                sample = np.empty((0, X_chunk.shape[1]), dtype=np.float32)
+                sample_keys = np.empty(0)
+            if self.bin_mapper is None:
+                keys = np.concatenate([sample_keys, rng.random_sample(len(X_chunk))])
+                keep = np.argsort(keys, kind="stable")[:sample_rows]
+                from_sample = keep < len(sample)
+                sample = np.concatenate([sample[keep[from_sample]], X_chunk[keep[~from_sample] - len(sample)]])
+                sample_keys = np.concatenate([keys[keep[from_sample]], keys[keep[~from_sample]]])
+            labels.append(np.unique(y_chunk, return_counts=True))
+            n_samples += len(X_chunk)
+        if sample is None:
+            raise ValueError("Found no rows to fit on")
+
+        self.classes_ = np.unique(np.concatenate([classes for classes, _ in labels]))
+        class_counts = np.zeros(len(self.classes_), dtype=np.int64)
+        for classes, counts in labels:
+            class_counts[np.searchsorted(self.classes_, classes)] += counts
+        self.n_classes_ = len(self.classes_)
+        self.n_outputs_ = 1
+        self.n_features_in_ = sample.shape[1]
+        self.max_features_ = sample.shape[1]
+        if features is not None:
+            self.feature_names_in_ = np.array(features, dtype=object)
+        self.bin_mapper_ = self.bin_mapper
+        if self.bin_mapper_ is None:
+            self.bin_mapper_ = BinMapper(self.max_bins, subsample=None).fit(sample)
+        del sample, sample_keys
+
+        builder = _StreamingBuilder(chunks, self.bin_mapper_, self.classes_, self.n_features_in_,
+                                    self.bin_mapper_.max_bins, self._max_slots())
+        self.tree_ = builder.build(class_counts, n_samples, self.max_depth, self.min_samples_split,
+                                   self.min_samples_leaf)
+        self.n_passes_ = builder.n_passes
+        return self
+
+    def _n_features(self, source):
+        if isinstance(source, (str, os.PathLike)):
+            return len(pd.read_csv(source, nrows=0).columns) - 1
+        return source[0].shape[1]
+
+    def _usable_budget(self, source):
+        budget = self.memory_budget
+        if isinstance(source, (str, os.PathLike)):
+            budget -= CSV_READER_OVERHEAD
+            if budget < CSV_READER_OVERHEAD:
+                raise ValueError(f"memory_budget must be at least {2 * CSV_READER_OVERHEAD} bytes for csv sources, "
+                                 f"got {self.memory_budget}")
+        return budget
+
+    def _chunk_rows(self, source):
+        # bütçenin yarısı parçalara, diğer yarısı histogramlara (0. geçişte örnekleme)
+        n_features = self._n_features(source)
+        return max(1000, (self._budget // 2) // (BYTES_PER_CELL * n_features + BYTES_PER_ROW))
+
+    def _sample_rows(self, source):
+        # tampon birleştirilirken iki kopya, anahtarlarla birlikte satır başına ~2 x (4k + 16) bayt
+        n_features = self._n_features(source)
+        return int(min(BIN_SUBSAMPLE, max(1000, (self._budget // 4) // (2 * (4 * n_features + 16)))))
+
+    def _max_slots(self):
+        # bincount çıktısı ve biriken toplam aynı boyda, o yüzden histogram payının yarısı
+        per_node = self.n_features_in_ * self.bin_mapper_.max_bins * self.n_classes_ * 8
+        return max(1, (self._budget // 4) // per_node)
+
+
+class _StreamingBuilder:
+
+    def __init__(self, chunks, bin_mapper, classes, n_features, n_bins, max_slots):
+        self.chunks = chunks
+        self.bin_mapper = bin_mapper
+        self.classes = classes
+        self.n_features = n_features
+        self.n_bins = n_bins
+        self.max_slots = max_slots
+        self.n_passes = 1
+        # geçici ağaç, seviye sırasıyla (bfs) tutuluyor, sonunda depth-first'e çevriliyor
+        self.split_feature, self.split_bin, self.threshold = [], [], []
+        self.left, self.right, self.depth, self.counts = [], [], [], []
+
+    def _add(self, counts, depth):
+        self.split_feature.append(-1)
+        self.split_bin.append(0)
+        self.threshold.append(0.0)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.depth.append(depth)
+        self.counts.append(counts)
+        return len(self.counts) - 1
+
+    def _accumulate(self, nodes, level):
+        # tek geçişte verilen düğümlerin histogramlarını biriktiriyoruz
+        self.n_passes += 1
+        split_feature = np.maximum(np.array(self.split_feature), 0)
+        split_bin = np.array(self.split_bin)
+        left, right = np.array(self.left), np.array(self.right)
+        slot_of = np.full(len(self.counts), -1)
+        slot_of[nodes] = np.arange(len(nodes))
+        cells = self.n_features * self.n_bins * len(self.classes)
+        offsets = np.arange(self.n_features) * self.n_bins * len(self.classes)
+        hist = np.zeros(len(nodes) * cells, dtype=np.int64)
+
+        for X_chunk, y_chunk, _ in self.chunks():
+            binned = self.bin_mapper.transform(X_chunk)
+            y_encoded = np.searchsorted(self.classes, y_chunk)
+            rows = np.arange(len(binned))
+            node = np.zeros(len(binned), dtype=np.intp)
+            for _ in range(level):
+                go_left = binned[rows, split_feature[node]] <= split_bin[node]
+                node = np.where(left[node] < 0, node, np.where(go_left, left[node], right[node]))
+            slot = slot_of[node]
+            active = slot >= 0
+            codes = (slot[active, None] * cells + offsets
+                     + binned[active].astype(np.intp) * len(self.classes) + y_encoded[active, None])
+            hist += np.bincount(codes.ravel(), minlength=len(hist))
+        return hist.reshape(len(nodes), self.n_features, self.n_bins, len(self.classes))
+
+    def build(self, class_counts, n_samples, max_depth, min_samples_split, min_samples_leaf):
+        max_depth = np.inf if max_depth is None else max_depth
+        if isinstance(min_samples_split, float):
+            min_samples_split = max(2, int(np.ceil(min_samples_split * n_samples)))
+        if isinstance(min_samples_leaf, float):
+            min_samples_leaf = int(np.ceil(min_samples_leaf * n_samples))
+
+        frontier = [self._add(class_counts, 0)]
+        level = 0
+        while frontier:
+            expand = []
+            for node in frontier:
+                counts = self.counts[node]
+                n = counts.sum()
+                if not (level >= max_depth or n < min_samples_split or n < 2 * min_samples_leaf
+                        or np.count_nonzero(counts) <= 1):
+                    expand.append(node)
+            next_frontier = []
+            for start in range(0, len(expand), self.max_slots):
+                batch = expand[start:start + self.max_slots]
+                for node, hist in zip(batch, self._accumulate(batch, level)):
+                    split = best_split(hist, min_samples_leaf)
+                    if split is None:
+                        continue
+                    feature, bin_index = split
+                    self.split_feature[node] = feature
+                    self.split_bin[node] = bin_index
+                    self.threshold[node] = self.bin_mapper.threshold(feature, bin_index, hist[feature].sum(axis=1))
+                    left_counts = hist[feature, :bin_index + 1].sum(axis=0)
+                    self.left[node] = self._add(left_counts, level + 1)
+                    self.right[node] = self._add(self.counts[node] - left_counts, level + 1)
+                    next_frontier += [self.left[node], self.right[node]]
+            frontier = next_frontier
+            level += 1
+        return self._to_tree()
+
+    def _to_tree(self):
+        arrays = TreeArrays(self.n_features, len(self.classes))
+        stack = [(0, None, False)]
+        while stack:
+            node, parent, is_left = stack.pop()
+            node_id = arrays.add_node(parent, is_left, self.counts[node], self.depth[node])
+            if self.left[node] >= 0:
+                arrays.set_split(node_id, self.split_feature[node], self.threshold[node])
+                stack.append((self.right[node], node_id, False))
+                stack.append((self.left[node], node_id, True))
+        return arrays.to_tree()
+
+
+def verify_streaming(source, memory_budget=64 * 1024 ** 2, target="Outcome", **params):
+    # akışlı fit'in tepe bellek kullanımını tracemalloc ile ölçüp bütçeyle karşılaştırıyoruz
+    # sonra aynı veriyi belleğe alıp aynı bin sınırlarıyla HistDecisionTreeClassifier ile fit edip
+    # iki ağacı karşılaştırıyoruz
+    tracemalloc.start()
+    streaming = StreamingDecisionTreeClassifier(memory_budget=memory_budget, target=target, **params).fit(source)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if isinstance(source, (str, os.PathLike)):
+        df = pd.read_csv(source)
+        X, y = df.drop([target], axis=1), df[target]
+    else:
+        X, y = source
+    in_memory = HistDecisionTreeClassifier(bin_mapper=streaming.bin_mapper_, **params).fit(X, y)
+    a, b = streaming.tree_, in_memory.tree_
+    identical = (a.node_count == b.node_count
+                 and np.array_equal(a.feature, b.feature)
+                 and np.array_equal(a.threshold, b.threshold)
+                 and np.array_equal(a.value, b.value))
+    return {"peak_bytes": peak, "memory_budget": memory_budget, "within_budget": peak <= memory_budget,
+            "passes": streaming.n_passes_, "identical": bool(identical),
+            "same_predictions": bool((streaming.predict(X) == in_memory.predict(X)).all())}
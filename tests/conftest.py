@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+# modüller depo kökünde düz dosyalar
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def diabetes():
+    from cart_bench import TARGET, synthetic_diabetes
+
+    frame = synthetic_diabetes(5000, random_state=45)
+    return frame.drop(TARGET, axis=1), frame[TARGET]
+
+
+@pytest.fixture(scope="session")
+def deep_tree(diabetes):
+    # budanmamış ağaç: 5000 satırda ~22 derinlik, ~1000 yaprak
+    from sklearn.tree import DecisionTreeClassifier
+
+    X, y = diabetes
+    return DecisionTreeClassifier(random_state=1).fit(X, y)
@@ -0,0 +1,57 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from cart_codegen import (EXCEL_MAX_NESTING, _excel_predict, _nesting, feature_names_of, load_python, to_excel,
+                          to_python, to_sql, verify_exports)
+
+
+@pytest.fixture(scope="module")
+def rows(diabetes):
+    # sklearn float32 ile karşılaştırıyor, üretilen kodlara da aynı değerler gitsin
+    X, _ = diabetes
+    return np.asarray(X, dtype=np.float32).astype(np.float64)
+
+
+def test_deep_tree_is_deep(deep_tree):
+    assert deep_tree.get_depth() >= 20
+
+
+@pytest.mark.parametrize("max_nesting", [32, 4])
+def test_python_matches_predict(deep_tree, diabetes, rows, max_nesting):
+    # max_nesting=4 derin dalları ayrı fonksiyonlara bölmeyi de deniyor
+    X, _ = diabetes
+    code = to_python(deep_tree, max_nesting=max_nesting)
+    predict = load_python(code)
+    assert np.array_equal([predict(row) for row in rows.tolist()], deep_tree.predict(X))
+
+
+def test_python_proba_matches_predict_proba(deep_tree, diabetes, rows):
+    X, _ = diabetes
+    predict = load_python(to_python(deep_tree, proba=True))
+    np.testing.assert_allclose([predict(row) for row in rows.tolist()], deep_tree.predict_proba(X))
+
+
+def test_sql_matches_predict(deep_tree, diabetes, rows):
+    X, _ = diabetes
+    names = feature_names_of(deep_tree)
+    connection = sqlite3.connect(":memory:")
+    columns = ", ".join(f'"{name}" REAL' for name in names)
+    connection.execute(f'CREATE TABLE "data" ({columns})')
+    connection.executemany(f'INSERT INTO "data" VALUES ({", ".join("?" * len(names))})', rows.tolist())
+    predictions = [row[0] for row in connection.execute(to_sql(deep_tree))]
+    connection.close()
+    assert np.array_equal(predictions, deep_tree.predict(X))
+
+
+def test_excel_matches_predict(deep_tree, diabetes, rows):
+    X, _ = diabetes
+    formula = to_excel(deep_tree)
+    assert _nesting(formula, "(", ")") <= EXCEL_MAX_NESTING
+    assert np.array_equal(_excel_predict(formula, rows), deep_tree.predict(X))
+
+
+def test_verify_exports(deep_tree, diabetes):
+    X, _ = diabetes
+    assert verify_exports(deep_tree, X) == {"python": True, "sql": True, "excel": True}
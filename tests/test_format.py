@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from cart_format import HEADER, MAGIC, VERSION, load_model, save_model
+
+
+@pytest.mark.parametrize("layout", ["bfs", "hot"])
+def test_round_trip(deep_tree, diabetes, tmp_path, layout):
+    X, _ = diabetes
+    path = save_model(deep_tree, str(tmp_path / "model.cart"), layout=layout)
+    loaded = load_model(path)
+    assert loaded.layout == layout
+    assert loaded.n_nodes == deep_tree.tree_.node_count
+    assert list(loaded.feature_names) == list(X.columns)
+    assert np.array_equal(loaded.classes_, deep_tree.classes_)
+    assert np.array_equal(loaded.predict(X), deep_tree.predict(X))
+    np.testing.assert_allclose(loaded.predict_proba(X), deep_tree.predict_proba(X), atol=1e-6)
+    # DataFrame yerine sıralı numpy satırları da aynı sonucu vermeli
+    assert np.array_equal(loaded.predict(X.to_numpy()), deep_tree.predict(X))
+
+
+def test_save_leaves_no_temporary_files(deep_tree, tmp_path):
+    save_model(deep_tree, str(tmp_path / "model.cart"))
+    save_model(deep_tree, str(tmp_path / "model.cart"))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["model.cart"]
+
+
+def _rewrite_header(path, field, value):
+    # field: HEADER'daki sıra, 0 magic, 1 version
+    data = bytearray(open(path, "rb").read())
+    fields = list(HEADER.unpack_from(data, 0))
+    fields[field] = value
+    HEADER.pack_into(data, 0, *fields)
+    open(path, "wb").write(bytes(data))
+
+
+def test_rejects_other_format_version(deep_tree, tmp_path):
+    path = save_model(deep_tree, str(tmp_path / "model.cart"))
+    _rewrite_header(path, 1, VERSION + 1)
+    with pytest.raises(ValueError, match="version"):
+        load_model(path)
+
+
+def test_rejects_wrong_magic(deep_tree, tmp_path):
+    path = save_model(deep_tree, str(tmp_path / "model.cart"))
+    _rewrite_header(path, 0, MAGIC[::-1])
+    with pytest.raises(ValueError, match="not a CART model file"):
+        load_model(path)
+
+
+@pytest.mark.parametrize("keep", [0.0, 0.5, 0.99])
+def test_rejects_truncated_file(deep_tree, tmp_path, keep):
+    path = save_model(deep_tree, str(tmp_path / "model.cart"))
+    data = open(path, "rb").read()
+    with open(path, "wb") as file:
+        file.write(data[:max(1, int(len(data) * keep))])
+    with pytest.raises(ValueError, match="truncated"):
+        load_model(path)
+
+
+def test_rejects_truncated_header(deep_tree, tmp_path):
+    path = save_model(deep_tree, str(tmp_path / "model.cart"))
+    data = open(path, "rb").read()
+    with open(path, "wb") as file:
+        file.write(data[:HEADER.size - 1])
+    with pytest.raises(ValueError, match="truncated"):
+        load_model(path)
@@ -0,0 +1,26 @@
+import numpy as np
+from sklearn.tree import DecisionTreeClassifier
+
+from cart_halving import SuccessiveHalvingSearchCV
+
+
+def test_cv_results_match_other_searches(diabetes):
+    X, y = diabetes
+    search = SuccessiveHalvingSearchCV(DecisionTreeClassifier(random_state=1), {"max_depth": range(1, 10)}, cv=3,
+                                       random_state=0).fit(X, y)
+    results = search.cv_results_
+    # log(9, 3) = 2.0000000000000004 fazladan tur eklememeli, 3 aday kalınca duruluyor
+    assert search.n_candidates_ == [9, 3]
+    assert search.n_resources_[-1] == len(X)
+    assert len(results["params"]) == sum(search.n_candidates_)
+    assert list(results["iter"]) == [0] * 9 + [1] * 3
+    assert results["split2_test_score"].shape == (12,)
+
+    best = search.best_index_
+    assert results["iter"][best] == 1 and results["rank_test_score"][best] == 1
+    assert results["params"][best] == search.best_params_
+    assert search.best_score_ == results["mean_test_score"][best]
+    assert search.best_score_ == results["mean_test_score"][results["iter"] == 1].max()
+    assert search.best_estimator_.get_params()["max_depth"] == search.best_params_["max_depth"]
+    assert all(type(label) is int for balance in search.class_balance_ for label in balance)
+    assert np.isclose(sum(search.class_balance_[0].values()), 1.0)
@@ -0,0 +1,51 @@
+import json
+
+from sklearn.tree import DecisionTreeClassifier
+
+from cart_hist import HistDecisionTreeClassifier
+from cart_profile import OVERHEAD_BUDGET, Profiler, measure_overhead
+from cart_stream import StreamingDecisionTreeClassifier
+
+
+def test_overhead_within_budget():
+    report = measure_overhead(n_calls=20_000)
+    for name, budget in OVERHEAD_BUDGET.items():
+        assert report[f"{name}_overhead_s"] <= budget, report
+    assert report["ok"]
+
+
+def test_trace_has_nested_stage_and_fit_timings(diabetes, tmp_path):
+    X, y = diabetes
+    data_path = str(tmp_path / "data.csv")
+    X.assign(Outcome=y).head(2000).to_csv(data_path, index=False)
+
+    profiler = Profiler()
+    profiler.enabled = True
+    profiler.instrument([DecisionTreeClassifier, HistDecisionTreeClassifier, StreamingDecisionTreeClassifier])
+    try:
+        profiler.section("fit")
+        DecisionTreeClassifier(max_depth=3).fit(X, y).predict(X)
+        HistDecisionTreeClassifier(max_depth=3).fit(X.to_numpy(), y)
+        profiler.section("stream")
+        StreamingDecisionTreeClassifier(max_depth=3).fit(data_path)
+        # ölçüm yükü testi aynı profiler'da, diğer sınıfların sarmaları yerinde kalmalı
+        measure_overhead(n_calls=100, profiler=profiler)
+        assert hasattr(DecisionTreeClassifier.fit, "__cart_profile_original__")
+        path = profiler.write_trace(str(tmp_path / "trace.json"))
+    finally:
+        profiler.uninstrument()
+    assert not hasattr(DecisionTreeClassifier.fit, "__cart_profile_original__")
+
+    events = json.load(open(path))["traceEvents"]
+    stages = {event["name"]: event for event in events if event["cat"] == "stage"}
+    fits = [event for event in events if event["cat"] == "fit"]
+    assert list(stages) == ["fit", "stream"]
+    # HistDecisionTreeClassifier.fit içindeki DecisionTreeClassifier çağrıları ayrıca sayılmıyor
+    assert [event["name"] for event in fits] == ["DecisionTreeClassifier.fit", "HistDecisionTreeClassifier.fit",
+                                                 "StreamingDecisionTreeClassifier.fit"]
+    for event, stage in zip(fits, ["fit", "fit", "stream"]):
+        parent = stages[stage]
+        assert parent["ts"] <= event["ts"] and event["ts"] + event["dur"] <= parent["ts"] + parent["dur"]
+        assert event["dur"] > 0 and event["args"]["cpu_ms"] >= 0
+    assert [event["args"]["n_samples"] for event in fits] == [len(X), len(X), None]
+    assert stages["fit"]["args"]["fits"] == 2 and stages["fit"]["args"]["predicts"] == 1
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from cart_registry import HotModel, ModelRegistry
+
+
+def _registry(tree, tmp_path, n_versions):
+    registry = ModelRegistry(str(tmp_path / "registry"))
+    return registry, [registry.publish(tree) for _ in range(n_versions)]
+
+
+def test_repeated_rollbacks_keep_moving_back(deep_tree, tmp_path):
+    registry, (v1, v2, v3) = _registry(deep_tree, tmp_path, 3)
+    for version in (v1, v2, v3):
+        registry.activate(version)
+    assert registry.rollback() == v2
+    assert registry.rollback() == v1
+    with pytest.raises(ValueError, match="No earlier version"):
+        registry.rollback()
+    assert registry.current() == v1
+
+
+def test_rollback_after_new_activation(deep_tree, tmp_path):
+    registry, (v1, v2, v3, v4) = _registry(deep_tree, tmp_path, 4)
+    for version in (v1, v2, v3):
+        registry.activate(version)
+    assert registry.rollback() == v2
+    registry.activate(v4)
+    # v3 geri alınmıştı, yığında yok
+    assert [registry.rollback(), registry.rollback()] == [v2, v1]
+
+
+def test_rollback_skips_repeats_and_deleted_versions(deep_tree, tmp_path):
+    registry, (v1, v2, v3) = _registry(deep_tree, tmp_path, 3)
+    for version in (v1, v2, v2, v3, v3):
+        registry.activate(version)
+    os.unlink(registry.path(v2))
+    assert registry.rollback() == v1
+
+
+def test_prune_keeps_rollback_targets(deep_tree, tmp_path):
+    registry, (v1, v2, v3, v4, v5) = _registry(deep_tree, tmp_path, 5)
+    registry.activate(v1)
+    registry.activate(v2)
+    assert registry.prune(keep=1) == [v3, v4]
+    assert registry.versions() == [v1, v2, v5]
+    assert registry.rollback() == v1
+    # v2 artık yığında değil, silinebilir
+    assert registry.prune(keep=1) == [v2]
+
+
+def test_hot_model_follows_rollback(deep_tree, tmp_path):
+    registry, (v1, v2, v3) = _registry(deep_tree, tmp_path, 3)
+    for version in (v1, v2, v3):
+        registry.activate(version)
+    hot = HotModel(registry)
+    assert hot.version == v3
+    assert hot.rollback() == v2
+    assert hot.rollback() == v1
+    assert hot.version == v1
@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from cart_format import save_model
+from cart_score import HEAVY_MODULES, IMPORT_TIME_BUDGET, check_import_time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# yeni bir süreçte skorlayıp o süreçte yüklenmiş modüllere bakıyoruz
+_SCORE = """
+import json, sys
+from cart_score import score, score_file
+predictions = score_file(sys.argv[1], sys.argv[2]).tolist()
+probas = score(sys.argv[1], [[6, 148, 70, 35, 0, 30, 0.62, 50]], proba=True).tolist()
+print(json.dumps({"predictions": predictions, "probas": probas, "modules": sorted(sys.modules)}))
+"""
+
+
+def test_scoring_does_not_import_heavy_libraries(deep_tree, diabetes, tmp_path):
+    X, y = diabetes
+    model_path = save_model(deep_tree, str(tmp_path / "model.cart"))
+    data_path = str(tmp_path / "data.csv")
+    X.assign(Outcome=y).head(500).to_csv(data_path, index=False)
+
+    output = subprocess.run([sys.executable, "-c", _SCORE, model_path, data_path], capture_output=True,
+                            text=True, check=True, cwd=ROOT).stdout
+    result = json.loads(output)
+    heavy = sorted(name for name in result["modules"] if name.split(".")[0] in HEAVY_MODULES)
+    assert heavy == []
+    assert np.array_equal(result["predictions"], deep_tree.predict(X.head(500)))
+    assert len(result["probas"][0]) == len(deep_tree.classes_)
+
+
+def test_import_time_within_budget():
+    report = check_import_time()
+    assert report["heavy_imports"] == []
+    assert report["seconds"] is not None and report["seconds"] <= IMPORT_TIME_BUDGET, report
+    assert report["ok"]
@@ -0,0 +1,39 @@
+import numpy as np
+
+import cart_scoring
+from cart_scoring import compile_tree
+
+
+def test_predict_proba_matches_sklearn(deep_tree, diabetes):
+    X, _ = diabetes
+    compiled = compile_tree(deep_tree)
+    assert compiled.max_depth == deep_tree.get_depth()
+    assert np.array_equal(compiled.predict_proba(X), deep_tree.predict_proba(X))
+    assert np.array_equal(compiled.predict(X), deep_tree.predict(X))
+
+
+def test_apply_matches_sklearn_across_chunks(deep_tree, diabetes, monkeypatch):
+    X, _ = diabetes
+    # parça sınırlarını da denemek için küçük ve satır sayısını bölmeyen bir parça boyu
+    monkeypatch.setattr(cart_scoring, "CHUNK_SIZE", 777)
+    assert np.array_equal(compile_tree(deep_tree).apply(X), deep_tree.apply(X))
+
+
+def test_node_paths_match_decision_path(deep_tree, diabetes):
+    X, _ = diabetes
+    X = X.iloc[:500]
+    paths = compile_tree(deep_tree).node_paths(X)
+    indicator = deep_tree.decision_path(X)
+    for i in range(len(X)):
+        expected = indicator.indices[indicator.indptr[i]:indicator.indptr[i + 1]]
+        # yaprağa erken ulaşan satırlarda son sütunlar yaprağı tekrarlıyor
+        assert np.array_equal(np.unique(paths[i]), np.sort(expected))
+        assert paths[i, -1] == expected.max()
+
+
+def test_reordered_columns(deep_tree, diabetes):
+    X, _ = diabetes
+    shuffled = X[list(reversed(X.columns))]
+    compiled = compile_tree(deep_tree)
+    assert np.array_equal(compiled.predict_proba(shuffled), deep_tree.predict_proba(X))
+    assert np.array_equal(compiled.apply(shuffled), deep_tree.apply(X))
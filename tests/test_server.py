@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+from cart_format import save_model
+from cart_server import PredictionServer
+
+
+async def _send(host, port, data):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(data)
+    await writer.drain()
+    status = int((await reader.readline()).split(b" ")[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    response = json.loads(await reader.readexactly(length))
+    writer.close()
+    return status, response
+
+
+async def _post(host, port, payload):
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+    return await _send(host, port, f"POST /predict HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+
+
+def _serve(model_path, scenario):
+    async def run():
+        # max_wait uzun: iyi ve bozuk istekler aynı batch penceresine düşsün
+        server = PredictionServer(model_path, max_batch_size=64, max_wait=0.05)
+        listener = await server.start(port=0)
+        host, port = listener.sockets[0].getsockname()[:2]
+        try:
+            return await scenario(host, port), server
+        finally:
+            await server.stop()
+    return asyncio.run(run())
+
+
+def test_bad_rows_do_not_fail_the_batch(deep_tree, diabetes, tmp_path):
+    X, _ = diabetes
+    model_path = save_model(deep_tree, str(tmp_path / "model.cart"))
+    rows = X.iloc[:20].to_numpy().tolist()
+    bad = [{"x": rows[0][:-1]}, {"x": [float("nan")] * len(rows[0])}, {"x": ["a"] * len(rows[0])},
+           {"x": [rows[0]]}, {"y": rows[0]}, b"not json"]
+
+    async def scenario(host, port):
+        payloads = [{"x": row} for row in rows] + bad
+        return await asyncio.gather(*[_post(host, port, payload) for payload in payloads])
+
+    responses, server = _serve(model_path, scenario)
+    good, rejected = responses[:len(rows)], responses[len(rows):]
+    assert [status for status, _ in good] == [200] * len(rows)
+    assert [response["prediction"] for _, response in good] == deep_tree.predict(X.iloc[:20]).tolist()
+    assert [status for status, _ in rejected] == [400] * len(bad)
+    assert server.batcher.n_requests == len(rows)
+
+
+def test_malformed_request_line(deep_tree, tmp_path):
+    model_path = save_model(deep_tree, str(tmp_path / "model.cart"))
+
+    async def scenario(host, port):
+        return [await _send(host, port, b"GARBAGE\r\n\r\n"),
+                await _send(host, port, b"POST /predict HTTP/1.1\r\nContent-Length: abc\r\n\r\n")]
+
+    responses, _ = _serve(model_path, scenario)
+    assert [status for status, _ in responses] == [400, 400]
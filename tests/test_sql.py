@@ -0,0 +1,33 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cart_sql import STRATEGIES, load_frame, read_predictions, score_table
+
+
+def _threshold_rows(tree, X, n_rows=2000):
+    # her satırda bir özellik tam bölünme eşiğinde (float32'ye yuvarlanmış haliyle), ya da bir ulp altı/üstü
+    rng = np.random.default_rng(0)
+    rows = X.sample(n_rows, random_state=0).to_numpy(dtype=np.float32)
+    internal = np.flatnonzero(tree.tree_.children_left >= 0)
+    nodes = rng.choice(internal, n_rows)
+    values = tree.tree_.threshold[nodes].astype(np.float32)
+    shift = rng.integers(-1, 2, n_rows)
+    values = np.where(shift < 0, np.nextafter(values, np.float32(-np.inf)),
+                      np.where(shift > 0, np.nextafter(values, np.float32(np.inf)), values))
+    rows[np.arange(n_rows), tree.tree_.feature[nodes]] = values
+    return pd.DataFrame(rows.astype(np.float64), columns=X.columns)
+
+
+@pytest.mark.parametrize("strategy", STRATEGIES)
+def test_score_table_matches_predict(deep_tree, diabetes, strategy):
+    X, _ = diabetes
+    frame = pd.concat([X.astype(np.float64), _threshold_rows(deep_tree, X)], ignore_index=True)
+    connection = sqlite3.connect(":memory:")
+    load_frame(connection, frame)
+    assert score_table(connection, deep_tree, strategy=strategy) == len(frame)
+    scored = read_predictions(connection)
+    assert np.array_equal(scored["prediction"].to_numpy(), deep_tree.predict(frame))
+    np.testing.assert_allclose(scored["proba"].to_numpy(), deep_tree.predict_proba(frame)[:, -1], rtol=1e-12)
@@ -0,0 +1,72 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from cart_bench import TARGET, synthetic_diabetes
+from cart_hist import HistDecisionTreeClassifier
+from cart_stream import StreamingDecisionTreeClassifier
+
+MEMORY_BUDGET = 4 * 1024 ** 2
+PARAMS = {"max_depth": 8, "min_samples_split": 4}
+
+
+@pytest.fixture(scope="module")
+def frame():
+    return synthetic_diabetes(200_000, random_state=7)
+
+
+@pytest.fixture(scope="module")
+def csv_path(frame, tmp_path_factory):
+    path = tmp_path_factory.mktemp("stream") / "diabetes.csv"
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def _assert_same_tree(a, b):
+    assert a.node_count == b.node_count
+    assert np.array_equal(a.feature, b.feature)
+    assert np.array_equal(a.threshold, b.threshold)
+    assert np.array_equal(a.value, b.value)
+
+
+def _fit_traced(source, **params):
+    tracemalloc.start()
+    try:
+        model = StreamingDecisionTreeClassifier(memory_budget=MEMORY_BUDGET, target=TARGET, **params).fit(source)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return model, peak
+
+
+def test_csv_budget_too_small_for_reader(csv_path):
+    with pytest.raises(ValueError, match="memory_budget"):
+        StreamingDecisionTreeClassifier(memory_budget=1024 ** 2, target=TARGET).fit(csv_path)
+
+
+def test_csv_stream_matches_in_memory_tree_within_budget(frame, csv_path):
+    streaming, peak = _fit_traced(csv_path, **PARAMS)
+    assert peak <= MEMORY_BUDGET
+    X, y = frame.drop(TARGET, axis=1), frame[TARGET]
+    in_memory = HistDecisionTreeClassifier(bin_mapper=streaming.bin_mapper_, **PARAMS).fit(X, y)
+    _assert_same_tree(streaming.tree_, in_memory.tree_)
+    assert (streaming.predict(X) == in_memory.predict(X)).all()
+
+
+def test_array_stream_matches_in_memory_tree(frame):
+    X = frame.drop(TARGET, axis=1).to_numpy(dtype=np.float32)
+    y = frame[TARGET].to_numpy()
+    streaming = StreamingDecisionTreeClassifier(memory_budget=MEMORY_BUDGET, **PARAMS).fit(X, y)
+    in_memory = HistDecisionTreeClassifier(bin_mapper=streaming.bin_mapper_, **PARAMS).fit(X, y)
+    _assert_same_tree(streaming.tree_, in_memory.tree_)
+
+
+def test_small_budget_splits_levels_into_more_passes(csv_path):
+    # bütçe küçüldükçe derin seviyelerin histogramları birden fazla geçişe bölünüyor
+    # bin örneklemi de bütçeye bağlı, aynı ağacı beklemek için bin sınırlarını paylaşıyoruz
+    small = StreamingDecisionTreeClassifier(memory_budget=MEMORY_BUDGET, target=TARGET, **PARAMS).fit(csv_path)
+    large = StreamingDecisionTreeClassifier(memory_budget=256 * 1024 ** 2, bin_mapper=small.bin_mapper_,
+                                            target=TARGET, **PARAMS).fit(csv_path)
+    assert small.n_passes_ > large.n_passes_
+    _assert_same_tree(small.tree_, large.tree_)